@@ -0,0 +1 @@
+# Benchmark scripts for DataUniverse (run with python -m backend.benchmarks.<name>)
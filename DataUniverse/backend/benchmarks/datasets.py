@@ -0,0 +1,110 @@
+"""
+Synthetic dataset generator for ETL benchmarks
+Produces reproducible CSV, JSONL, Excel and Parquet files with a configurable
+row count, column width, null ratio and dirty-data rate.
+
+Usage:
+    python -m backend.benchmarks.datasets --format csv --rows 100000 --columns 20 --out /tmp/bench.csv
+"""
+import argparse
+from pathlib import Path
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+FORMATS = ["csv", "jsonl", "excel", "parquet"]
+EXTENSIONS = {"csv": ".csv", "jsonl": ".json", "excel": ".xlsx", "parquet": ".parquet"}
+
+# Column kinds cycled across the requested width
+COLUMN_KINDS = ["int", "float", "category", "text", "date", "bool", "email"]
+CATEGORIES = ["active", "inactive", "pending", "closed", "IN", "US", "GB", "DE"]
+
+
+def _column(kind: str, rows: int, rng: np.random.Generator) -> pd.Series:
+    if kind == "int":
+        return pd.Series(rng.integers(0, 100_000, rows))
+    elif kind == "float":
+        return pd.Series(rng.normal(1000.0, 250.0, rows).round(2))
+    elif kind == "category":
+        return pd.Series(rng.choice(CATEGORIES, rows))
+    elif kind == "text":
+        words = np.array(["alpha", "beta", "gamma", "delta", "omega", "sigma", "kappa"])
+        return pd.Series([" ".join(w) for w in rng.choice(words, (rows, 4))])
+    elif kind == "date":
+        start = np.datetime64("2020-01-01")
+        return pd.Series((start + rng.integers(0, 365 * 5, rows).astype("timedelta64[D]")).astype(str))
+    elif kind == "bool":
+        return pd.Series(rng.random(rows) < 0.5)
+    elif kind == "email":
+        return pd.Series([f"user{i}@example.com" for i in rng.integers(0, 1_000_000, rows)])
+    raise ValueError(f"Unknown column kind: {kind}")
+
+
+def _dirty(series: pd.Series, kind: str, mask: np.ndarray) -> pd.Series:
+    """Inject kind-appropriate bad values where mask is set"""
+    if not mask.any():
+        return series
+    series = series.astype(object)
+    if kind in ("int", "float"):
+        series[mask] = "N/A"
+    elif kind == "email":
+        series[mask] = "not-an-email"
+    elif kind == "date":
+        series[mask] = "31/02/2021"
+    else:
+        series[mask] = series[mask].map(lambda v: f"  {v}  ")
+    return series
+
+
+def generate_frame(rows: int, columns: int = 12, null_ratio: float = 0.0,
+                   dirty_rate: float = 0.0, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data: Dict[str, pd.Series] = {"id": pd.Series(np.arange(1, rows + 1))}
+    for i in range(columns - 1):
+        kind = COLUMN_KINDS[i % len(COLUMN_KINDS)]
+        series = _column(kind, rows, rng)
+        series = _dirty(series, kind, rng.random(rows) < dirty_rate)
+        null_mask = rng.random(rows) < null_ratio
+        if null_mask.any():
+            series = series.astype(object)
+            series[null_mask] = None
+        data[f"{kind}_{i}"] = series
+    return pd.DataFrame(data)
+
+
+def write_dataset(df: pd.DataFrame, path: Path, fmt: str) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "jsonl":
+        df.to_json(path, orient="records", lines=True)
+    elif fmt == "excel":
+        df.to_excel(path, index=False)
+    elif fmt == "parquet":
+        # Mixed dirty columns are stored as strings
+        df.astype({c: str for c in df.columns if df[c].dtype == object}).to_parquet(path, index=False)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return path
+
+
+def generate_dataset(path: Path, fmt: str, rows: int, columns: int = 12, null_ratio: float = 0.0,
+                     dirty_rate: float = 0.0, seed: int = 42) -> Path:
+    """Generate and write one dataset; the same arguments always give the same file"""
+    return write_dataset(generate_frame(rows, columns, null_ratio, dirty_rate, seed), path, fmt)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic ETL dataset")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--null-ratio", type=float, default=0.02)
+    parser.add_argument("--dirty-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+    out = generate_dataset(Path(args.out), args.format, args.rows, args.columns,
+                           args.null_ratio, args.dirty_rate, args.seed)
+    print(out)
@@ -0,0 +1,340 @@
+"""
+Reproducible ETL benchmark suite
+Times FileReader, ETLEngine data quality + transformations, the Postgres
+load path and the datalake (S3/MinIO) sink on synthetic datasets, writes the
+results to JSON and compares two result files for regressions.
+
+Usage:
+    python -m backend.benchmarks.etl_suite run --rows 200000 --output bench.json \\
+        [--database-url postgresql+asyncpg://...] [--s3-endpoint http://localhost:9700]
+    python -m backend.benchmarks.etl_suite compare baseline.json bench.json --threshold 0.10
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import pandas as pd
+
+from .datasets import EXTENSIONS, FORMATS, generate_dataset
+from ..utils.file_readers import FileReader
+from ..utils.etl_engine import ETLEngine
+
+FILE_TYPES = {"csv": "csv", "jsonl": "json", "excel": "xlsx", "parquet": "parquet"}
+
+BENCH_YAML = """
+source:
+  type: bench
+target:
+  type: bench
+data_quality:
+  on_failure: quarantine
+  rules:
+    - column: int_0
+      check: not_null
+    - column: email_6
+      check: regex
+      pattern: '^[^@]+@[^@]+\\.[a-z]+$'
+transformations:
+  - name: double_float
+    type: expression
+    logic: "float_1 * 2"
+    target_column: float_1_x2
+  - name: trim_category
+    type: built_in
+    logic: trim_and_uppercase
+    target_column: category_2
+"""
+
+
+def _timed(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    timings = []
+    value = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = fn()
+        timings.append(time.perf_counter() - started)
+    return {"seconds": round(statistics.median(timings), 4), "runs": [round(t, 4) for t in timings], "value": value}
+
+
+async def _timed_async(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    timings = []
+    value = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = await fn()
+        timings.append(time.perf_counter() - started)
+    return {"seconds": round(statistics.median(timings), 4), "runs": [round(t, 4) for t in timings], "value": value}
+
+
+def _result(name: str, rows: int, timing: Dict[str, Any], size_bytes: Optional[int] = None, **extra) -> Dict[str, Any]:
+    seconds = timing["seconds"]
+    result = {
+        "name": name,
+        "rows": rows,
+        "seconds": seconds,
+        "runs": timing["runs"],
+        "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+    }
+    if size_bytes is not None:
+        result["mb_per_sec"] = round(size_bytes / 1024 ** 2 / seconds, 2) if seconds else None
+    result.update(extra)
+    return result
+
+
+def read_all(path: Path, file_type: str, chunk_size: int) -> int:
+    """Read through FileReader, chunked where supported; returns the row count"""
+    try:
+        return sum(len(df) for df in FileReader.get_iterator(str(path), file_type, chunk_size=chunk_size))
+    except ValueError:
+        df, _ = FileReader.read_file(str(path), file_type)
+        return len(df)
+
+
+def bench_readers(datasets: Dict[str, Path], args) -> List[Dict[str, Any]]:
+    results = []
+    for fmt, path in datasets.items():
+        try:
+            timing = _timed(lambda: read_all(path, FILE_TYPES[fmt], args.chunk_size), args.repeat)
+            results.append(_result(f"reader:{fmt}", timing["value"], timing, path.stat().st_size))
+        except Exception as e:
+            results.append({"name": f"reader:{fmt}", "error": str(e)})
+    return results
+
+
+def bench_engine(csv_path: Path, args) -> List[Dict[str, Any]]:
+    config = ETLEngine.load_config(BENCH_YAML)
+    df = pd.read_csv(csv_path)
+
+    dq = _timed(lambda: len(ETLEngine.apply_quality_rules(df.copy(), config["data_quality"])), args.repeat)
+    transforms = _timed(lambda: len(ETLEngine.apply_transformations(df.copy(), config["transformations"])), args.repeat)
+    return [
+        _result("engine:data_quality", len(df), dq, rows_kept=dq["value"]),
+        _result("engine:transformations", len(df), transforms),
+    ]
+
+
+def _flat_file_source(path: Path, fmt: str):
+    from ..models import DataSource
+    return DataSource(
+        id=0, name=f"bench_{fmt}", source_type="Flat Files", type="file",
+        connection_details={
+            "Source File Path": str(path.parent),
+            "Source File Name": path.name,
+            "Source File Type": FILE_TYPES[fmt],
+        },
+    )
+
+
+async def bench_db_load(csv_path: Path, rows: int, args) -> List[Dict[str, Any]]:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from ..database import Base
+    from ..models import DataSource, ETLJob, TransformTemplate
+    from ..routers.etl import execute_flat_file_to_db
+    from ..utils.table_creator import TableCreator
+
+    engine = create_async_engine(args.database_url)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    # The load looks up the target's transform template, so a bare database needs those tables;
+    # only these two, since documents needs the pgvector extension
+    tables = [DataSource.__table__, TransformTemplate.__table__]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+    source = _flat_file_source(csv_path, "csv")
+    target = DataSource(id=0, name="bench_target", source_type="RDBMS", type="database", connection_details={})
+    job = ETLJob(id=0, name="bench_db_load", mapping_config={}, yaml_config=None)
+    try:
+        async with Session() as db:
+            timing = await _timed_async(lambda: execute_flat_file_to_db(source, target, job, db), args.repeat)
+            table = TableCreator._sanitize_table_name(csv_path.name)
+            await db.execute(text(f"DROP TABLE IF EXISTS {table}"))
+            await db.commit()
+    finally:
+        await engine.dispose()
+    return [_result("load:postgres", rows, timing, csv_path.stat().st_size)]
+
+
+async def bench_datalake(csv_path: Path, rows: int, args) -> List[Dict[str, Any]]:
+    import boto3
+    from concurrent.futures import ThreadPoolExecutor
+    from ..models import DataSource, ETLJob
+    from ..routers.etl import datalake_client, execute_flat_file_to_datalake
+    from ..utils.datalake_reader import DatalakeReader
+
+    s3 = boto3.client("s3", endpoint_url=args.s3_endpoint,
+                      aws_access_key_id=args.s3_access_key, aws_secret_access_key=args.s3_secret_key)
+    try:
+        s3.head_bucket(Bucket=args.s3_bucket)
+    except Exception:
+        s3.create_bucket(Bucket=args.s3_bucket)
+
+    source = _flat_file_source(csv_path, "csv")
+    target = DataSource(
+        id=0, name="bench_lake", source_type="Datalake/Lakehouse", type="datalake",
+        connection_details={
+            "Access Key": args.s3_access_key,
+            "Secret Key": args.s3_secret_key,
+            "Datalake Location": f"s3://{args.s3_bucket}/bench",
+            "Endpoint URL": args.s3_endpoint,
+        },
+    )
+    job = ETLJob(id=0, name="bench_datalake", mapping_config={}, yaml_config=None)
+    timing = await _timed_async(lambda: execute_flat_file_to_datalake(source, target, job, None), args.repeat)
+    results = [_result("sink:datalake", rows, timing, csv_path.stat().st_size)]
+
+    # What every datalake job pays to get its S3 client
+    details = target.connection_details
+    def lease_clients() -> int:
+        for _ in range(args.s3_jobs):
+            with datalake_client(details):
+                pass
+        return args.s3_jobs
+
+    setup = _timed(lease_clients, args.repeat)
+    results.append(_result("s3:client_setup", args.s3_jobs, setup, jobs=args.s3_jobs))
+
+    location = details["Datalake Location"]
+    object_bytes = sum(o["Size"] for o in s3.list_objects_v2(Bucket=args.s3_bucket, Prefix="bench").get("Contents", []))
+
+    def read_lake() -> int:
+        with datalake_client(details) as (client, _):
+            return sum(len(df) for df in DatalakeReader.iter_parquet(client, location, args.chunk_size))
+
+    read = _timed(read_lake, args.repeat)
+    results.append(_result("source:datalake", read["value"], read, object_bytes))
+
+    def read_lake_concurrently() -> int:
+        with ThreadPoolExecutor(max_workers=args.s3_jobs) as pool:
+            return sum(pool.map(lambda _: read_lake(), range(args.s3_jobs)))
+
+    concurrent = _timed(read_lake_concurrently, args.repeat)
+    results.append(_result(f"source:datalake_x{args.s3_jobs}", concurrent["value"], concurrent,
+                           object_bytes * args.s3_jobs))
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run(args) -> Dict[str, Any]:
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="du_bench_"))
+    formats = args.formats.split(",")
+    datasets = {}
+    for fmt in formats:
+        path = workdir / f"bench_{args.rows}x{args.columns}{EXTENSIONS[fmt]}"
+        if not path.exists():
+            generate_dataset(path, fmt, args.rows, args.columns, args.null_ratio, args.dirty_rate, args.seed)
+        datasets[fmt] = path
+
+    csv_path = datasets.get("csv") or generate_dataset(
+        workdir / f"bench_{args.rows}x{args.columns}.csv", "csv",
+        args.rows, args.columns, args.null_ratio, args.dirty_rate, args.seed)
+
+    results = bench_readers(datasets, args)
+    results += bench_engine(csv_path, args)
+    if args.database_url:
+        try:
+            results += await bench_db_load(csv_path, args.rows, args)
+        except Exception as e:
+            results.append({"name": "load:postgres", "error": str(e)})
+    if args.s3_endpoint:
+        try:
+            results += await bench_datalake(csv_path, args.rows, args)
+        except Exception as e:
+            results.append({"name": "sink:datalake", "error": str(e)})
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("func", "s3_secret_key", "database_url")},
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Per-benchmark change in seconds; regressions exceed the threshold"""
+    base = {r["name"]: r for r in baseline["results"] if "seconds" in r}
+    rows = []
+    for r in current["results"]:
+        if "seconds" not in r or r["name"] not in base:
+            continue
+        before, after = base[r["name"]]["seconds"], r["seconds"]
+        change = (after - before) / before if before else 0.0
+        rows.append({
+            "name": r["name"],
+            "baseline_seconds": before,
+            "current_seconds": after,
+            "change": round(change, 4),
+            "regression": change > threshold,
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="DataUniverse ETL benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Run the suite and write results JSON")
+    run_p.add_argument("--rows", type=int, default=100_000)
+    run_p.add_argument("--columns", type=int, default=12)
+    run_p.add_argument("--null-ratio", type=float, default=0.02)
+    run_p.add_argument("--dirty-rate", type=float, default=0.01)
+    run_p.add_argument("--seed", type=int, default=42)
+    run_p.add_argument("--formats", default=",".join(FORMATS))
+    run_p.add_argument("--chunk-size", type=int, default=50_000)
+    run_p.add_argument("--repeat", type=int, default=3)
+    run_p.add_argument("--workdir", default=None, help="Reuse generated datasets from this directory")
+    run_p.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    run_p.add_argument("--s3-endpoint", default=os.getenv("BENCH_S3_ENDPOINT"))
+    run_p.add_argument("--s3-bucket", default="datauniverse-bench")
+    run_p.add_argument("--s3-access-key", default=os.getenv("BENCH_S3_ACCESS_KEY", "minioadmin"))
+    run_p.add_argument("--s3-secret-key", default=os.getenv("BENCH_S3_SECRET_KEY", "minioadmin"))
+    run_p.add_argument("--s3-jobs", type=int, default=4, help="Concurrent datalake jobs simulated")
+    run_p.add_argument("--output", default="bench_results.json")
+
+    cmp_p = sub.add_parser("compare", help="Flag regressions between two result files")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown ratio")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        report = asyncio.run(run(args))
+        Path(args.output).write_text(json.dumps(report, indent=2, default=str))
+        for r in report["results"]:
+            print(json.dumps(r))
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(f"{row['name']:<28} {row['baseline_seconds']:>9.4f}s -> {row['current_seconds']:>9.4f}s "
+              f"({row['change']:+.1%}) {flag}")
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+ANN vector search benchmark
+Loads random unit vectors into a scratch table for each corpus size, builds
+the ANN index and reports recall@k against exact search plus p50/p99 latency.
+
+Usage:
+    python -m backend.benchmarks.vector_search --sizes 1000,10000,100000 --dim 1536 --k 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from ..database import DATABASE_URL
+from ..utils.rag_engine import IngestionPipeline, VectorIndex, VectorSearch
+
+BENCH_TABLE = "rag_bench_vectors"
+
+
+def random_unit_vectors(n: int, dim: int, rng: random.Random) -> List[List[float]]:
+    vectors = []
+    for _ in range(n):
+        vec = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+        norm = sum(v * v for v in vec) ** 0.5 or 1.0
+        vectors.append([v / norm for v in vec])
+    return vectors
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[idx]
+
+
+async def load_corpus(db: AsyncSession, size: int, dim: int, rng: random.Random) -> None:
+    await db.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+    await db.execute(text(
+        f"CREATE TABLE {BENCH_TABLE} (id SERIAL PRIMARY KEY, filename TEXT, content TEXT, "
+        f"embedding vector({dim}), created_at TIMESTAMPTZ DEFAULT now())"
+    ))
+    await db.commit()
+
+    batch = 10000
+    for start in range(0, size, batch):
+        n = min(batch, size - start)
+        rows = [(f"doc_{(start + i) % 100}", f"chunk {start + i}") for i in range(n)]
+        await IngestionPipeline.copy_rows(db, rows, random_unit_vectors(n, dim, rng), table=BENCH_TABLE)
+
+
+async def bench_size(db: AsyncSession, size: int, args, rng: random.Random) -> Dict[str, Any]:
+    await load_corpus(db, size, args.dim, rng)
+    index = await VectorIndex.rebuild(db, table=BENCH_TABLE, kind=args.kind, lists=max(size // 1000, 10))
+
+    queries = random_unit_vectors(args.queries, args.dim, rng)
+    recalls, latencies = [], []
+    for q in queries:
+        exact = await VectorSearch.search(db, q, k=args.k, exact=True, table=BENCH_TABLE)
+        started = time.perf_counter()
+        approx = await VectorSearch.search(
+            db, q, k=args.k, ef_search=args.ef_search, probes=args.probes, table=BENCH_TABLE
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        truth = {r["id"] for r in exact}
+        recalls.append(len(truth & {r["id"] for r in approx}) / max(len(truth), 1))
+
+    return {
+        "corpus_size": size,
+        "index": index,
+        f"recall@{args.k}": round(statistics.mean(recalls), 4),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+async def main(args) -> List[Dict[str, Any]]:
+    engine = create_async_engine(args.database_url)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rng = random.Random(args.seed)
+    results = []
+    try:
+        async with Session() as db:
+            for size in [int(s) for s in args.sizes.split(",")]:
+                result = await bench_size(db, size, args, rng)
+                print(json.dumps(result))
+                results.append(result)
+            if not args.keep:
+                await db.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+                await db.commit()
+    finally:
+        await engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pgvector ANN recall/latency benchmark")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--kind", default="hnsw", choices=["hnsw", "ivfflat"])
+    parser.add_argument("--ef-search", type=int, default=None)
+    parser.add_argument("--probes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch table afterwards")
+    asyncio.run(main(parser.parse_args()))
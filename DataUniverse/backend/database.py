@@ -1,24 +1,89 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, Any
+import os
 
-# Database Configuration
-DB_HOST = "localhost"
-DB_PORT = "5418"
-DB_USER = "datauniverse_user" #"odoo18"
-DB_PASSWORD = "datauniverse_user" #"odoo18"
-DATABASE = "datauniverse_db" #"odoo18_db"
+# Database Configuration (overridable from the environment)
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "5418")
+DB_USER = os.getenv("DB_USER", "datauniverse_user") #"odoo18"
+DB_PASSWORD = os.getenv("DB_PASSWORD", "datauniverse_user") #"odoo18"
+DATABASE = os.getenv("DB_NAME", "datauniverse_db") #"odoo18_db"
+
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DATABASE}"
+)
+# Optional read-only replica for list/status endpoints; falls back to the primary
+READ_REPLICA_URL = os.getenv("DB_READ_REPLICA_URL")
+
+# Runtime tuning
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# asyncpg prepared statement cache; set to 0 behind PgBouncer in transaction mode
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+# Server-side statement timeout in milliseconds (0 disables)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# "false" (default), "true" for statements, "debug" for statements and result rows
+DB_ECHO = os.getenv("DB_ECHO", "false").lower()
+
+
+def _echo_setting():
+    if DB_ECHO == "debug":
+        return "debug"
+    return DB_ECHO in ("1", "true", "yes")
+
+
+def engine_options(pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW) -> Dict[str, Any]:
+    """Keyword arguments for create_async_engine built from the runtime settings"""
+    server_settings = {"application_name": "datauniverse"}
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        server_settings["statement_timeout"] = str(DB_STATEMENT_TIMEOUT_MS)
+
+    return {
+        "echo": _echo_setting(),
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": {
+            "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    }
 
-DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DATABASE}"
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(DATABASE_URL, **engine_options())
+
+# Metadata reads get their own (smaller) pool so they never queue behind ETL loads
+read_engine = create_async_engine(
+    READ_REPLICA_URL or DATABASE_URL,
+    **engine_options(pool_size=max(DB_POOL_SIZE // 2, 1), max_overflow=DB_MAX_OVERFLOW // 2)
+)
 
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+ReadSessionLocal = sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only list/status queries (replica when configured)"""
+    async with ReadSessionLocal() as session:
+        yield session
+
+async def dispose_engines() -> None:
+    await engine.dispose()
+    await read_engine.dispose()
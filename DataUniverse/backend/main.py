@@ -1,7 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from .database import engine, Base
+from .database import engine, Base, dispose_engines
+from .utils import job_logging
+from .utils.rag_engine import ensure_rag_schema
+from .utils.rag_uploads import parse_queue
+from .utils.health_history import ensure_health_schema
+from .utils.s3_clients import registry as s3_clients
 from .routers import sources, etl, spark, rag, mapper, logs, transform, dask, cluster, extractors
 
 @asynccontextmanager
@@ -9,7 +14,19 @@ async def lifespan(app: FastAPI):
     # Create tables on startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await ensure_rag_schema(conn)
+    cluster.collector.start()
+    if await ensure_health_schema(engine):
+        cluster.sampler.start()
     yield
+    await cluster.sampler.stop()
+    await cluster.collector.stop()
+    parse_queue.shutdown()
+    s3_clients.close_all()
+    await dispose_engines()
+
+# Tag backend log records with the active ETL job/run
+job_logging.install()
 
 app = FastAPI(title="DataUniverse", version="1.0.0", lifespan=lifespan)
 
@@ -27,6 +44,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 app.include_router(sources.router)
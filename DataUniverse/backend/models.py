@@ -33,15 +33,37 @@ class ETLJob(Base):
     source = relationship("DataSource", foreign_keys=[source_id])
     target = relationship("DataSource", foreign_keys=[target_id])
 
+class ETLJobRun(Base):
+    __tablename__ = "etl_job_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("etl_jobs.id"), index=True)
+    run_id = Column(String(32), unique=True, index=True) # Same id as the run's job log
+    status = Column(String, default="running") # running, completed, failed
+    stats = Column(JSON, nullable=True) # Chunk sizing, peak memory and other run metrics
+    checkpoint = Column(JSON, nullable=True) # Last committed chunk: source offset, rows loaded, target schema
+    resumed_from = Column(String(32), nullable=True) # run_id of the failed run this one resumed
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
 class Document(Base):
     __tablename__ = "documents"
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String)
     content = Column(Text)
+    content_hash = Column(String(64), index=True) # sha256 of normalized content, used for dedup
     embedding = Column(Vector(1536)) # Assuming OpenAI Ada-002 size, adjustable
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+class EmbeddingCacheEntry(Base):
+    __tablename__ = "embedding_cache"
+
+    model_id = Column(String, primary_key=True)
+    content_hash = Column(String(64), primary_key=True)
+    embedding = Column(Vector(1536))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class TransformTemplate(Base):
     __tablename__ = "transform_templates"
 
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 import subprocess
 import os
 import time
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from ..database import AsyncSessionLocal, get_read_db
+from ..utils.cluster_status import ClusterStatusCollector
+from ..utils.health_history import HealthSampler, query_history
 
 router = APIRouter(prefix="/cluster", tags=["cluster"])
 
@@ -17,6 +22,9 @@ VM_PATHS = {
 GUEST_USER = "hduser"
 GUEST_PASS = "hadoop"
 
+collector = ClusterStatusCollector(VM_PATHS, GUEST_USER, GUEST_PASS)
+sampler = HealthSampler(collector, AsyncSessionLocal)
+
 class ServiceAction(BaseModel):
     service: str  # 'hadoop', 'spark', 'spark-connect', 'timescaledb', 'minio'
     action: str   # 'start', 'stop', 'status'
@@ -54,6 +62,7 @@ async def manage_vm_power(action: VmPowerAction):
         rc, out, err = run_vm_command(cmd)
         results.append({"node": node, "success": rc == 0, "error": err if rc != 0 else None})
     
+    collector.request_refresh()
     return {"results": results}
 
 @router.post("/manage")
@@ -134,64 +143,24 @@ async def manage_service(action: ServiceAction):
     }
 
 @router.get("/status")
-async def get_cluster_status():
-    master_vm = VM_PATHS["master"]
-    
-    # Check if VM is even running first
-    rc, list_out, _ = run_vm_command(["vmrun", "list"])
-    is_master_on = master_vm in list_out
-    
-    services = []
-    
-    # Only check guest services if master is on
-    if is_master_on:
-        exec_cmd = [
-            "vmrun", "-T", "ws", 
-            "-gu", GUEST_USER, "-gp", GUEST_PASS, 
-            "listProcessesInGuest", master_vm
-        ]
-        
-        rc, out, _ = run_vm_command(exec_cmd)
-        if rc == 0:
-            if "NameNode" in out: services.append("NameNode")
-            if "DataNode" in out: services.append("DataNode")
-            if "ResourceManager" in out: services.append("ResourceManager")
-            if "NodeManager" in out: services.append("NodeManager")
-            if "Master" in out: services.append("Master")
-            if "Worker" in out: services.append("Worker")
-            if "SparkConnectServer" in out: services.append("SparkConnectServer")
-    
-    # Check Docker services (always check host)
-    try:
-        docker_rc, docker_out, _ = run_vm_command(["docker", "compose", "ps", "--format", "json"])
-        if docker_rc == 0 and docker_out.strip():
-            import json
-            try:
-                ps_data = json.loads(docker_out)
-                if not isinstance(ps_data, list): ps_data = [ps_data]
-                for container in ps_data:
-                    if container.get("State") == "running" or container.get("Status", "").lower().startswith("up"):
-                        services.append(f"Docker:{container.get('Name')}")
-            except:
-                for line in docker_out.strip().split('\n'):
-                    try:
-                        container = json.loads(line)
-                        if container.get("State") == "running" or container.get("Status", "").lower().startswith("up"):
-                            services.append(f"Docker:{container.get('Name')}")
-                    except: continue
-    except:
-        pass
-
-    # Check for native MinIO process (always check host)
+async def get_cluster_status(refresh: bool = False):
+    """Cached cluster snapshot from the background collector; refresh=true forces a new probe"""
+    return await collector.get(force_refresh=refresh)
+
+@router.get("/history")
+async def get_cluster_history(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    component: Optional[str] = None,
+    resolution: str = "auto",
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Uptime/load history; ranges are served from continuous aggregates (raw, 5m or 1h buckets)"""
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
     try:
-        minio_rc, minio_out, _ = run_vm_command(["pgrep", "-f", "minio server"])
-        if minio_rc == 0:
-            services.append("Native:minio")
-    except:
-        pass
-
-    return {
-        "vm_status": "online" if is_master_on else "offline",
-        "services": services,
-        "running_vms": [node for node, path in VM_PATHS.items() if path in list_out]
-    }
+        return await query_history(db, start, end, component, resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,21 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import Dict, Any
-from ..database import get_db
-from ..models import ETLJob, DataSource
-from ..schemas import ETLJobCreate, ETLJobResponse
-from ..utils.file_readers import FileReader
+from typing import Dict, Any, Optional
+from ..database import get_db, get_read_db
+from ..models import ETLJob, ETLJobRun, DataSource, TransformTemplate
+from ..schemas import ETLJobCreate, ETLJobResponse, ETLJobRunResponse
+from ..utils.file_readers import FileReader, FilterReport, excel_sheet_to_chunk_files
 from ..utils.table_creator import TableCreator
 import logging
 import io
-import boto3
+import os
+import asyncio
+import tempfile
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
 from ..utils.etl_engine import ETLEngine
+from ..utils.job_logging import job_log_context
+from ..utils.pagination import PageParams, list_response
+from ..utils.compression import strip_codec_suffix
+from ..utils.read_plan import ReadPlan
+from ..utils.chunk_sizer import ChunkSizer
+from ..utils.partitioning import PartitionSpec
+from ..utils.datalake_reader import DatalakeReader, parse_location
+from ..utils.s3_clients import lease_s3_client, registry as s3_clients
+from ..utils.dtype_planner import DTYPE_PLANNER_ENABLED, SAMPLE_ROWS, DtypePlanner
 
 router = APIRouter(prefix="/etl", tags=["etl"])
 logger = logging.getLogger(__name__)
 
+# Result fields persisted on the run record
+RUN_STAT_KEYS = ("rows_inserted", "merge", "resumed_at", "staging_swap", "chunking", "datalake_read",
+                 "filter_report", "dtype_report", "partitioning")
+LOAD_MODES = ("replace", "staging", "merge")
+LOAD_MODE = os.getenv("ETL_LOAD_MODE", "replace")
+EXCEL_SHEET_WORKERS = int(os.getenv("EXCEL_SHEET_WORKERS", str(os.cpu_count() or 2)))
+
 @router.post("/", response_model=ETLJobResponse)
 async def create_etl_job(job: ETLJobCreate, db: AsyncSession = Depends(get_db)):
     """Create a new ETL job"""
@@ -25,59 +47,100 @@ async def create_etl_job(job: ETLJobCreate, db: AsyncSession = Depends(get_db)):
     await db.refresh(new_job)
     return new_job
 
-@router.get("/", response_model=list[ETLJobResponse])
-async def list_etl_jobs(db: AsyncSession = Depends(get_db)):
-    """List all ETL jobs"""
-    result = await db.execute(select(ETLJob))
-    return result.scalars().all()
+@router.get("/")
+async def list_etl_jobs(request: Request, page: PageParams = Depends(), db: AsyncSession = Depends(get_read_db)):
+    """List ETL jobs (keyset paginated, supports field projection and ETags)"""
+    return await list_response(request, db, ETLJob, page)
 
 @router.post("/execute/{job_id}")
 async def execute_etl_job(
     job_id: int,
     background_tasks: BackgroundTasks,
+    resume: bool = False,
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     Execute an ETL job - load data from source to target
+    resume: continue the job's last run from its checkpoint when that run failed,
+    instead of reloading the source from the start
     """
+    # Get the ETL job
+    result = await db.execute(select(ETLJob).filter(ETLJob.id == job_id))
+    job = result.scalar_one_or_none()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="ETL job not found")
+
+    # Get source and target data sources
+    source_result = await db.execute(select(DataSource).filter(DataSource.id == job.source_id))
+    source = source_result.scalar_one_or_none()
+
+    target_result = await db.execute(select(DataSource).filter(DataSource.id == job.target_id))
+    target = target_result.scalar_one_or_none()
+
+    if not source or not target:
+        raise HTTPException(status_code=404, detail="Source or target not found")
+
+    # A resume is checked before anything is recorded, so a refusal leaves the job as it was
+    previous = None
+    if resume:
+        last_result = await db.execute(
+            select(ETLJobRun).filter(ETLJobRun.job_id == job.id).order_by(ETLJobRun.id.desc()).limit(1)
+        )
+        previous = last_result.scalar_one_or_none()
+        if not previous or previous.status != "failed" or not previous.checkpoint:
+            raise HTTPException(status_code=409, detail="No failed run with a checkpoint to resume")
+        try:
+            await validate_resume(db, job, source, target, previous.checkpoint)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=f"Cannot resume run {previous.run_id}: {e}")
+
+    run_record = None
     try:
-        # Get the ETL job
-        result = await db.execute(select(ETLJob).filter(ETLJob.id == job_id))
-        job = result.scalar_one_or_none()
-        
-        if not job:
-            raise HTTPException(status_code=404, detail="ETL job not found")
-        
-        # Get source and target data sources
-        source_result = await db.execute(select(DataSource).filter(DataSource.id == job.source_id))
-        source = source_result.scalar_one_or_none()
-        
-        target_result = await db.execute(select(DataSource).filter(DataSource.id == job.target_id))
-        target = target_result.scalar_one_or_none()
-        
-        if not source or not target:
-            raise HTTPException(status_code=404, detail="Source or target not found")
-        
         # Update job status
         job.status = "running"
         await db.commit()
         
-        # Execute ETL based on source type
-        if source.source_type == "Flat Files":
-            if target.source_type == "Datalake/Lakehouse":
-                result = await execute_flat_file_to_datalake(source, target, job, db)
+        # Capture this run's logs so /logs/stream?job_id=... can follow it
+        with job_log_context(job.id) as run:
+            run_record = ETLJobRun(job_id=job.id, run_id=run.run_id, status="running")
+            if previous:
+                # Carry the checkpoint over so a failure before the next chunk can resume again
+                run_record.resumed_from = previous.run_id
+                run_record.checkpoint = dict(previous.checkpoint)
+            db.add(run_record)
+            await db.commit()
+            logger.info(f"Starting run {run.run_id} of ETL job {job.id}"
+                        + (f", resuming run {previous.run_id}" if previous else ""))
+            # Execute ETL based on source type
+            if source.source_type == "Flat Files":
+                if target.source_type == "Datalake/Lakehouse":
+                    result = await execute_flat_file_to_datalake(source, target, job, db)
+                else:
+                    result = await execute_flat_file_to_db(
+                        source, target, job, db, run_record=run_record,
+                        resume_from=previous.checkpoint if previous else None
+                    )
+            elif source.source_type == "Datalake/Lakehouse":
+                if target.source_type == "Datalake/Lakehouse":
+                    result = await execute_datalake_to_datalake(source, target, job, db)
+                else:
+                    result = await execute_datalake_to_db(source, target, job, db)
             else:
-                result = await execute_flat_file_to_db(source, target, job, db)
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Source type {source.source_type} not yet supported"
-            )
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Source type {source.source_type} not yet supported"
+                )
+            logger.info(f"Run {run.run_id} of ETL job {job.id} completed")
         
         # Update job status
         job.status = "completed"
+        run_record.status = "completed"
+        run_record.stats = {k: result[k] for k in RUN_STAT_KEYS if k in result}
+        run_record.finished_at = datetime.now(timezone.utc)
         await db.commit()
         
+        result["run_id"] = run.run_id
         return result
         
     except Exception as e:
@@ -85,17 +148,375 @@ async def execute_etl_job(
         # Update job status to failed
         if job:
             job.status = "failed"
+            if run_record is not None:
+                run_record.status = "failed"
+                run_record.stats = {"error": str(e)}
+                run_record.finished_at = datetime.now(timezone.utc)
             await db.commit()
+        if isinstance(e, HTTPException):
+            raise
         raise HTTPException(status_code=500, detail=str(e))
 
+def process_chunk(df: pd.DataFrame, config: Optional[Dict[str, Any]], plan: Optional[ReadPlan]) -> pd.DataFrame:
+    """Apply YAML DQ rules and transformations if config present, then the read plan"""
+    if config:
+        if "data_quality" in config:
+            df = ETLEngine.apply_quality_rules(df, config["data_quality"])
+        if "transformations" in config:
+            df = ETLEngine.apply_transformations(df, config["transformations"])
+    if plan:
+        df = plan.apply(df)
+    return df
+
+async def load_chunks_to_table(
+    db: AsyncSession,
+    chunks,
+    table_name: str,
+    config: Optional[Dict[str, Any]] = None,
+    create_table: bool = True,
+    plan: Optional[ReadPlan] = None,
+    sizer: Optional[ChunkSizer] = None,
+    run_record: Optional[ETLJobRun] = None,
+    resume_from: Optional[Dict[str, Any]] = None,
+    source_state: Optional[Dict[str, Any]] = None,
+    staging: bool = False,
+    partitioning: Optional[PartitionSpec] = None
+) -> Dict[str, Any]:
+    """
+    DQ/transform every chunk, narrow it to the mapped columns when a read plan is
+    given, create the table from the first processed chunk's schema (unless
+    create_table is False, i.e. appending to a table created earlier) and insert
+    sizer: measures each chunk and supplies the insert batch size
+    run_record: receives a checkpoint with every chunk, committed together with the
+                chunk's rows (chunks need attrs["source_offset"] from the reader)
+    resume_from: checkpoint of a failed run; the table and its schema are reused and
+                 the counters continue from it
+    source_state: identity of the source file, stored in the checkpoint
+    staging: create table_name as an UNLOGGED staging table without a primary key
+    partitioning: create a hypertable / range-partitioned table on its time column;
+                  range partitions are added for the times of each chunk before insert
+    Returns: dict with rows_inserted, columns and column_count
+    """
+    first_chunk = True
+    total_inserted = 0
+    column_count = 0
+    columns = []
+    schema: Dict[str, str] = {}
+    chunks_loaded = 0
+    rows_loaded = 0
+    partitions: set = set()
+    if resume_from:
+        first_chunk = False
+        schema = resume_from["schema"]
+        columns = resume_from["columns"]
+        column_count = len(columns)
+        chunks_loaded = resume_from["chunks"]
+        rows_loaded = resume_from["rows_loaded"]
+
+    for df in chunks:
+        if sizer:
+            sizer.observe(df)
+        source_offset = df.attrs.get("source_offset")
+        df = process_chunk(df, config, plan)
+        if partitioning:
+            df = partitioning.prepare(df)
+
+        if first_chunk:
+            # Infer schema from first chunk
+            schema = plan.table_schema(df) if plan else FileReader._infer_schema(df)
+            if partitioning:
+                schema = partitioning.apply_schema(schema)
+            column_count = len(schema)
+            columns = list(schema.keys())
+            
+            # Create table
+            if create_table:
+                logger.info(f"Creating table: {table_name}")
+                await TableCreator.create_table(
+                    db=db,
+                    table_name=table_name,
+                    schema=schema,
+                    drop_if_exists=True,
+                    staging=staging,
+                    partitioning=partitioning
+                )
+            first_chunk = False
+        elif resume_from and list(df.columns) != columns:
+            df = df.reindex(columns=columns)
+
+        chunks_loaded += 1
+        rows_loaded += len(df)
+        if run_record is not None and source_offset is not None:
+            # A new dict so the JSON column is flagged dirty; insert_data's commit persists it with the rows
+            run_record.checkpoint = {
+                "source": source_state,
+                "source_offset": source_offset,
+                "chunks": chunks_loaded,
+                "rows_loaded": rows_loaded,
+                "table_name": table_name,
+                "schema": schema,
+                "columns": columns,
+            }
+
+        if partitioning and partitioning.strategy == "range":
+            await TableCreator.ensure_partitions(db, table_name, partitioning, df[partitioning.time_column], partitions)
+
+        # Insert this chunk
+        data = df.to_dict('records')
+        logger.info(f"Inserting chunk: {len(data)} rows")
+        insert_result = await TableCreator.insert_data(
+            db=db,
+            table_name=table_name,
+            data=data,
+            batch_size=sizer.insert_rows if sizer else 1000
+        )
+        total_inserted += insert_result["inserted_rows"]
+
+    return {
+        "rows_inserted": total_inserted,
+        "columns": columns,
+        "column_count": column_count
+    }
+
+async def merge_chunks_into_table(
+    db: AsyncSession,
+    chunks,
+    table_name: str,
+    config: Optional[Dict[str, Any]],
+    load: Dict[str, Any],
+    plan: Optional[ReadPlan] = None,
+    sizer: Optional[ChunkSizer] = None,
+    partitioning: Optional[PartitionSpec] = None
+) -> Dict[str, Any]:
+    """
+    Upsert every processed chunk into table_name on load["merge_keys"], creating the
+    table from the first chunk's schema when it does not exist yet; with
+    load["delete_missing"], target rows whose keys were not in the source are
+    deleted once all chunks are merged
+    partitioning: as for load_chunks_to_table; merge keys must then include the time column
+    Returns: dict with rows_inserted, columns, column_count and the merge counts
+    """
+    keys = load["merge_keys"]
+    counts = {"staged": 0, "inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+    columns: list = []
+    key_table = None
+    first_chunk = True
+    partitions: set = set()
+
+    for df in chunks:
+        if sizer:
+            sizer.observe(df)
+        df = process_chunk(df, config, plan)
+        if partitioning:
+            df = partitioning.prepare(df)
+
+        if first_chunk:
+            missing = [k for k in keys if k not in df.columns]
+            if missing:
+                raise ValueError(f"Merge key columns not found: {missing}")
+            schema = plan.table_schema(df) if plan else FileReader._infer_schema(df)
+            if partitioning:
+                schema = partitioning.apply_schema(schema)
+            columns = list(schema.keys())
+            if not await TableCreator.table_exists(db, table_name):
+                logger.info(f"Creating table: {table_name}")
+                await TableCreator.create_table(db=db, table_name=table_name, schema=schema, drop_if_exists=False,
+                                                partitioning=partitioning)
+            await TableCreator.ensure_merge_key(db, table_name, keys, partitioning)
+            if load["delete_missing"]:
+                key_table = await TableCreator.create_key_table(db, table_name, keys)
+            first_chunk = False
+
+        if partitioning and partitioning.strategy == "range":
+            await TableCreator.ensure_partitions(db, table_name, partitioning, df[partitioning.time_column], partitions)
+        merged = await TableCreator.merge_data(
+            db, table_name, df.to_dict('records'), keys,
+            batch_size=sizer.insert_rows if sizer else 1000, key_table=key_table
+        )
+        for k, v in merged.items():
+            counts[k] += v
+
+    if key_table:
+        counts["deleted"] = await TableCreator.delete_missing_rows(db, table_name, key_table, keys)
+    elif load["delete_missing"]:
+        logger.warning(f"Source produced no rows; not deleting anything from {table_name}")
+
+    return {
+        "rows_inserted": counts["inserted"],
+        "columns": columns,
+        "column_count": len(columns),
+        "merge": counts
+    }
+
+def source_state(full_path: Path) -> Dict[str, Any]:
+    """Identity of a source file, compared before resuming from a checkpoint"""
+    stat = full_path.stat()
+    return {"path": str(full_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+async def validate_resume(db: AsyncSession, job: ETLJob, source: DataSource, target: DataSource,
+                          checkpoint: Dict[str, Any]) -> None:
+    """
+    Check that a failed run can continue from its checkpoint: a single-table flat
+    file to database load whose source file is unchanged and whose table still has
+    the checkpointed columns and at least the rows loaded so far
+    Raises: ValueError saying why the run has to start over
+    """
+    if source.source_type != "Flat Files" or target.source_type == "Datalake/Lakehouse":
+        raise ValueError("resume is only supported for flat file to database loads")
+    details = source.connection_details or {}
+    file_name = details.get("Source File Name", "data")
+    if details.get("Source File Type", "csv").lower() in ['excel', 'xlsx', 'xlsm'] and details.get("Excel Sheets"):
+        raise ValueError("resume is not supported for multi-sheet Excel loads")
+    config = ETLEngine.load_config(job.yaml_config) if job.yaml_config else None
+    load = target_load_options(config)
+    if load["mode"] == "merge":
+        raise ValueError("merge loads are idempotent; run the job again instead of resuming")
+
+    full_path = Path(details.get("Source File Path") or "") / file_name
+    if not full_path.exists() or checkpoint.get("source") != source_state(full_path):
+        raise ValueError(f"source file {full_path} changed since the checkpoint")
+    table_name = TableCreator._sanitize_table_name(strip_codec_suffix(file_name))
+    load_table = TableCreator.staging_table_name(table_name) if load["mode"] == "staging" else table_name
+    if checkpoint.get("table_name") != load_table:
+        raise ValueError(f"checkpoint was taken for table {checkpoint.get('table_name')}, not {load_table}")
+    if not await TableCreator.table_exists(db, load_table):
+        raise ValueError(f"table {load_table} no longer exists")
+    expected = {TableCreator._sanitize_column_name(c) for c in checkpoint["columns"]}
+    actual = set(await TableCreator.table_columns(db, load_table)) - {"id", "created_at"}
+    if actual != expected:
+        raise ValueError(f"columns of {load_table} changed since the checkpoint "
+                         f"(missing {sorted(expected - actual)}, added {sorted(actual - expected)})")
+    rows = await TableCreator.row_count(db, load_table)
+    if rows < checkpoint["rows_loaded"]:
+        raise ValueError(f"{load_table} has {rows} rows, fewer than the {checkpoint['rows_loaded']} checkpointed")
+
+async def target_partitioning(db: AsyncSession, job: ETLJob, table_name: str,
+                              config: Optional[Dict[str, Any]]) -> Optional[PartitionSpec]:
+    """
+    Partitioning of the target table: the job YAML target.partitioning section, else
+    the "partitioning" entry of the TransformTemplate defined for this target table
+    """
+    spec = ((config or {}).get("target") or {}).get("partitioning")
+    if not spec:
+        result = await db.execute(
+            select(TransformTemplate)
+            .filter(TransformTemplate.target_source_id == job.target_id,
+                    TransformTemplate.target_entity_name == table_name)
+            .order_by(TransformTemplate.id.desc())
+            .limit(1)
+        )
+        template = result.scalar_one_or_none()
+        spec = ((template.config or {}).get("partitioning") if template else None)
+    return PartitionSpec.from_config(spec)
+
+def target_load_options(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Load mode from the job YAML target section (ETL_LOAD_MODE by default):
+    "replace" recreates the live table and loads into it, "staging" loads an
+    UNLOGGED copy and swaps it in once its primary key and indexes are built, and
+    "merge" upserts into the existing table on target.merge_keys (deleting rows
+    missing from the source with target.delete_missing: true)
+    """
+    target = (config or {}).get("target") or {}
+    mode = str(target.get("load_mode", LOAD_MODE)).lower()
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown target.load_mode '{mode}', expected one of {LOAD_MODES}")
+    keys = target.get("merge_keys") or []
+    if isinstance(keys, str):
+        keys = [keys]
+    if mode == "merge" and not keys:
+        raise ValueError("target.load_mode 'merge' requires target.merge_keys")
+    return {
+        "mode": mode,
+        "indexes": target.get("indexes") or [],
+        "merge_keys": keys,
+        "delete_missing": bool(target.get("delete_missing", False))
+    }
+
+def source_filters(config: Optional[Dict[str, Any]]) -> list:
+    """AND-ed (column, op, value) filters from the job YAML source.filter section"""
+    return FileReader.parse_filters(((config or {}).get("source") or {}).get("filter"))
+
+def source_read_options(source: DataSource, plan: Optional[ReadPlan],
+                        filters: list, report: Optional[FilterReport] = None) -> Dict[str, Any]:
+    """Reader options for a flat-file source: read plan projection/dtypes and filter pushdown"""
+    options = FileReader.reader_options(source.connection_details)
+    if plan:
+        options.update(plan.reader_options())
+    if filters:
+        options["filters"] = filters
+        options["filter_report"] = report
+    return options
+
+def plan_dtypes(full_path: Path, file_type: str, options: Dict[str, Any],
+                config: Optional[Dict[str, Any]]) -> Optional[DtypePlanner]:
+    """
+    Plan memory-optimized dtypes from a sample of the source and merge them into
+    the reader options; disabled by ETL_DTYPE_PLANNER=false or source.dtype_planner: false
+    """
+    if not ((config or {}).get("source") or {}).get("dtype_planner", DTYPE_PLANNER_ENABLED):
+        return None
+    sample_options = {k: v for k, v in options.items() if k != "filter_report"}
+    chunks = FileReader.get_iterator(str(full_path), file_type, chunk_size=SAMPLE_ROWS, **sample_options)
+    try:
+        sample = next(iter(chunks), None)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    if sample is None:
+        return None
+    planner = DtypePlanner()
+    planner.plan(sample, DtypePlanner.referenced_columns(config, sample.columns))
+    # Dtypes declared by the mapping take precedence
+    options["dtype"] = {**planner.dtypes, **(options.get("dtype") or {})}
+    return planner
+
+async def write_chunks_to_db(
+    db: AsyncSession,
+    chunks,
+    table_name: str,
+    config: Optional[Dict[str, Any]],
+    load: Dict[str, Any],
+    plan: Optional[ReadPlan] = None,
+    sizer: Optional[ChunkSizer] = None,
+    partitioning: Optional[PartitionSpec] = None,
+    run_record: Optional[ETLJobRun] = None,
+    resume_from: Optional[Dict[str, Any]] = None,
+    state: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Write chunks to table_name in the target load mode (replace, staging swap or merge)
+    Returns: the load result plus staging_swap / partitioning details
+    """
+    staging = load["mode"] == "staging"
+    if load["mode"] == "merge":
+        loaded = await merge_chunks_into_table(db, chunks, table_name, config, load, plan=plan, sizer=sizer,
+                                               partitioning=partitioning)
+    else:
+        load_table = TableCreator.staging_table_name(table_name) if staging else table_name
+        loaded = await load_chunks_to_table(db, chunks, load_table, config, create_table=not resume_from,
+                                            plan=plan, sizer=sizer, run_record=run_record,
+                                            resume_from=resume_from, source_state=state, staging=staging,
+                                            partitioning=partitioning)
+        if staging:
+            loaded["staging_swap"] = await TableCreator.swap_staging_table(db, load_table, table_name, load["indexes"])
+    if partitioning:
+        loaded["partitioning"] = partitioning.report()
+    return loaded
+
 async def execute_flat_file_to_db(
     source: DataSource,
     target: DataSource,
     job: ETLJob,
-    db: AsyncSession
+    db: AsyncSession,
+    run_record: Optional[ETLJobRun] = None,
+    resume_from: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Execute ETL from flat file to database
+    run_record: checkpointed after every committed chunk
+    resume_from: checkpoint of a failed run, already checked by validate_resume;
+                 the source is reopened at its offset
     """
     try:
         # Get file details from source connection_details
@@ -108,74 +529,222 @@ async def execute_flat_file_to_db(
             
         full_path = Path(file_path) / file_name
         
-        # Use iterator for large files
-        logger.info(f"Processing file in chunks: {full_path}")
-        chunks = FileReader.get_iterator(str(full_path), file_type, chunk_size=10000)
-        
         # Load YAML config if present
         config = None
         if job.yaml_config:
             config = ETLEngine.load_config(job.yaml_config)
             logger.info(f"Loaded YAML config for job {job.id}")
+        plan = ReadPlan.compile(job.mapping_config, config)
+        filters = source_filters(config)
+        report = FilterReport(filters)
+        sizer = ChunkSizer.from_config(config, initial_rows=10000)
+        load = target_load_options(config)
+        staging = load["mode"] == "staging"
 
-        table_name = TableCreator._sanitize_table_name(file_name)
-        first_chunk = True
-        total_inserted = 0
-        column_count = 0
-        columns = []
+        table_name = TableCreator._sanitize_table_name(strip_codec_suffix(file_name))
+        partitioning = await target_partitioning(db, job, table_name, config)
+        if partitioning and staging:
+            raise ValueError("The staging load mode does not support partitioned targets")
 
-        for df in chunks:
-            if first_chunk:
-                # Infer schema from first chunk
-                schema = FileReader._infer_schema(df)
-                column_count = len(schema)
-                columns = list(schema.keys())
-                
-                # Create table
-                logger.info(f"Creating table: {table_name}")
-                await TableCreator.create_table(
-                    db=db,
-                    table_name=table_name,
-                    schema=schema,
-                    drop_if_exists=True
-                )
-                first_chunk = False
-            
-            # Apply YAML transformations and DQ rules if config present
-            if config:
-                if "data_quality" in config:
-                    df = ETLEngine.apply_quality_rules(df, config["data_quality"])
-                if "transformations" in config:
-                    df = ETLEngine.apply_transformations(df, config["transformations"])
-
-            # Insert this chunk
-            data = df.to_dict('records')
-            logger.info(f"Inserting chunk: {len(data)} rows")
-            insert_result = await TableCreator.insert_data(
-                db=db,
-                table_name=table_name,
-                data=data,
-                batch_size=1000
-            )
-            total_inserted += insert_result["inserted_rows"]
+        # Multi-sheet workbooks are parsed in parallel worker processes
+        if file_type.lower() in ['excel', 'xlsx', 'xlsm'] and source.connection_details.get("Excel Sheets"):
+            if load["mode"] == "merge":
+                raise ValueError("Merge loads are not supported for multi-sheet Excel sources")
+            return await execute_excel_sheets_to_db(source, full_path, table_name, config, db, plan, filters,
+                                                    report, sizer, load, partitioning)
+
+        # Use iterator for large files
+        logger.info(f"Processing file in chunks: {full_path}")
+        options = source_read_options(source, plan, filters, report)
+        state = source_state(full_path)
+        if resume_from:
+            options["skip_rows"] = resume_from["source_offset"]
+            logger.info(f"Resuming at source record {resume_from['source_offset']} "
+                        f"({resume_from['rows_loaded']} rows already loaded)")
+        planner = plan_dtypes(full_path, file_type, options, config)
+        chunks = FileReader.get_iterator(str(full_path), file_type, chunk_size=sizer, **options)
+        if planner:
+            chunks = planner.apply(chunks)
+        loaded = await write_chunks_to_db(db, chunks, table_name, config, load, plan, sizer, partitioning,
+                                          run_record=run_record, resume_from=resume_from, state=state)
         
-        return {
+        result = {
             "success": True,
             "message": "ETL job completed successfully (chunked)",
             "table_name": table_name,
-            "rows_inserted": total_inserted,
-            "columns": columns,
-            "column_count": column_count
+            **loaded,
+            "chunking": sizer.report()
         }
+        if resume_from:
+            result["resumed_at"] = {"source_offset": resume_from["source_offset"],
+                                    "rows_loaded": resume_from["rows_loaded"]}
+        if filters:
+            result["filter_report"] = report.to_dict()
+        if planner:
+            result["dtype_report"] = planner.report()
+        return result
         
     except Exception as e:
         logger.error(f"Error in flat file to DB ETL: {e}")
         raise
 
+async def execute_excel_sheets_to_db(
+    source: DataSource,
+    full_path: Path,
+    table_name: str,
+    config: Optional[Dict[str, Any]],
+    db: AsyncSession,
+    plan: Optional[ReadPlan] = None,
+    filters: Optional[list] = None,
+    report: Optional[FilterReport] = None,
+    sizer: Optional[ChunkSizer] = None,
+    load: Optional[Dict[str, Any]] = None,
+    partitioning: Optional[PartitionSpec] = None
+) -> Dict[str, Any]:
+    """
+    Ingest several sheets of a workbook: each sheet is streamed by a worker process
+    into chunk files, which are then loaded into one table ("Excel Sheet Target": "single")
+    or one table per sheet ("separate")
+    load: target_load_options; in staging mode every table is swapped in after all sheets loaded
+    """
+    staging = bool(load) and load["mode"] == "staging"
+    load_name = TableCreator.staging_table_name if staging else (lambda name: name)
+    details = source.connection_details
+    requested = details.get("Excel Sheets")
+    all_sheets = FileReader.excel_sheet_names(str(full_path))
+    if requested == "all":
+        sheets = all_sheets
+    else:
+        sheets = [s.strip() for s in requested.split(",")] if isinstance(requested, str) else list(requested)
+        missing = [s for s in sheets if s not in all_sheets]
+        if missing:
+            raise ValueError(f"Sheets not found in workbook: {missing}")
+    separate = details.get("Excel Sheet Target", "single") == "separate"
+
+    workers = min(len(sheets), EXCEL_SHEET_WORKERS)
+    # Workers project like the single-sheet reader (filter columns stay until the filters ran)
+    # and split the job's memory budget, since their chunks are parsed at the same time
+    usecols = plan.usecols if plan else None
+    if usecols is not None:
+        usecols = usecols + [c for c, _, _ in filters or [] if c not in usecols]
+    worker_budget_mb = (sizer or ChunkSizer()).budget_bytes / 1024 ** 2 / workers
+    logger.info(f"Parsing {len(sheets)} sheets of {full_path} with {workers} worker processes "
+                f"({worker_budget_mb:.0f} MB budget each)")
+    loop = asyncio.get_running_loop()
+    with tempfile.TemporaryDirectory(prefix="excel_sheets_") as out_dir, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            loop.run_in_executor(pool, excel_sheet_to_chunk_files, str(full_path), sheet, out_dir,
+                                 sizer.read_rows if sizer else 10000, usecols, worker_budget_mb)
+            for sheet in sheets
+        ]
+
+        tables = []
+        total_inserted = 0
+        columns: list = []
+        first_table = True
+        # Load sheets in order as their workers finish parsing
+        for future in futures:
+            parsed = await future
+            chunks = (pd.read_pickle(path) for path in parsed["files"])
+            if filters:
+                chunks = FileReader._filter_chunks(chunks, filters, report)
+            if separate:
+                sheet_table = TableCreator._sanitize_table_name(f"{table_name}_{parsed['sheet']}")
+                loaded = await load_chunks_to_table(db, chunks, load_name(sheet_table), config, plan=plan,
+                                                    sizer=sizer, staging=staging, partitioning=partitioning)
+                tables.append(sheet_table)
+            else:
+                if columns and not plan:
+                    # Align later sheets with the columns of the table created from the first one
+                    chunks = (df.reindex(columns=columns) for df in chunks)
+                loaded = await load_chunks_to_table(db, chunks, load_name(table_name), config,
+                                                    create_table=first_table, plan=plan, sizer=sizer,
+                                                    staging=staging, partitioning=partitioning)
+                if first_table and loaded["columns"]:
+                    columns = loaded["columns"]
+                    first_table = False
+                if table_name not in tables:
+                    tables.append(table_name)
+            total_inserted += loaded["rows_inserted"]
+            logger.info(f"Loaded sheet {parsed['sheet']}: {loaded['rows_inserted']} rows")
+
+    swaps = []
+    if staging:
+        for name in tables:
+            swaps.append(await TableCreator.swap_staging_table(db, load_name(name), name, load["indexes"]))
+
+    result = {
+        "success": True,
+        "message": f"ETL job completed successfully ({len(sheets)} sheets)",
+        "table_name": tables[0] if len(tables) == 1 else tables,
+        "rows_inserted": total_inserted,
+        "sheets": sheets,
+        "columns": columns,
+        "column_count": len(columns)
+    }
+    if sizer:
+        result["chunking"] = sizer.report()
+    if swaps:
+        result["staging_swap"] = swaps
+    if partitioning:
+        result["partitioning"] = partitioning.report()
+    if filters:
+        result["filter_report"] = report.to_dict()
+    return result
+
 import pyarrow as pa
 import pyarrow.parquet as pq
-import tempfile
-import os
+
+@contextmanager
+def datalake_client(connection_details: Dict[str, Any]):
+    """Lease the shared S3/MinIO client of a Datalake/Lakehouse data source: yields (client, location)"""
+    access_key = connection_details.get("Access Key")
+    secret_key = connection_details.get("Secret Key")
+    s3_location = connection_details.get("Datalake Location") or connection_details.get("S3 Location")
+    endpoint_url = connection_details.get("Endpoint URL")
+    
+    if not all([access_key, secret_key, s3_location]):
+        raise ValueError("Incomplete Datalake connection details (Access Key, Secret Key, and Datalake Location are required)")
+    
+    with lease_s3_client(access_key, secret_key, endpoint_url, connection_details.get("Region")) as client:
+        yield client, s3_location
+
+def datalake_table_name(connection_details: Dict[str, Any], s3_location: str) -> str:
+    """Target table for a datalake source: "Table Name", else the last segment of the location"""
+    bucket, prefix = parse_location(s3_location)
+    name = connection_details.get("Table Name") or prefix.rstrip('/').rsplit('/', 1)[-1] or bucket
+    return TableCreator._sanitize_table_name(name)
+
+def write_chunks_to_parquet(
+    chunks,
+    path: str,
+    config: Optional[Dict[str, Any]],
+    plan: Optional[ReadPlan],
+    sizer: ChunkSizer,
+    planner: Optional[DtypePlanner] = None
+) -> int:
+    """DQ/transform every chunk and write it as one row group of a Parquet file; returns the row count"""
+    writer = None
+    total_rows = 0
+    try:
+        for df in chunks:
+            sizer.observe(df)
+            df = process_chunk(df, config, plan)
+            
+            table = pa.Table.from_pandas(df)
+            if planner:
+                # Per-chunk downcasts must not change the file schema between chunks
+                table = table.cast(DtypePlanner.storage_schema(table.schema))
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            total_rows += len(df)
+            logger.info(f"Converted chunk: {len(df)} rows. Total: {total_rows}")
+    finally:
+        if writer:
+            writer.close()
+    return total_rows
 
 async def execute_flat_file_to_datalake(
     source: DataSource,
@@ -198,93 +767,166 @@ async def execute_flat_file_to_datalake(
             
         full_path = Path(file_path) / file_name
         
-        # Get target datalake details
-        access_key = target.connection_details.get("Access Key")
-        secret_key = target.connection_details.get("Secret Key")
-        s3_location = target.connection_details.get("Datalake Location") or target.connection_details.get("S3 Location")
-        endpoint_url = target.connection_details.get("Endpoint URL")
-        
-        if not all([access_key, secret_key, s3_location]):
-            raise ValueError("Incomplete Datalake connection details (Access Key, Secret Key, and Datalake Location are required)")
-            
-        # Parse S3 location
-        if s3_location.startswith("s3://"):
-            s3_path = s3_location[5:]
-        elif s3_location.startswith("s3a://"):
-            s3_path = s3_location[6:]
-        else:
-            s3_path = s3_location
-            
-        parts = s3_path.split('/', 1)
-        bucket = parts[0]
-        prefix = parts[1] if len(parts) > 1 else ""
-        
         # Connect to S3/MinIO
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            endpoint_url=endpoint_url
-        )
-        
-        target_key = f"{prefix}/{file_name.replace('.csv', '')}.parquet"
-        
-        # Process in chunks and convert to Parquet
-        logger.info(f"Converting {full_path} to Parquet in chunks...")
+        with datalake_client(target.connection_details) as (s3_client, s3_location):
+            bucket, prefix = parse_location(s3_location)
+
+            target_key = f"{prefix}/{strip_codec_suffix(file_name).replace('.csv', '').replace('.parquet', '')}.parquet"
+
+            # Process in chunks and convert to Parquet
+            logger.info(f"Converting {full_path} to Parquet in chunks...")
+
+            with tempfile.NamedTemporaryFile(suffix='.parquet', delete=False) as tmp:
+                temp_parquet = tmp.name
+
+                # Load YAML config if present
+                config = None
+                if job.yaml_config:
+                    config = ETLEngine.load_config(job.yaml_config)
+                plan = ReadPlan.compile(job.mapping_config, config)
+                filters = source_filters(config)
+                report = FilterReport(filters)
+                sizer = ChunkSizer.from_config(config, initial_rows=50000)
+
+                # Use chunks to avoid memory issues; each chunk becomes one row group
+                options = source_read_options(source, plan, filters, report)
+                planner = plan_dtypes(full_path, file_type, options, config)
+                chunks = FileReader.get_iterator(str(full_path), file_type, chunk_size=sizer, **options)
+                if planner:
+                    chunks = planner.apply(chunks)
+                total_rows = write_chunks_to_parquet(chunks, temp_parquet, config, plan, sizer, planner)
+
+            logger.info(f"Uploading Parquet file to S3: {bucket}/{target_key}")
+            s3_client.upload_file(temp_parquet, bucket, target_key, Config=s3_clients.transfer_config())
+
+            result = {
+                "success": True,
+                "message": "Data successfully converted to Parquet and persisted to Datalake",
+                "table_name": target_key,
+                "rows_inserted": total_rows,
+                "columns": [],
+                "column_count": 0,
+                "chunking": sizer.report()
+            }
+            if filters:
+                result["filter_report"] = report.to_dict()
+            if planner:
+                result["dtype_report"] = planner.report()
+            return result
         
-        with tempfile.NamedTemporaryFile(suffix='.parquet', delete=False) as tmp:
-            temp_parquet = tmp.name
-            
-            # Use chunks to avoid memory issues
-            chunks = FileReader.get_iterator(str(full_path), file_type, chunk_size=50000)
-            
-            # Load YAML config if present
+    except Exception as e:
+        logger.error(f"Error in flat file to Datalake (Parquet) ETL: {e}")
+        raise
+    finally:
+        if temp_parquet and os.path.exists(temp_parquet):
+            os.remove(temp_parquet)
+
+async def execute_datalake_to_db(
+    source: DataSource,
+    target: DataSource,
+    job: ETLJob,
+    db: AsyncSession
+) -> Dict[str, Any]:
+    """
+    Execute ETL from the Parquet objects under a datalake location to database
+    Row groups are streamed with concurrent ranged reads instead of downloading objects
+    """
+    try:
+        with datalake_client(source.connection_details) as (s3_client, s3_location):
+            table_name = datalake_table_name(source.connection_details, s3_location)
+
             config = None
             if job.yaml_config:
                 config = ETLEngine.load_config(job.yaml_config)
+                logger.info(f"Loaded YAML config for job {job.id}")
+            plan = ReadPlan.compile(job.mapping_config, config)
+            filters = source_filters(config)
+            report = FilterReport(filters)
+            sizer = ChunkSizer.from_config(config, initial_rows=10000)
+            load = target_load_options(config)
+            partitioning = await target_partitioning(db, job, table_name, config)
+            if partitioning and load["mode"] == "staging":
+                raise ValueError("The staging load mode does not support partitioned targets")
 
-            writer = None
-            total_rows = 0
-            
-            for df in chunks:
-                # Apply YAML transformations and DQ rules if config present
-                if config:
-                    if "data_quality" in config:
-                        df = ETLEngine.apply_quality_rules(df, config["data_quality"])
-                    if "transformations" in config:
-                        df = ETLEngine.apply_transformations(df, config["transformations"])
-                
-                table = pa.Table.from_pandas(df)
-                if writer is None:
-                    writer = pq.ParquetWriter(temp_parquet, table.schema)
-                writer.write_table(table)
-                total_rows += len(df)
-                logger.info(f"Converted chunk: {len(df)} rows. Total: {total_rows}")
-            
-            if writer:
-                writer.close()
-        
-        logger.info(f"Uploading Parquet file to S3: {bucket}/{target_key}")
-        s3_client.upload_file(temp_parquet, bucket, target_key)
+            read_stats: Dict[str, int] = {}
+            chunks = DatalakeReader.iter_parquet(s3_client, s3_location, sizer, plan.usecols if plan else None,
+                                                 filters, report, stats=read_stats)
+            loaded = await write_chunks_to_db(db, chunks, table_name, config, load, plan, sizer, partitioning)
+
+            result = {
+                "success": True,
+                "message": "ETL job completed successfully (datalake source)",
+                "table_name": table_name,
+                **loaded,
+                "chunking": sizer.report(),
+                "datalake_read": read_stats
+            }
+            if filters:
+                result["filter_report"] = report.to_dict()
+            return result
         
-        return {
-            "success": True,
-            "message": "Data successfully converted to Parquet and persisted to Datalake",
-            "table_name": target_key,
-            "rows_inserted": total_rows,
-            "columns": [],
-            "column_count": 0
-        }
+    except Exception as e:
+        logger.error(f"Error in Datalake to DB ETL: {e}")
+        raise
+
+async def execute_datalake_to_datalake(
+    source: DataSource,
+    target: DataSource,
+    job: ETLJob,
+    db: AsyncSession
+) -> Dict[str, Any]:
+    """
+    Reprocess the Parquet objects under a datalake location into one Parquet object
+    of the target location, streaming row groups with concurrent ranged reads
+    """
+    temp_parquet = None
+    try:
+        with datalake_client(source.connection_details) as (source_client, source_location), \
+                datalake_client(target.connection_details) as (target_client, target_location):
+            bucket, prefix = parse_location(target_location)
+            target_key = f"{prefix}/{datalake_table_name(source.connection_details, source_location)}.parquet"
+
+            config = None
+            if job.yaml_config:
+                config = ETLEngine.load_config(job.yaml_config)
+            plan = ReadPlan.compile(job.mapping_config, config)
+            filters = source_filters(config)
+            report = FilterReport(filters)
+            sizer = ChunkSizer.from_config(config, initial_rows=50000)
+
+            read_stats: Dict[str, int] = {}
+            with tempfile.NamedTemporaryFile(suffix='.parquet', delete=False) as tmp:
+                temp_parquet = tmp.name
+                chunks = DatalakeReader.iter_parquet(source_client, source_location, sizer,
+                                                     plan.usecols if plan else None, filters, report, stats=read_stats)
+                total_rows = write_chunks_to_parquet(chunks, temp_parquet, config, plan, sizer)
+
+            logger.info(f"Uploading Parquet file to S3: {bucket}/{target_key}")
+            target_client.upload_file(temp_parquet, bucket, target_key, Config=s3_clients.transfer_config())
+
+            result = {
+                "success": True,
+                "message": "Datalake data reprocessed to Parquet and persisted to Datalake",
+                "table_name": target_key,
+                "rows_inserted": total_rows,
+                "columns": [],
+                "column_count": 0,
+                "chunking": sizer.report(),
+                "datalake_read": read_stats
+            }
+            if filters:
+                result["filter_report"] = report.to_dict()
+            return result
         
     except Exception as e:
-        logger.error(f"Error in flat file to Datalake (Parquet) ETL: {e}")
+        logger.error(f"Error in Datalake to Datalake ETL: {e}")
         raise
     finally:
         if temp_parquet and os.path.exists(temp_parquet):
             os.remove(temp_parquet)
 
 @router.get("/{job_id}/status")
-async def get_job_status(job_id: int, db: AsyncSession = Depends(get_db)):
+async def get_job_status(job_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get the status of an ETL job"""
     result = await db.execute(select(ETLJob).filter(ETLJob.id == job_id))
     job = result.scalar_one_or_none()
@@ -298,3 +940,11 @@ async def get_job_status(job_id: int, db: AsyncSession = Depends(get_db)):
         "status": job.status,
         "created_at": job.created_at
     }
+
+@router.get("/{job_id}/runs", response_model=list[ETLJobRunResponse])
+async def list_job_runs(job_id: int, limit: int = 20, db: AsyncSession = Depends(get_read_db)):
+    """Recent runs of an ETL job with their recorded chunk sizing and memory stats"""
+    result = await db.execute(
+        select(ETLJobRun).filter(ETLJobRun.job_id == job_id).order_by(ETLJobRun.id.desc()).limit(min(limit, 200))
+    )
+    return result.scalars().all()
@@ -1,12 +1,14 @@
 import os
 import pandas as pd
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List, Optional
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models import DataSource, ExtractorService
 from ..schemas import ExtractorServiceCreate, ExtractorServiceResponse
+from ..utils.pagination import PageParams, list_response
+from ..utils.file_readers import FileReader
+from ..utils.compression import detect_codec, open_source, strip_codec_suffix
 import logging
 
 logger = logging.getLogger(__name__)
@@ -34,7 +36,7 @@ async def analyze_source(source_id: int, db: AsyncSession = Depends(get_db)):
             
         # Refined name handling: concatenate with extension (forced to lowercase) if not present
         file_name = raw_file_name
-        if file_ext:
+        if file_ext and strip_codec_suffix(file_name) == file_name:
             clean_ext = file_ext.lower().strip('.')
             if not file_name.lower().endswith(f".{clean_ext}"):
                 file_name = f"{file_name}.{clean_ext}"
@@ -52,23 +54,33 @@ async def analyze_source(source_id: int, db: AsyncSession = Depends(get_db)):
         try:
             # Read a sample for schema
             logger.info(f"Reading CSV sample from {full_path}")
-            # Identify actual extension for pandas read
-            ext = os.path.splitext(full_path)[1].lower()
+            # Identify actual extension for pandas read; compressed files are read through the codec
+            codec = detect_codec(full_path)
+            ext = os.path.splitext(strip_codec_suffix(full_path))[1].lower()
             
             if ext == '.csv':
-                df = pd.read_csv(full_path, nrows=10).convert_dtypes()
+                with open_source(full_path, codec) as f:
+                    df = pd.read_csv(f, nrows=10).convert_dtypes()
             elif ext == '.parquet':
-                 df = pd.read_parquet(full_path).head(10).convert_dtypes()
+                 # First batch only; reading the whole file just for a sample is wasteful
+                 df = next(FileReader.iter_parquet(full_path, 10), pd.DataFrame()).convert_dtypes()
             else:
                  # Fallback to CSV if extension is missing/unknown but user says it's flat
-                 df = pd.read_csv(full_path, nrows=10).convert_dtypes()
+                 with open_source(full_path, codec) as f:
+                     df = pd.read_csv(f, nrows=10).convert_dtypes()
             
             # Record count - efficient for large files
             logger.info("Calculating record count")
             total_records = 0
+            logical_bytes = None
             if ext == '.csv':
-                with open(full_path, 'rb') as f:
-                    total_records = sum(1 for line in f) - 1 # Subtract header
+                # Count over the decompressed stream; the byte total gives the logical size
+                logical_bytes = 0
+                with open_source(full_path, codec) as f:
+                    for line in f:
+                        total_records += 1
+                        logical_bytes += len(line)
+                total_records -= 1 # Subtract header
             elif ext == '.parquet':
                 import pyarrow.parquet as pq
                 meta = pq.read_metadata(full_path)
@@ -81,17 +93,20 @@ async def analyze_source(source_id: int, db: AsyncSession = Depends(get_db)):
                     "type": str(dtype)
                 })
             
-            # File size
+            # File size: data_volume is the logical (uncompressed) size when known
+            def format_size(num_bytes: int) -> str:
+                if num_bytes > 1024**3:
+                    return f"{num_bytes / (1024**3):.2f} GB"
+                return f"{num_bytes / (1024**2):.2f} MB"
+
             file_size_bytes = os.path.getsize(full_path)
-            if file_size_bytes > 1024**3:
-                size_str = f"{file_size_bytes / (1024**3):.2f} GB"
-            else:
-                size_str = f"{file_size_bytes / (1024**2):.2f} MB"
             
             return {
                 "records_count": total_records,
                 "schema": schema,
-                "data_volume": size_str,
+                "data_volume": format_size(logical_bytes if codec and logical_bytes is not None else file_size_bytes),
+                "compressed_volume": format_size(file_size_bytes) if codec else None,
+                "codec": codec,
                 "full_path": full_path
             }
         except Exception as e:
@@ -115,7 +130,7 @@ async def create_extractor(extractor: ExtractorServiceCreate, db: AsyncSession =
     return new_extractor
 
 @router.get("/{extractor_id}", response_model=ExtractorServiceResponse)
-async def get_extractor(extractor_id: int, db: AsyncSession = Depends(get_db)):
+async def get_extractor(extractor_id: int, db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(select(ExtractorService).filter(ExtractorService.id == extractor_id))
     extractor = result.scalar_one_or_none()
     if not extractor:
@@ -136,10 +151,9 @@ async def update_extractor(extractor_id: int, extractor_update: ExtractorService
     await db.refresh(extractor)
     return extractor
 
-@router.get("/", response_model=List[ExtractorServiceResponse])
-async def list_extractors(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(ExtractorService))
-    return result.scalars().all()
+@router.get("/")
+async def list_extractors(request: Request, page: PageParams = Depends(), db: AsyncSession = Depends(get_read_db)):
+    return await list_response(request, db, ExtractorService, page)
 
 @router.delete("/{extractor_id}")
 async def delete_extractor(extractor_id: int, db: AsyncSession = Depends(get_db)):
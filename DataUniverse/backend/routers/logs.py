@@ -1,7 +1,10 @@
 import asyncio
+import json
 import os
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
+from ..utils.job_logging import registry, read_store, valid_run_id
 
 router = APIRouter(prefix="/logs", tags=["logs"])
 
@@ -29,6 +32,42 @@ async def log_generator():
         yield f"data: Error streaming logs: {str(e)}\n\n"
         file.close()
 
+def _format_entry(entry: dict) -> str:
+    return f"id: {entry['seq']}\ndata: {json.dumps(entry, separators=(',', ':'))}\n\n"
+
+async def job_log_generator(job_id: int, run_id: Optional[str]):
+    run = registry.get_run(job_id, run_id)
+
+    # Run no longer tracked in memory: replay its store and finish
+    if run is None:
+        for entry in read_store(registry.store_path(job_id, run_id)):
+            yield _format_entry(entry)
+        yield "event: end\ndata: {}\n\n"
+        return
+
+    last_seq = 0
+    try:
+        while True:
+            finished = run.finished
+            entries = run.entries_after(last_seq)
+            for entry in entries:
+                yield _format_entry(entry)
+                last_seq = entry["seq"]
+            if finished and not entries:
+                yield f"event: end\ndata: {json.dumps({'run_id': run.run_id})}\n\n"
+                return
+            if not entries:
+                await asyncio.sleep(0.5)
+    except asyncio.CancelledError:
+        pass
+
 @router.get("/stream")
-async def stream_logs():
-    return StreamingResponse(log_generator(), media_type="text/event-stream")
+async def stream_logs(job_id: Optional[int] = None, run_id: Optional[str] = None):
+    if job_id is None:
+        return StreamingResponse(log_generator(), media_type="text/event-stream")
+
+    if run_id is None and registry.get_run(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"No runs recorded for job {job_id}")
+    if run_id is not None and not valid_run_id(run_id):
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    return StreamingResponse(job_log_generator(job_id, run_id), media_type="text/event-stream")
@@ -1,15 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 from typing import List, Dict, Any
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models import DataSource, ETLJob
 from ..schemas import ETLJobCreate, ETLJobResponse
+from ..utils.pagination import PageParams, list_response
 
 router = APIRouter(prefix="/mapper", tags=["mapper"])
 
 @router.get("/sources", response_model=List[Dict[str, Any]])
-async def get_available_sources(db: AsyncSession = Depends(get_db)):
+async def get_available_sources(db: AsyncSession = Depends(get_read_db)):
     """Get all available data sources for mapping"""
     result = await db.execute(select(DataSource))
     sources = result.scalars().all()
@@ -69,8 +70,7 @@ async def create_mapping(job: ETLJobCreate, db: AsyncSession = Depends(get_db)):
     await db.refresh(new_job)
     return new_job
 
-@router.get("/mappings", response_model=List[ETLJobResponse])
-async def get_all_mappings(db: AsyncSession = Depends(get_db)):
-    """Get all ETL mapping jobs"""
-    result = await db.execute(select(ETLJob))
-    return result.scalars().all()
+@router.get("/mappings")
+async def get_all_mappings(request: Request, page: PageParams = Depends(), db: AsyncSession = Depends(get_read_db)):
+    """Get ETL mapping jobs (keyset paginated, supports field projection and ETags)"""
+    return await list_response(request, db, ETLJob, page)
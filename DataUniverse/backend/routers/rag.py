@@ -3,25 +3,74 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from ..database import get_db
 from ..models import Document
-from ..schemas import ChatRequest, ChatResponse
-import shutil
-import os
+from ..schemas import ChatRequest, ChatResponse, VectorIndexRequest
+from ..utils.rag_engine import IngestionPipeline, VectorIndex, VectorSearch, get_embedder
+from ..utils.rag_uploads import UploadTooLarge, process_uploads
+from typing import Any, Dict, List
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/rag", tags=["rag"])
 
+async def _ingest_uploads(files: List[UploadFile], db: AsyncSession) -> Dict[str, Any]:
+    try:
+        rows, uploaded_bytes = await process_uploads(files)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        stats = await IngestionPipeline().ingest_rows(db, rows, len(files))
+    except Exception as e:
+        logger.error(f"Error ingesting {[f.filename for f in files]}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"uploaded_bytes": uploaded_bytes, **stats}
+
 @router.post("/upload")
 async def upload_document(file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
-    # Save file and process (extract text -> embed -> store in pgvector)
-    # Placeholder implementation
-    content = await file.read()
-    # Mock embedding and storage
-    # In real implementation: extract text, call OpenAI/HF for embedding, store in DB
-    return {"filename": file.filename, "status": "processed"}
+    """Stream to disk -> extract + chunk in the parse pool -> embed in batches -> COPY into pgvector"""
+    stats = await _ingest_uploads([file], db)
+    return {"filename": file.filename, "status": "processed", **stats}
+
+@router.post("/upload/batch")
+async def upload_documents(files: List[UploadFile] = File(...), db: AsyncSession = Depends(get_db)):
+    """Ingest several documents in one pipeline run (shared embedding batches and COPY)"""
+    stats = await _ingest_uploads(files, db)
+    return {"filenames": [f.filename for f in files], "status": "processed", **stats}
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat_with_rag(request: ChatRequest, db: AsyncSession = Depends(get_db)):
     # 1. Embed query
-    # 2. Search pgvector for similar docs
+    embedder = get_embedder()
+    query_vec = (await asyncio.to_thread(embedder.embed, [request.prompt]))[0]
+
+    # 2. Search pgvector (ANN index) for similar chunks
+    matches = await VectorSearch.search(
+        db,
+        query_vec,
+        k=request.top_k,
+        filenames=request.filenames,
+        ef_search=request.ef_search,
+        probes=request.probes,
+    )
+
     # 3. Construct prompt with context
-    # 4. Call LLM
-    return {"response": f"This is a mocked response to: {request.prompt}"}
+    # 4. Call LLM (not configured yet - return the retrieved context)
+    if not matches:
+        return {"response": "No relevant documents found.", "sources": []}
+    context = "\n\n".join(f"[{m['filename']}] {m['content']}" for m in matches)
+    return {"response": f"Relevant context for: {request.prompt}\n\n{context}", "sources": matches}
+
+@router.post("/index")
+async def rebuild_vector_index(request: VectorIndexRequest, db: AsyncSession = Depends(get_db)):
+    """Rebuild the ANN index on documents.embedding (HNSW or IVFFlat)"""
+    try:
+        return await VectorIndex.rebuild(
+            db, kind=request.kind, m=request.m,
+            ef_construction=request.ef_construction, lists=request.lists
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
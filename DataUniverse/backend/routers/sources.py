@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models import DataSource
 from ..schemas import DataSourceCreate, DataSourceResponse
+from ..utils.pagination import PageParams, list_response
 import logging
 
 logger = logging.getLogger(__name__)
@@ -41,13 +41,12 @@ async def update_data_source(source_id: int, source_update: DataSourceCreate, db
     await db.refresh(source)
     return source
 
-@router.get("/", response_model=List[DataSourceResponse])
-async def list_data_sources(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(DataSource))
-    return result.scalars().all()
+@router.get("/")
+async def list_data_sources(request: Request, page: PageParams = Depends(), db: AsyncSession = Depends(get_read_db)):
+    return await list_response(request, db, DataSource, page)
 
 @router.get("/{source_id}", response_model=DataSourceResponse)
-async def get_data_source(source_id: int, db: AsyncSession = Depends(get_db)):
+async def get_data_source(source_id: int, db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(select(DataSource).filter(DataSource.id == source_id))
     source = result.scalar_one_or_none()
     if not source:
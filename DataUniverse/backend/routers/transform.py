@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from typing import List
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models import TransformTemplate
 from ..schemas import TransformTemplateCreate, TransformTemplateResponse
+from ..utils.pagination import PageParams, list_response
 
 router = APIRouter(prefix="/transform", tags=["transform"])
 
@@ -17,14 +18,13 @@ async def create_template(template: TransformTemplateCreate, db: AsyncSession =
     await db.refresh(new_template)
     return new_template
 
-@router.get("/templates", response_model=List[TransformTemplateResponse])
-async def get_templates(db: AsyncSession = Depends(get_db)):
-    """Get all transformation templates"""
-    result = await db.execute(select(TransformTemplate))
-    return result.scalars().all()
+@router.get("/templates")
+async def get_templates(request: Request, page: PageParams = Depends(), db: AsyncSession = Depends(get_read_db)):
+    """Get transformation templates (keyset paginated, supports field projection and ETags)"""
+    return await list_response(request, db, TransformTemplate, page)
 
 @router.get("/templates/{template_id}", response_model=TransformTemplateResponse)
-async def get_template_by_id(template_id: int, db: AsyncSession = Depends(get_db)):
+async def get_template_by_id(template_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a specific transformation template by ID"""
     result = await db.execute(select(TransformTemplate).filter(TransformTemplate.id == template_id))
     template = result.scalar_one_or_none()
@@ -33,7 +33,7 @@ async def get_template_by_id(template_id: int, db: AsyncSession = Depends(get_db
     return template
 
 @router.get("/templates/source/{source_id}", response_model=List[TransformTemplateResponse])
-async def get_templates_by_source(source_id: int, db: AsyncSession = Depends(get_db)):
+async def get_templates_by_source(source_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get transformation templates for a specific data source"""
     result = await db.execute(select(TransformTemplate).filter(TransformTemplate.source_id == source_id))
     return result.scalars().all()
@@ -36,11 +36,42 @@ class ETLJobResponse(ETLJobBase):
     class Config:
         from_attributes = True
 
+class ETLJobRunResponse(BaseModel):
+    id: int
+    job_id: int
+    run_id: str
+    status: str
+    stats: Optional[Dict[str, Any]] = None
+    checkpoint: Optional[Dict[str, Any]] = None
+    resumed_from: Optional[str] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 class ChatRequest(BaseModel):
     prompt: str
+    top_k: int = 5
+    filenames: Optional[List[str]] = None
+    ef_search: Optional[int] = None
+    probes: Optional[int] = None
+
+class RetrievedChunk(BaseModel):
+    id: int
+    filename: Optional[str] = None
+    content: str
+    distance: float
 
 class ChatResponse(BaseModel):
     response: str
+    sources: List[RetrievedChunk] = []
+
+class VectorIndexRequest(BaseModel):
+    kind: str = "hnsw"  # hnsw | ivfflat
+    m: int = 16
+    ef_construction: int = 64
+    lists: int = 100
 
 class TransformTemplateBase(BaseModel):
     name: str
@@ -19,3 +19,717 @@ def test_list_spark_clusters():
     assert response.status_code == 200
     assert len(response.json()) > 0
     assert response.json()[0]["name"] == "Local Spark"
+
+def test_job_log_context_captures_run_records(tmp_path, monkeypatch):
+    import logging
+    from concurrent.futures import ThreadPoolExecutor
+    from backend.utils import job_logging
+
+    monkeypatch.setattr(job_logging.registry, "store_dir", tmp_path)
+    job_logging.install()
+    log = logging.getLogger("backend.routers.etl")
+
+    log.info("outside any job")
+    with job_logging.job_log_context(42) as run:
+        log.info("loading chunk 1")
+        log.warning("chunk 2 had nulls")
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(log.info, "lost on a pool thread").result()
+            pool.submit(job_logging.bind_run(log.info), "fetched row group").result()
+
+    assert run.finished
+    assert [e["msg"] for e in run.entries_after(0)] == ["loading chunk 1", "chunk 2 had nulls", "fetched row group"]
+    stored = job_logging.read_store(job_logging.registry.store_path(42, run.run_id))
+    assert [e["seq"] for e in stored] == [1, 2, 3]
+    assert job_logging.registry.get_run(42) is run
+
+    with pytest.raises(ValueError):
+        job_logging.registry.store_path(42, "../../etc/passwd")
+    assert client.get("/logs/stream", params={"job_id": 42, "run_id": "../../etc/passwd"}).status_code == 404
+
+def test_page_response_conditional_get():
+    from starlette.requests import Request
+    from backend.utils.pagination import page_response
+
+    rows = [{"id": 1, "name": "orders"}, {"id": 2, "name": "customers"}]
+    first = page_response(Request({"type": "http", "headers": []}), rows, next_cursor=2)
+    assert first.status_code == 200
+    assert first.headers["X-Next-Cursor"] == "2"
+
+    etag = first.headers["ETag"]
+    cached = page_response(Request({"type": "http", "headers": [(b"if-none-match", etag.encode())]}), rows, None)
+    assert cached.status_code == 304
+    assert cached.body == b""
+
+def test_list_response_revalidates_from_aggregate():
+    import asyncio
+    from starlette.requests import Request
+    from backend.models import ETLJob
+    from backend.utils.pagination import PageParams, list_response, page_etag
+
+    page = PageParams(after=None, limit=2, fields=None)
+    etag, cursor = asyncio.run(page_etag(RecordingSession(one=(3, 3, "v1", 2)), ETLJob, page))
+    assert cursor == 2
+    changed, _ = asyncio.run(page_etag(RecordingSession(one=(3, 3, "v2", 2)), ETLJob, page))
+    assert changed != etag
+
+    session = RecordingSession(one=(3, 3, "v1", 2))
+    request = Request({"type": "http", "headers": [(b"if-none-match", etag.encode())]})
+    response = asyncio.run(list_response(request, session, ETLJob, page))
+    assert response.status_code == 304
+    assert response.headers["X-Next-Cursor"] == "2"
+    # Only the aggregate ran; no page rows were fetched
+    assert len(session.statements) == 1 and "count(*)" in session.statements[0]
+
+def test_page_params_default_to_unpaged():
+    from backend.utils.pagination import DEFAULT_PAGE_SIZE, PageParams
+
+    assert PageParams(after=None, limit=None, fields=None).limit is None
+    assert PageParams(after=10, limit=None, fields=None).limit == DEFAULT_PAGE_SIZE
+    assert PageParams(after=None, limit=50, fields="id,name").limit == 50
+
+def test_rag_chunking_and_local_embedder():
+    from backend.utils.rag_engine import IngestionPipeline, LocalHashEmbedder, TextChunker
+
+    text = " ".join(f"word{i}" for i in range(500))
+    chunks = TextChunker.split(text, chunk_size=200, overlap=50)
+    assert len(chunks) > 1
+    assert all(len(c) <= 200 for c in chunks)
+
+    pipeline = IngestionPipeline(embedder=LocalHashEmbedder(), batch_size=4, chunk_size=200, overlap=50)
+    rows = pipeline.prepare([("policy.txt", text)])
+    vectors = pipeline.embed_rows(rows)
+    assert len(vectors) == len(rows)
+    assert len(vectors[0]) == 1536
+    assert vectors == pipeline.embed_rows(rows)
+
+def test_rag_dedup_and_embedding_lru():
+    from backend.utils.rag_engine import EmbeddingCache, IngestionPipeline, LocalHashEmbedder, content_hash
+
+    assert content_hash("Refund  policy\n applies") == content_hash("Refund policy applies")
+
+    pipeline = IngestionPipeline(embedder=LocalHashEmbedder(), chunk_size=200, overlap=50)
+    rows = pipeline.prepare([("a.txt", "same paragraph"), ("a.txt", "same  paragraph"),
+                             ("b.txt", "same paragraph"), ("c.txt", "other")])
+    # Repeats within a file are dropped; other files keep their copy for filename-filtered search
+    assert [r[0] for r in rows] == ["a.txt", "b.txt", "c.txt"]
+
+    cache = EmbeddingCache(max_entries=2)
+    cache.put_local("m", "h1", [1.0])
+    cache.put_local("m", "h2", [2.0])
+    assert cache.get_local("m", "h1") == [1.0]
+    cache.put_local("m", "h3", [3.0])
+    assert cache.get_local("m", "h2") is None
+    assert cache.get_local("m", "h1") == [1.0]
+    assert cache.get_local("other-model", "h1") is None
+
+def test_vector_index_startup_is_hnsw_and_ivfflat_waits_for_data():
+    import asyncio
+    import pytest
+    from backend.utils.rag_engine import VectorIndex
+
+    session = RecordingSession()
+    asyncio.run(VectorIndex.ensure(session))
+    assert "USING hnsw" in session.statements[0]
+
+    # IVFFlat trained on an empty table is useless: refuse until the load has happened
+    empty = RecordingSession(scalar=0)
+    with pytest.raises(ValueError, match="load the data first"):
+        asyncio.run(VectorIndex.rebuild(empty, kind="ivfflat", lists=100))
+    assert not any("CREATE INDEX" in s for s in empty.statements)
+
+    loaded = RecordingSession(scalar=50_000)
+    stats = asyncio.run(VectorIndex.rebuild(loaded, kind="ivfflat", lists=100))
+    assert stats["kind"] == "ivfflat"
+    assert any("USING ivfflat" in s and "lists = 100" in s for s in loaded.statements)
+
+def test_rag_upload_streaming_and_parse_pool(tmp_path):
+    import asyncio
+    import io
+    from fastapi import UploadFile
+    from backend.utils.rag_uploads import ParseQueue, UploadTooLarge, save_upload
+
+    body = ("Refunds are processed within 14 days. " * 200).encode()
+
+    async def run():
+        path, size = await save_upload(UploadFile(io.BytesIO(body), filename="policy.txt"), str(tmp_path))
+        assert size == len(body) and path.read_bytes() == body
+
+        # More parses than slots wait for one instead of being rejected
+        queue = ParseQueue(workers=1, max_pending=1)
+        try:
+            parsed = await asyncio.gather(*[queue.parse(path, "policy.txt") for _ in range(3)])
+        finally:
+            queue.shutdown()
+        rows = parsed[0]
+        assert rows and all(r[0] == "policy.txt" for r in rows) and parsed[1] == parsed[2] == rows
+
+        with pytest.raises(UploadTooLarge):
+            await save_upload(UploadFile(io.BytesIO(body), filename="big.txt"), str(tmp_path), max_bytes=100)
+        assert len(list(tmp_path.iterdir())) == 1
+
+    asyncio.run(run())
+
+def test_cluster_status_snapshot(monkeypatch):
+    from backend.routers.cluster import collector
+    from backend.utils import cluster_status
+
+    # Canned probe output instead of real vmrun / docker / pgrep
+    outputs = {
+        "list": f"Total running VMs: 1\n{collector.vm_paths['master']}\n",
+        "listProcessesInGuest": "pid=101, owner=hadoop, cmd=java org.apache.hadoop.hdfs.server.namenode.NameNode",
+        "compose": '[{"Name": "timescaledb", "State": "running"}]',
+        "pgrep": "4242\n",
+    }
+
+    async def fake_probe(cmd_args, timeout=None):
+        key = next(k for k in outputs if k in cmd_args)
+        return 0, outputs[key], ""
+
+    monkeypatch.setattr(cluster_status, "run_probe", fake_probe)
+    response = client.get("/cluster/status?refresh=true")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["vm_status"] == "online" and body["running_vms"] == ["master"]
+    assert body["services"] == ["NameNode", "Docker:timescaledb", "Native:minio"]
+    assert body["probe_errors"] == {}
+    assert "collected_at" in body and body["stale"] is False
+
+def test_health_history_resolution_and_rows():
+    from datetime import datetime, timedelta, timezone
+    from backend.utils.health_history import pick_resolution, snapshot_to_rows
+
+    now = datetime.now(timezone.utc)
+    assert pick_resolution(now - timedelta(hours=1), now) == "raw"
+    assert pick_resolution(now - timedelta(hours=12), now) == "5m"
+    assert pick_resolution(now - timedelta(days=30), now) == "1h"
+
+    snapshot = {"running_vms": ["master"], "services": ["NameNode", "Docker:timescaledb"]}
+    rows = snapshot_to_rows(snapshot, ["master", "worker1"], {"NameNode", "DataNode"}, {"load1": 0.5}, now)
+    up = {r["component"]: r["up"] for r in rows}
+    assert up["vm:master"] == 1 and up["vm:worker1"] == 0
+    assert up["service:DataNode"] == 0 and up["service:Docker:timescaledb"] == 1
+    assert up["host"] == 1
+
+def test_benchmark_dataset_generator_and_compare():
+    from backend.benchmarks.datasets import generate_frame
+    from backend.benchmarks.etl_suite import compare
+
+    a = generate_frame(500, columns=8, null_ratio=0.1, dirty_rate=0.05, seed=7)
+    b = generate_frame(500, columns=8, null_ratio=0.1, dirty_rate=0.05, seed=7)
+    assert a.shape == (500, 8)
+    assert a.equals(b)
+    assert a["float_1"].isnull().any()
+
+    baseline = {"results": [{"name": "reader:csv", "seconds": 1.0}, {"name": "load:postgres", "seconds": 2.0}]}
+    current = {"results": [{"name": "reader:csv", "seconds": 1.05}, {"name": "load:postgres", "seconds": 2.5}]}
+    flagged = {r["name"]: r["regression"] for r in compare(baseline, current, threshold=0.10)}
+    assert flagged == {"reader:csv": False, "load:postgres": True}
+
+def test_streaming_json_array_reader(tmp_path):
+    import json
+    from backend.utils.file_readers import FileReader
+
+    records = [{"id": i, "customer": {"name": f"c{i}", "address": {"city": "Pune"}}, "tags": ["a", "b"]}
+               for i in range(25)]
+    records[20]["late_field"] = 1
+    top_level = tmp_path / "orders.json"
+    top_level.write_text(json.dumps(records))
+    wrapped = tmp_path / "export.json"
+    wrapped.write_text(json.dumps({"meta": {"count": 25}, "data": {"items": records}}))
+
+    chunks = list(FileReader.get_iterator(str(top_level), "json", chunk_size=10))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert list(chunks[0].columns) == ["id", "tags", "customer.name", "customer.address"]
+    assert all(list(c.columns) == list(chunks[0].columns) for c in chunks)
+    assert chunks[0]["tags"][0] == '["a", "b"]'
+
+    nested = list(FileReader.get_iterator(str(wrapped), "json", chunk_size=100, json_path="data.items", flatten_depth=2))
+    assert len(nested[0]) == 25 and "customer.address.city" in nested[0].columns
+
+def test_streaming_excel_reader(tmp_path):
+    import pandas as pd
+    from backend.utils.file_readers import FileReader, excel_sheet_to_chunk_files
+
+    path = tmp_path / "book.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"id": range(25), "city": ["Pune"] * 25}).to_excel(writer, sheet_name="orders", index=False)
+        pd.DataFrame({"id": range(3), "amount": [1.5, None, 3.0]}).to_excel(writer, sheet_name="refunds", index=False)
+
+    assert FileReader.excel_sheet_names(str(path)) == ["orders", "refunds"]
+    chunks = list(FileReader.get_iterator(str(path), "xlsx", chunk_size=10))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert list(chunks[-1].columns) == ["id", "city"]
+
+    refunds = list(FileReader.iter_excel(str(path), 10, "refunds"))
+    assert refunds[0]["amount"].isnull().sum() == 1
+
+    parsed = excel_sheet_to_chunk_files(str(path), "orders", str(tmp_path), 10)
+    assert parsed["rows"] == 25 and len(parsed["files"]) == 3
+
+    # Projection and a memory budget reach the worker: the budget's minimum chunk holds the whole sheet
+    parsed = excel_sheet_to_chunk_files(str(path), "orders", str(tmp_path), 10, usecols=["city"],
+                                        memory_budget_mb=64)
+    assert parsed["rows"] == 25 and len(parsed["files"]) == 2
+    assert list(pd.read_pickle(parsed["files"][0]).columns) == ["city"]
+
+def test_streaming_xml_reader(tmp_path):
+    from backend.utils.file_readers import FileReader
+
+    orders = "".join(
+        f'<order id="{i}"><customer><name>c{i}</name></customer><total>{i * 1.5}</total></order>'
+        for i in range(25)
+    )
+    path = tmp_path / "export.xml"
+    path.write_text(f'<export xmlns="urn:shop"><meta>v1</meta><orders>{orders}</orders></export>')
+
+    columns = {"order_id": "@id", "customer": "customer/name", "total": "total"}
+    chunks = list(FileReader.get_iterator(str(path), "xml", chunk_size=10, record_path="orders/order", columns=columns))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert chunks[0].iloc[3].to_dict() == {"order_id": "3", "customer": "c3", "total": "4.5"}
+
+    inferred = list(FileReader.iter_xml(str(path), 100, "order"))
+    assert list(inferred[0].columns) == ["id", "customer", "total"]
+
+def test_compressed_sources_stream_transparently(tmp_path):
+    import bz2
+    import gzip
+    import zstandard
+    from backend.utils.compression import detect_codec, strip_codec_suffix
+    from backend.utils.file_readers import FileReader
+
+    csv = "id,name\n" + "".join(f"{i},n{i}\n" for i in range(25))
+    gz = tmp_path / "orders.csv.gz"
+    gz.write_bytes(gzip.compress(csv.encode()))
+    # Codec detected from magic bytes when the name has no suffix
+    zst = tmp_path / "orders_export"
+    zst.write_bytes(zstandard.ZstdCompressor().compress(csv.encode()))
+    lines = tmp_path / "events.json.bz2"
+    lines.write_bytes(bz2.compress(b"".join(b'{"id": %d}\n' % i for i in range(7))))
+
+    assert detect_codec(str(zst)) == "zstd" and strip_codec_suffix("orders.csv.gz") == "orders.csv"
+    for path in (gz, zst):
+        chunks = list(FileReader.get_iterator(str(path), "csv", chunk_size=10))
+        assert [len(c) for c in chunks] == [10, 10, 5]
+        assert chunks[-1].iloc[-1].to_dict() == {"id": 24, "name": "n24"}
+    assert sum(len(c) for c in FileReader.get_iterator(str(lines), "json", chunk_size=3)) == 7
+
+def test_parquet_source_pushdown(tmp_path):
+    import pandas as pd
+    from backend.utils.etl_engine import ETLEngine
+    from backend.utils.file_readers import FileReader
+
+    path = tmp_path / "orders.parquet"
+    pd.DataFrame({
+        "id": range(100), "region": ["eu", "us"] * 50, "amount": [float(i) for i in range(100)], "note": "x"
+    }).to_parquet(path, index=False, row_group_size=25)
+
+    filters = FileReader.parse_filters([{"column": "id", "op": ">=", "value": 60}, ["region", "=", "eu"]])
+    chunks = list(FileReader.get_iterator(str(path), "parquet", chunk_size=10, usecols=["id", "amount"], filters=filters))
+    df = pd.concat(chunks)
+    assert list(df.columns) == ["id", "amount"]
+    assert df["id"].tolist() == list(range(60, 100, 2))
+
+    import pyarrow.parquet as pq
+    metadata = pq.ParquetFile(path).metadata
+    index = {"id": 0, "region": 1}
+    kept = [i for i in range(4) if FileReader._row_group_may_match(metadata.row_group(i), index, filters)]
+    assert kept == [2, 3]
+
+    config = {"transformations": [{"type": "expression", "logic": "amount * 2", "target_column": "double"}]}
+    assert ETLEngine.referenced_columns(config, {"mappings": [{"source": "id", "target": "order_id"}]}) == ["id", "amount"]
+    assert ETLEngine.referenced_columns(config, {}) is None
+
+def test_read_plan_projects_and_renames(tmp_path):
+    from backend.utils.file_readers import FileReader
+    from backend.utils.read_plan import ReadPlan
+
+    path = tmp_path / "wide.csv"
+    header = ",".join(f"c{i}" for i in range(40))
+    path.write_text(header + "\n" + "".join(",".join(str(r * 100 + i) for i in range(40)) + "\n" for r in range(5)))
+
+    mapping = {"mappings": [
+        {"source": "c3", "target": "order_id", "type": "bigint"},
+        {"source": "c7", "target": "amount"},
+    ]}
+    config = {"transformations": [{"type": "expression", "logic": "c7 + c9", "target_column": "c7"}]}
+    plan = ReadPlan.compile(mapping, config)
+    assert plan.usecols == ["c3", "c7", "c9"]
+
+    chunks = list(FileReader.get_iterator(str(path), "csv", chunk_size=2, **plan.reader_options()))
+    assert list(chunks[0].columns) == ["c3", "c7", "c9"] and str(chunks[0]["c3"].dtype) == "Int64"
+
+    df = plan.apply(chunks[0])
+    assert list(df.columns) == ["order_id", "amount"]
+    # The reader's chunk keeps its names and dtypes, even when it is already projected
+    assert list(chunks[0].columns) == ["c3", "c7", "c9"]
+    projected = chunks[0][["c3", "c7"]].astype({"c3": "int64"})
+    assert list(plan.apply(projected).columns) == ["order_id", "amount"]
+    assert list(projected.columns) == ["c3", "c7"] and str(projected["c3"].dtype) == "int64"
+    assert plan.table_schema(df)["order_id"] == "BIGINT"
+    assert ReadPlan.compile({"mappings": []}, config) is None
+    with pytest.raises(ValueError):
+        plan.apply(chunks[0][["c3"]])
+
+def test_source_filter_pushdown_and_report(tmp_path):
+    import pandas as pd
+    from backend.utils.file_readers import FileReader, FilterReport
+
+    filters = FileReader.parse_filters([
+        {"column": "amount", "op": ">=", "value": 50},
+        {"column": "region", "op": "in", "value": ["eu"]},
+    ])
+    frame = pd.DataFrame({"id": range(100), "region": ["eu", "us"] * 50, "amount": range(100)})
+
+    csv = tmp_path / "orders.csv"
+    frame.to_csv(csv, index=False)
+    report = FilterReport(filters)
+    chunks = list(FileReader.get_iterator(str(csv), "csv", chunk_size=30, usecols=["id", "amount"],
+                                          filters=filters, filter_report=report))
+    df = pd.concat(chunks)
+    assert list(df.columns) == ["id", "amount"] and df["amount"].dtype.kind == "i"
+    assert df["id"].tolist() == list(range(50, 100, 2))
+    assert [(r["filter"], r["rows_eliminated"]) for r in report.to_dict()] == [
+        ("amount >= 50", 50), ("region in ['eu']", 25)]
+
+    parquet = tmp_path / "orders.parquet"
+    frame.to_parquet(parquet, index=False, row_group_size=25)
+    report = FilterReport(filters)
+    assert sum(len(c) for c in FileReader.iter_parquet(str(parquet), 10, None, filters, report)) == 25
+    amount = report.to_dict()[0]
+    assert amount["stages"]["parquet_row_groups"]["rows"] == 50 and amount["bytes_eliminated"] > 0
+
+def test_dtype_planner_shrinks_chunks(tmp_path):
+    import pandas as pd
+    import pyarrow as pa
+    from backend.utils.dtype_planner import DtypePlanner
+    from backend.utils.file_readers import FileReader
+
+    path = tmp_path / "events.csv"
+    pd.DataFrame({
+        "id": range(4000),
+        "status": ["active", "closed", "pending", "inactive"] * 1000,
+        "note": [f"free text {i}" for i in range(4000)],
+    }).to_csv(path, index=False)
+
+    planner = DtypePlanner()
+    sample = next(FileReader.get_iterator(str(path), "csv", chunk_size=1000))
+    assert planner.plan(sample)["status"] == "category" and planner.dtypes.get("note") != "category"
+
+    chunks = list(planner.apply(FileReader.get_iterator(str(path), "csv", chunk_size=1000, dtype=planner.dtypes)))
+    assert str(chunks[0]["status"].dtype) == "category" and str(chunks[0]["id"].dtype) == "int16"
+    report = planner.report()
+    assert len(report["chunks"]) == 4 and report["bytes_after"] < report["bytes_before"]
+    assert FileReader._infer_schema(chunks[0])["id"] == "INTEGER"
+
+    table = pa.Table.from_pandas(chunks[0])
+    widened = table.cast(DtypePlanner.storage_schema(table.schema))
+    assert widened.schema.field("id").type == pa.int64()
+    assert not pa.types.is_dictionary(widened.schema.field("status").type)
+
+def test_dtype_planner_keeps_transform_arithmetic_exact():
+    import pandas as pd
+    from backend.utils.dtype_planner import DtypePlanner
+    from backend.utils.etl_engine import ETLEngine
+    from backend.utils.file_readers import FileReader
+
+    frame = pd.DataFrame({"qty": [10, 50, 120], "store": [1, 2, 3], "price": [0.5, 1.25, 2.0],
+                          "rate": [0.1, 0.2, 0.3], "status": ["a", "a", "b"]})
+    transforms = [{"name": "scale", "type": "expression", "logic": "qty * 10", "target_column": "qty_x10"}]
+    planner = DtypePlanner()
+    planner.plan(frame, DtypePlanner.referenced_columns({"transformations": transforms}, frame.columns))
+    chunk = next(planner.apply(iter([frame.copy()])))
+    # Columns the expression uses keep their width; the rest shrink, floats only when exact
+    assert {c: str(t) for c, t in chunk.dtypes.items() if c != "status"} == {
+        "qty": "int64", "store": "int8", "price": "float32", "rate": "float64"}
+    assert planner.report()["chunks"][0]["bytes_before"] == DtypePlanner.memory(frame)
+    out = ETLEngine.apply_transformations(chunk, transforms)
+    assert out["qty_x10"].tolist() == [100, 500, 1200]
+    assert FileReader._infer_schema(out)["price"] == "DOUBLE PRECISION"
+
+    assert DtypePlanner.referenced_columns({"transformations": [{"type": "python", "logic": ""}]}, ["qty"]) is None
+    planner = DtypePlanner()
+    planner.plan(frame, None)
+    assert planner.numeric == []
+
+def test_chunk_sizer_adapts_read_size_to_budget(tmp_path):
+    import pandas as pd
+    from backend.utils.chunk_sizer import ChunkSizer
+    from backend.utils.file_readers import FileReader
+
+    path = tmp_path / "wide.csv"
+    pd.DataFrame({f"text_{i}": ["x" * 200] * 12000 for i in range(10)}).to_csv(path, index=False)
+
+    # ~2 KB per row in memory: a 16 MB budget with 4x overhead allows about 2000 rows per chunk
+    sizer = ChunkSizer(budget_mb=16, initial_rows=5000)
+    sizes = []
+    for df in FileReader.get_iterator(str(path), "csv", chunk_size=sizer):
+        sizer.observe(df)
+        sizes.append(len(df))
+
+    report = sizer.report()
+    assert sizes[0] == 5000 and sizes[1] == report["read_rows"] < 5000
+    assert sum(sizes) == 12000 and report["chunks"] == len(sizes)
+    assert report["insert_rows"] <= report["read_rows"] and report["peak_chunk_bytes"] > 0
+    assert ChunkSizer.from_config({"execution": {"memory_budget_mb": 64}}).budget_bytes == 64 * 1024 ** 2
+
+def test_readers_resume_from_source_offset(tmp_path):
+    import pandas as pd
+    from backend.utils.file_readers import FileReader
+
+    frame = pd.DataFrame({"id": range(100), "name": [f"n{i}" for i in range(100)]})
+    csv, parquet = tmp_path / "items.csv", tmp_path / "items.parquet"
+    frame.to_csv(csv, index=False)
+    frame.to_parquet(parquet, index=False, row_group_size=30)
+
+    for path, file_type in [(csv, "csv"), (parquet, "parquet")]:
+        chunks = list(FileReader.get_iterator(str(path), file_type, chunk_size=25))
+        offset = chunks[1].attrs["source_offset"]
+        resumed = list(FileReader.get_iterator(str(path), file_type, chunk_size=25, skip_rows=offset))
+        assert resumed[0]["id"].iloc[0] == offset and resumed[-1].attrs["source_offset"] == 100
+        assert sum(len(c) for c in resumed) == 100 - offset
+
+    # Offsets count records, not lines: quoted fields may span lines
+    notes = tmp_path / "notes.csv"
+    notes.write_text("id,note\n" + "".join(f'{i},"line one\nline two {i}"\n' for i in range(10)))
+    for filters in (None, [("id", ">=", 0)]):
+        chunks = list(FileReader.get_iterator(str(notes), "csv", chunk_size=4, filters=filters))
+        offset = chunks[0].attrs["source_offset"]
+        resumed = list(FileReader.get_iterator(str(notes), "csv", chunk_size=4, skip_rows=offset, filters=filters))
+        assert pd.concat(resumed)["id"].astype(int).tolist() == list(range(4, 10))
+        assert resumed[0]["note"].iloc[0] == "line one\nline two 4"
+
+    # Offsets count source records, so rows removed by a filter are not read again
+    filtered = list(FileReader.get_iterator(str(csv), "csv", chunk_size=25, skip_rows=40, filters=[("id", ">=", 50)]))
+    assert filtered[0]["id"].iloc[0] == 50 and filtered[0].attrs["source_offset"] == 65
+
+class RecordingSession:
+    """Stand-in for an AsyncSession that records the SQL it is given"""
+
+    def __init__(self, scalar=None, one=None, scalars=(), rowcount=0):
+        self.statements, self.commits, self.rollbacks = [], 0, 0
+        listed = type("Scalars", (), {"all": lambda _: list(scalars)})()
+        self.result = type("Result", (), {
+            "scalar": lambda _: scalar, "one": lambda _: one, "scalars": lambda _: listed, "rowcount": rowcount,
+        })()
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        return self.result
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+def test_resume_is_validated_against_source_and_table(tmp_path):
+    import asyncio
+    from types import SimpleNamespace
+    from backend.routers.etl import source_state, validate_resume
+
+    (tmp_path / "orders.csv").write_text("order_id,Order Total\n1,9.5\n2,3.0\n")
+    source = SimpleNamespace(source_type="Flat Files", connection_details={
+        "Source File Path": str(tmp_path), "Source File Name": "orders.csv", "Source File Type": "csv"})
+    target = SimpleNamespace(source_type="PostgreSQL")
+    job = SimpleNamespace(yaml_config=None)
+    checkpoint = {"source": source_state(tmp_path / "orders.csv"), "source_offset": 1, "rows_loaded": 1,
+                  "table_name": "orders", "columns": ["order_id", "Order Total"]}
+
+    def check(db, **changes):
+        asyncio.run(validate_resume(db, job, source, target, {**checkpoint, **changes}))
+
+    check(RecordingSession(scalar=1, scalars=["id", "order_id", "order_total", "created_at"]))
+    with pytest.raises(ValueError, match="columns of orders changed"):
+        check(RecordingSession(scalar=1, scalars=["id", "order_id", "created_at"]))
+    with pytest.raises(ValueError, match="fewer than the 5 checkpointed"):
+        check(RecordingSession(scalar=1, scalars=["id", "order_id", "order_total", "created_at"]), rows_loaded=5)
+    with pytest.raises(ValueError, match="changed since the checkpoint"):
+        check(RecordingSession(), source={"path": "elsewhere"})
+    with pytest.raises(ValueError, match="not orders"):
+        check(RecordingSession(), table_name="orders__staging")
+
+def test_staging_load_swaps_in_one_transaction():
+    import asyncio
+    from backend.routers.etl import target_load_options
+    from backend.utils.table_creator import TableCreator
+
+    load = target_load_options({"target": {"load_mode": "staging", "indexes": ["region", ["customer id", "day"]]}})
+    assert load["mode"] == "staging" and target_load_options(None)["mode"] == "replace"
+
+    db = RecordingSession()
+    asyncio.run(TableCreator.create_table(db, "orders__staging", {"region": "TEXT"}, staging=True))
+    assert "CREATE UNLOGGED TABLE orders__staging" in db.statements[-1] and "PRIMARY KEY" not in db.statements[-1]
+
+    db = RecordingSession(scalar="public.orders__staging_id_seq")
+    swap = asyncio.run(TableCreator.swap_staging_table(db, "orders__staging", "orders", load["indexes"]))
+    assert db.commits == 1 and swap["indexes"] == ["orders_pkey", "orders_region_idx", "orders_customer_id_day_idx"]
+    order = [next(i for i, s in enumerate(db.statements) if marker in s)
+             for marker in ("SET LOGGED", "PRIMARY KEY", "CREATE INDEX", "ANALYZE", "DROP TABLE", "RENAME TO orders")]
+    assert order == sorted(order)
+
+def test_merge_sink_upserts_changed_rows_only():
+    import asyncio
+    from fastapi import HTTPException
+    from backend.routers.etl import target_load_options
+    from backend.utils.partitioning import PartitionSpec
+    from backend.utils.table_creator import TableCreator
+
+    with pytest.raises(ValueError):
+        target_load_options({"target": {"load_mode": "merge"}})
+    load = target_load_options({"target": {"load_mode": "merge", "merge_keys": "order_id", "delete_missing": True}})
+    assert load["merge_keys"] == ["order_id"] and load["delete_missing"]
+
+    db = RecordingSession(one=(1, 1))
+    rows = [{"order_id": 1, "amount": 5.0}, {"order_id": 2, "amount": 7.0},
+            {"order_id": 3, "amount": 1.0}, {"order_id": 2, "amount": 8.0}]
+    counts = asyncio.run(TableCreator.merge_data(db, "orders", rows, ["order_id"], key_table="orders__merge_keys"))
+    # The repeated key collapses to its last row; one transaction per chunk
+    assert counts == {"staged": 3, "inserted": 1, "updated": 1, "unchanged": 1} and db.commits == 1
+    staged = next(s for s in db.statements if "INSERT INTO orders__merge " in s)
+    assert "(2, 8.0)" in staged and "(2, 7.0)" not in staged
+    merge = next(s for s in db.statements if "ON CONFLICT" in s)
+    assert "ON CONFLICT (order_id) DO UPDATE SET amount = EXCLUDED.amount" in merge
+    assert "(orders.amount) IS DISTINCT FROM (EXCLUDED.amount)" in merge
+    assert any("INSERT INTO orders__merge_keys" in s for s in db.statements)
+
+    # Unique indexes on hypertables / partitioned tables must include the time column
+    spec = PartitionSpec("created_at")
+    db = RecordingSession()
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(TableCreator.ensure_merge_key(db, "orders", ["order_id"], spec))
+    assert excinfo.value.status_code == 400 and "created_at" in excinfo.value.detail
+    assert db.statements == []
+    asyncio.run(TableCreator.ensure_merge_key(db, "orders", ["order_id", "created_at"], spec))
+    assert "(order_id, created_at)" in db.statements[0]
+
+def test_partitioned_targets():
+    import asyncio
+    import pandas as pd
+    from backend.utils.partitioning import PartitionSpec
+    from backend.utils.table_creator import TableCreator
+
+    with pytest.raises(ValueError):
+        PartitionSpec.from_config({"time_column": "ts", "strategy": "range", "interval": "7 days"})
+    assert PartitionSpec.from_config(None) is None
+
+    hyper = PartitionSpec.from_config({"time_column": "ts", "interval": "1 day", "compress_after": "30 days",
+                                       "compress_segmentby": "device"})
+    db = RecordingSession()
+    asyncio.run(TableCreator.create_table(db, "events", hyper.apply_schema({"ts": "TEXT", "device": "TEXT"}),
+                                          partitioning=hyper))
+    sql = "\n".join(db.statements)
+    assert "ts TIMESTAMP" in sql and "PRIMARY KEY (id, ts)" in sql
+    assert "create_hypertable('events', 'ts', chunk_time_interval => INTERVAL '1 day')" in sql
+    assert "timescaledb.compress_segmentby = 'device'" in sql and "add_compression_policy" in sql
+
+    named = PartitionSpec.from_config({"time_column": "Event Time", "compress_after": "7 days"})
+    db = RecordingSession()
+    asyncio.run(TableCreator.create_table(db, "events", {"Event Time": "TIMESTAMP"}, partitioning=named))
+    assert "timescaledb.compress_orderby = 'event_time DESC'" in "\n".join(db.statements)
+
+    monthly = PartitionSpec.from_config({"time_column": "ts", "strategy": "range"})
+    db = RecordingSession()
+    asyncio.run(TableCreator.create_table(db, "events", {"ts": "TIMESTAMP"}, partitioning=monthly))
+    assert "PARTITION BY RANGE (ts)" in db.statements[-1]
+    frame = pd.DataFrame({"ts": ["2026-01-15T10:00:00Z", "2026-02-01T00:00:00Z"]})
+    known = set()
+    created = asyncio.run(TableCreator.ensure_partitions(db, "events", monthly, monthly.prepare(frame)["ts"], known))
+    assert created == ["events_p202601", "events_p202602"]
+    assert "FOR VALUES FROM ('2026-01-01 00:00:00') TO ('2026-02-01 00:00:00')" in db.statements[-2]
+    assert asyncio.run(TableCreator.ensure_partitions(db, "events", monthly, frame["ts"], known)) == []
+
+def test_partitioned_load_handles_rows_without_time():
+    import asyncio
+    import pandas as pd
+    from backend.routers.etl import load_chunks_to_table
+    from backend.utils.partitioning import PartitionSpec
+
+    def chunks():
+        yield pd.DataFrame({"ts": ["2026-01-15T10:00:00Z", None, "bad", "2026-02-01T00:00:00Z"], "qty": [1, 2, 3, 4]})
+
+    # The time column is in the primary key, so NULL times are refused up front by default
+    rejecting = PartitionSpec.from_config({"time_column": "ts", "strategy": "range"})
+    db = RecordingSession()
+    with pytest.raises(ValueError, match="2 rows have a missing or unparseable partition time column 'ts'"):
+        asyncio.run(load_chunks_to_table(db, chunks(), "events", None, partitioning=rejecting))
+    assert not any("INSERT" in sql for sql in db.statements)
+
+    quarantining = PartitionSpec.from_config({"time_column": "ts", "strategy": "range",
+                                              "on_missing_time": "quarantine"})
+    db = RecordingSession()
+    loaded = asyncio.run(load_chunks_to_table(db, chunks(), "events", None, partitioning=quarantining))
+    assert loaded["rows_inserted"] == 2 and quarantining.report()["rows_quarantined"] == 2
+    insert = next(sql for sql in db.statements if "INSERT INTO events" in sql)
+    assert "NULL" not in insert and "'2026-01-15 10:00:00'" in insert and "'2026-02-01 00:00:00'" in insert
+    assert sum("PARTITION OF events FOR VALUES" in sql for sql in db.statements) == 2
+
+class LocalS3:
+    """In-memory stand-in for the S3 calls the datalake reader makes"""
+
+    def __init__(self):
+        self.objects, self.ranges = {}, []
+
+    def get_paginator(self, name):
+        objects = self.objects
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                yield {"Contents": [{"Key": k, "Size": len(v)} for (b, k), v in sorted(objects.items())
+                                    if b == Bucket and k.startswith(Prefix)]}
+        return Paginator()
+
+    def get_object(self, Bucket, Key, Range):
+        start, end = (int(x) for x in Range[len("bytes="):].split("-"))
+        self.ranges.append((Key, start, end))
+        data = self.objects[(Bucket, Key)][start:end + 1]
+        return {"Body": type("Body", (), {"read": lambda self: data})()}
+
+def test_datalake_parquet_source_uses_ranged_reads():
+    import io
+    import numpy as np
+    import pandas as pd
+    from backend.utils.datalake_reader import DatalakeReader
+    from backend.utils.file_readers import FilterReport
+
+    s3 = LocalS3()
+    for part in range(2):
+        ids = np.arange(part * 50000, (part + 1) * 50000)
+        frame = pd.DataFrame({"id": ids, "score": np.random.rand(len(ids)), "note": [f"note {i}" for i in ids]})
+        buf = io.BytesIO()
+        frame.to_parquet(buf, index=False, row_group_size=10000)
+        s3.objects[("lake", f"events/part-{part}.parquet")] = buf.getvalue()
+    s3.objects[("lake", "events/_SUCCESS")] = b""
+
+    everything = pd.concat(DatalakeReader.iter_parquet(s3, "s3://lake/events", 20000))
+    assert len(everything) == 100000 and everything["id"].is_monotonic_increasing
+
+    stats, filters = {}, [("id", ">=", 75000)]
+    report = FilterReport(filters)
+    chunks = list(DatalakeReader.iter_parquet(s3, "s3a://lake/events", 20000, ["id"], filters, report, stats=stats))
+    assert sum(len(c) for c in chunks) == 25000 and list(chunks[0].columns) == ["id"]
+    assert stats["objects"] == 2 and stats["bytes_fetched"] < stats["object_bytes"] / 3
+    assert report.to_dict()[0]["stages"]["parquet_row_groups"]["rows"] == 70000
+    # Every GET was a range, never a whole-object download
+    assert all(end - start + 1 < len(s3.objects[("lake", key)]) for key, start, end in s3.ranges)
+
+def test_s3_client_registry_shares_clients():
+    from backend.utils.s3_clients import S3ClientRegistry
+
+    registry = S3ClientRegistry(max_pool_connections=24, idle_seconds=3600)
+    first = registry.get("key", "secret", "http://localhost:9700")
+    assert registry.get("key", "secret", "http://localhost:9700") is first
+    assert registry.get("key", "other-secret", "http://localhost:9700") is not first
+    assert first.meta.config.max_pool_connections == 24
+    assert registry.transfer_config().max_request_concurrency <= 24
+    assert registry.stats() == {"clients": 2, "max_pool_connections": 24, "uses": 3, "leases": 0}
+
+    registry.idle_seconds = -1
+    with registry.lease("key", "secret", "http://localhost:9700") as leased:
+        assert leased is first
+        # A long job's client stays open however long it has been since it was handed out
+        assert registry.evict_idle() == 1 and registry.stats()["leases"] == 1
+    assert registry.evict_idle() == 1 and registry.stats()["clients"] == 0
+    registry.get("key", "secret")
+    registry.close_all()
+    assert registry.stats()["clients"] == 0
@@ -0,0 +1,98 @@
+"""
+Adaptive chunk sizing under a per-job memory budget
+Bytes per row are measured on the first chunks of a run; read chunk and
+insert batch sizes are then derived from the budget instead of fixed row
+counts, so wide files stay within memory and narrow files use fewer, larger
+round trips.
+"""
+import os
+from typing import Any, Dict, Optional
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+MEMORY_BUDGET_MB = float(os.getenv("ETL_MEMORY_BUDGET_MB", "512"))
+# In-flight copies per chunk: the frame, DQ/transform copies and the row dicts built for inserts
+MEMORY_OVERHEAD = float(os.getenv("ETL_MEMORY_OVERHEAD", "4"))
+MIN_CHUNK_ROWS = int(os.getenv("ETL_MIN_CHUNK_ROWS", "1000"))
+MAX_CHUNK_ROWS = int(os.getenv("ETL_MAX_CHUNK_ROWS", "1000000"))
+# Upper bound on the size of one multi-row INSERT statement
+MAX_STATEMENT_BYTES = int(os.getenv("ETL_MAX_STATEMENT_BYTES", str(16 * 1024 * 1024)))
+MAX_INSERT_ROWS = int(os.getenv("ETL_MAX_INSERT_ROWS", "20000"))
+# Chunks measured before the bytes-per-row estimate is frozen
+MEASURED_CHUNKS = 3
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+class ChunkSizer:
+    """
+    Derives read and insert sizes from a memory budget
+    Readers that support it call the instance for the size of their next chunk.
+    """
+
+    def __init__(self, budget_mb: float = MEMORY_BUDGET_MB, initial_rows: int = 10000,
+                 overhead: float = MEMORY_OVERHEAD):
+        self.budget_bytes = int(budget_mb * 1024 ** 2)
+        self.overhead = overhead
+        self.read_rows = initial_rows
+        self.insert_rows = min(initial_rows, 1000)
+        self.bytes_per_row: Optional[float] = None
+        self.measured_chunks = 0
+        self.chunks = 0
+        self.peak_chunk_bytes = 0
+        self.peak_rss_bytes: Optional[int] = None
+        self.history = []
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], initial_rows: int = 10000) -> "ChunkSizer":
+        """Budget from job YAML execution.memory_budget_mb, else ETL_MEMORY_BUDGET_MB"""
+        execution = (config or {}).get("execution") or {}
+        return cls(float(execution.get("memory_budget_mb", MEMORY_BUDGET_MB)), initial_rows)
+
+    def __call__(self) -> int:
+        return self.read_rows
+
+    def observe(self, df: pd.DataFrame) -> None:
+        """Account for one chunk and resize while the estimate is still being measured"""
+        self.chunks += 1
+        if self.measured_chunks < MEASURED_CHUNKS and len(df):
+            chunk_bytes = int(df.memory_usage(index=False, deep=True).sum())
+            per_row = chunk_bytes / len(df)
+            # Keep the widest rows seen so far; the estimate must not undershoot
+            self.bytes_per_row = max(self.bytes_per_row or 0.0, per_row)
+            self.measured_chunks += 1
+            self._resize()
+        if self.bytes_per_row:
+            self.peak_chunk_bytes = max(self.peak_chunk_bytes, int(self.bytes_per_row * len(df)))
+        rss = _rss_bytes()
+        if rss is not None:
+            self.peak_rss_bytes = max(self.peak_rss_bytes or 0, rss)
+
+    def _resize(self) -> None:
+        rows = int(self.budget_bytes / (self.bytes_per_row * self.overhead))
+        self.read_rows = max(MIN_CHUNK_ROWS, min(MAX_CHUNK_ROWS, rows))
+        statement_rows = int(MAX_STATEMENT_BYTES / self.bytes_per_row)
+        self.insert_rows = max(1, min(self.read_rows, statement_rows, MAX_INSERT_ROWS))
+        self.history.append({"after_chunk": self.chunks, "read_rows": self.read_rows, "insert_rows": self.insert_rows})
+        logger.info(f"Chunk sizing: {self.bytes_per_row:.0f} bytes/row -> read {self.read_rows} rows, "
+                    f"insert {self.insert_rows} rows (budget {self.budget_bytes / 1024 ** 2:.0f} MB)")
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "memory_budget_bytes": self.budget_bytes,
+            "bytes_per_row": round(self.bytes_per_row, 1) if self.bytes_per_row else None,
+            "read_rows": self.read_rows,
+            "insert_rows": self.insert_rows,
+            "chunks": self.chunks,
+            "peak_chunk_bytes": self.peak_chunk_bytes,
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "history": self.history,
+        }
@@ -0,0 +1,181 @@
+"""
+Background cluster status collector
+Runs the vmrun / docker / pgrep probes concurrently as asyncio subprocesses
+with timeouts and keeps the latest snapshot in memory, so /cluster/status
+never blocks on a hung probe.
+"""
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROBE_TIMEOUT_SECONDS = float(os.getenv("CLUSTER_PROBE_TIMEOUT", "10"))
+REFRESH_INTERVAL_SECONDS = float(os.getenv("CLUSTER_STATUS_INTERVAL", "15"))
+
+GUEST_PROCESS_MARKERS = [
+    "NameNode", "DataNode", "ResourceManager", "NodeManager", "Master", "Worker", "SparkConnectServer"
+]
+
+
+async def run_probe(cmd_args: List[str], timeout: float = PROBE_TIMEOUT_SECONDS) -> Tuple[int, str, str]:
+    """Run a command without blocking the event loop; kills it on timeout"""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd_args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+    except Exception as e:
+        return -1, "", str(e)
+
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass  # exited between the timeout and the kill
+        await process.wait()
+        return -1, "", f"Timed out after {timeout}s: {' '.join(cmd_args[:3])}"
+    return process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
+def parse_guest_services(out: str) -> List[str]:
+    return [marker for marker in GUEST_PROCESS_MARKERS if marker in out]
+
+
+def parse_docker_services(out: str) -> List[str]:
+    """docker compose ps --format json prints either one array or one object per line"""
+    if not out.strip():
+        return []
+    try:
+        containers = json.loads(out)
+        if not isinstance(containers, list):
+            containers = [containers]
+    except ValueError:
+        containers = []
+        for line in out.strip().split('\n'):
+            try:
+                containers.append(json.loads(line))
+            except ValueError:
+                continue
+
+    return [
+        f"Docker:{c.get('Name')}"
+        for c in containers
+        if c.get("State") == "running" or c.get("Status", "").lower().startswith("up")
+    ]
+
+
+class ClusterStatusCollector:
+    """Collects cluster status in the background and serves cached snapshots"""
+
+    def __init__(self, vm_paths: Dict[str, str], guest_user: str, guest_pass: str,
+                 interval: float = REFRESH_INTERVAL_SECONDS, timeout: float = PROBE_TIMEOUT_SECONDS):
+        self.vm_paths = vm_paths
+        self.guest_user = guest_user
+        self.guest_pass = guest_pass
+        self.interval = interval
+        self.timeout = timeout
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self._collected_monotonic: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    async def _guest_services(self, master_vm: str) -> Tuple[List[str], Optional[str]]:
+        rc, out, err = await run_probe([
+            "vmrun", "-T", "ws",
+            "-gu", self.guest_user, "-gp", self.guest_pass,
+            "listProcessesInGuest", master_vm
+        ], self.timeout)
+        return (parse_guest_services(out), None) if rc == 0 else ([], err.strip() or None)
+
+    async def _vm_probe(self) -> Tuple[List[str], List[str], Dict[str, str]]:
+        """vmrun list, then guest processes when the master is up"""
+        errors = {}
+        rc, list_out, err = await run_probe(["vmrun", "list"], self.timeout)
+        if rc != 0:
+            errors["vmrun list"] = err.strip()
+        running = [node for node, path in self.vm_paths.items() if path in list_out]
+
+        services: List[str] = []
+        if "master" in running:
+            services, guest_err = await self._guest_services(self.vm_paths["master"])
+            if guest_err:
+                errors["listProcessesInGuest"] = guest_err
+        return running, services, errors
+
+    async def collect(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        (running, guest_services, errors), docker, minio = await asyncio.gather(
+            self._vm_probe(),
+            run_probe(["docker", "compose", "ps", "--format", "json"], self.timeout),
+            run_probe(["pgrep", "-f", "minio server"], self.timeout),
+        )
+
+        services = list(guest_services)
+        if docker[0] == 0:
+            services.extend(parse_docker_services(docker[1]))
+        elif docker[2]:
+            errors["docker compose ps"] = docker[2].strip()
+        if minio[0] == 0:
+            services.append("Native:minio")
+
+        return {
+            "vm_status": "online" if "master" in running else "offline",
+            "services": services,
+            "running_vms": running,
+            "collected_at": datetime.now(timezone.utc).isoformat(),
+            "collect_seconds": round(time.perf_counter() - started, 3),
+            "probe_errors": errors,
+        }
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Collect now; concurrent callers share one in-flight collection"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return await asyncio.shield(self._refresh_task)
+
+    async def _refresh(self) -> Dict[str, Any]:
+        snapshot = await self.collect()
+        self.snapshot = snapshot
+        self._collected_monotonic = time.monotonic()
+        return snapshot
+
+    async def get(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """Latest snapshot with its age; collects synchronously only when forced or empty"""
+        if force_refresh or self.snapshot is None:
+            await self.refresh()
+        age = time.monotonic() - self._collected_monotonic
+        return {**self.snapshot, "age_seconds": round(age, 3), "stale": age > 2 * self.interval}
+
+    def request_refresh(self) -> None:
+        """Schedule a background refresh, e.g. after a power or service action"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Cluster status collection failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in (self._loop_task, self._refresh_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._loop_task = None
+        self._refresh_task = None
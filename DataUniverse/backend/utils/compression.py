@@ -0,0 +1,145 @@
+"""
+Transparent streaming decompression for flat-file sources
+Detects gzip, bzip2, xz and zstd by extension or magic bytes and exposes the
+decompressed bytes as a read-only stream, so readers never need the
+uncompressed file on disk.
+"""
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+READ_AHEAD_BLOCK = int(os.getenv("DECOMPRESS_BLOCK_BYTES", str(1024 * 1024)))
+READ_AHEAD_BLOCKS = int(os.getenv("DECOMPRESS_READ_AHEAD_BLOCKS", "8"))
+
+EXTENSIONS = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+
+MAGIC = [
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+]
+
+
+def strip_codec_suffix(file_name: str) -> str:
+    """'orders.csv.gz' -> 'orders.csv'"""
+    root, ext = os.path.splitext(file_name)
+    return root if ext.lower() in EXTENSIONS else file_name
+
+
+def detect_codec(file_path: str) -> Optional[str]:
+    """Codec by extension, falling back to magic bytes; None for plain files"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in EXTENSIONS:
+        return EXTENSIONS[ext]
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(6)
+    except OSError:
+        return None
+    for magic, codec in MAGIC:
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+class ReadAheadStream(io.RawIOBase):
+    """
+    Runs a decompressor in a background thread, handing blocks to the reader
+    through a bounded queue so decompression overlaps with parsing
+    """
+
+    def __init__(self, raw, block_size: int = READ_AHEAD_BLOCK, max_blocks: int = READ_AHEAD_BLOCKS):
+        self._raw = raw
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_blocks)
+        self._buffer = b""
+        self._eof = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, args=(block_size,), daemon=True)
+        self._thread.start()
+
+    def _produce(self, block_size: int) -> None:
+        try:
+            while not self._stop.is_set():
+                block = self._raw.read(block_size)
+                if not block:
+                    break
+                self._put(block)
+            self._put(b"")
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer and not self._eof:
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                raise item
+            if item == b"":
+                self._eof = True
+            self._buffer = item
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._raw.close()
+        super().close()
+
+
+def _open_raw(file_path: str, codec: str):
+    if codec == "gzip":
+        return gzip.open(file_path, "rb")
+    elif codec == "bz2":
+        return bz2.open(file_path, "rb")
+    elif codec == "xz":
+        return lzma.open(file_path, "rb")
+    elif codec == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Reading .zst files requires the 'zstandard' package")
+        fh = open(file_path, "rb")
+        return zstandard.ZstdDecompressor().stream_reader(fh, read_size=READ_AHEAD_BLOCK, closefd=True)
+    raise ValueError(f"Unsupported compression codec: {codec}")
+
+
+def open_source(file_path: str, codec: Optional[str] = "auto") -> io.BufferedReader:
+    """
+    Open a flat file for binary reading, decompressing transparently
+    codec: "auto" to detect, None for plain, or an explicit codec name
+    """
+    if codec == "auto":
+        codec = detect_codec(file_path)
+    if codec is None:
+        return open(file_path, "rb")
+    return io.BufferedReader(ReadAheadStream(_open_raw(file_path, codec)), buffer_size=READ_AHEAD_BLOCK)
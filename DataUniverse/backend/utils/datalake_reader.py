@@ -0,0 +1,228 @@
+"""
+Parquet sources in a datalake (S3/MinIO)
+Objects under a location are read without downloading them: the footer is
+fetched with a suffix-range GET, and the column chunks of the selected row
+groups and columns are fetched with concurrent ranged GETs a few row groups
+ahead of the decoder. Row groups are then streamed through
+FileReader.iter_parquet, so statistics skipping, projection and filters
+work exactly as for local files.
+"""
+import io
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+import pandas as pd
+import logging
+
+from .file_readers import FileReader, FilterReport
+from .job_logging import bind_run
+
+logger = logging.getLogger(__name__)
+
+READ_CONCURRENCY = int(os.getenv("DATALAKE_READ_CONCURRENCY", "8"))
+# Column chunks larger than this are split into several concurrent GETs
+RANGE_PART_BYTES = int(os.getenv("DATALAKE_RANGE_PART_BYTES", str(8 * 1024 * 1024)))
+# Row groups whose column chunks are in flight ahead of the one being decoded
+PREFETCH_ROW_GROUPS = int(os.getenv("DATALAKE_PREFETCH_ROW_GROUPS", "2"))
+FOOTER_READ_BYTES = 64 * 1024
+
+
+def parse_location(location: str) -> Tuple[str, str]:
+    """'s3://bucket/some/prefix' -> ('bucket', 'some/prefix')"""
+    for scheme in ("s3://", "s3a://"):
+        if location.startswith(scheme):
+            location = location[len(scheme):]
+            break
+    parts = location.split('/', 1)
+    return parts[0], parts[1] if len(parts) > 1 else ""
+
+
+class S3RangeFile(io.RawIOBase):
+    """
+    Seekable read-only view of one S3 object served by ranged GETs
+    Byte ranges handed to prefetch() are downloaded on a thread pool; reads
+    outside them fall back to a synchronous GET of exactly the bytes asked for.
+    """
+
+    def __init__(self, client, bucket: str, key: str, size: int, pool: ThreadPoolExecutor,
+                 part_bytes: int = RANGE_PART_BYTES, window: int = PREFETCH_ROW_GROUPS):
+        self.client = client
+        self.bucket = bucket
+        self.name = f"s3://{bucket}/{key}"
+        self.key = key
+        self.size = size
+        self._pool = pool
+        # Pool threads do not inherit the job's log context
+        self._fetch = bind_run(self._get)
+        self._part_bytes = part_bytes
+        self._window = window
+        self._pos = 0
+        self._lock = threading.Lock()
+        # (start, end) -> future of the bytes in [start, end)
+        self._blocks: Dict[Tuple[int, int], Future] = {}
+        # Per prefetched row group: its byte ranges
+        self._plan: List[List[Tuple[int, int]]] = []
+        self._scheduled = 0
+        self.requests = 0
+        self.bytes_fetched = 0
+        # The footer (and usually the whole metadata) comes from one suffix-range GET
+        self._tail_start = size - min(size, FOOTER_READ_BYTES)
+        self._blocks[(self._tail_start, size)] = self._resolved(self._get(self._tail_start, size))
+
+    @staticmethod
+    def _resolved(data: bytes) -> Future:
+        future: Future = Future()
+        future.set_result(data)
+        return future
+
+    def _get(self, start: int, end: int) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket, Key=self.key, Range=f"bytes={start}-{end - 1}")
+        data = response["Body"].read()
+        with self._lock:
+            self.requests += 1
+            self.bytes_fetched += len(data)
+        return data
+
+    def prefetch(self, metadata, row_groups: List[int], column_indices: List[int]) -> None:
+        """Plan the column chunk ranges of the row groups iter_parquet is about to read"""
+        self._plan = []
+        for i in row_groups:
+            row_group = metadata.row_group(i)
+            ranges = []
+            for c in column_indices:
+                chunk = row_group.column(c)
+                start = chunk.data_page_offset
+                if chunk.has_dictionary_page and chunk.dictionary_page_offset:
+                    start = min(start, chunk.dictionary_page_offset)
+                ranges.append((start, start + chunk.total_compressed_size))
+            self._plan.append(sorted(ranges))
+        self._scheduled = 0
+        self._schedule_through(self._window - 1)
+
+    def _schedule_through(self, last_group: int) -> None:
+        while self._scheduled <= min(last_group, len(self._plan) - 1):
+            for start, end in self._plan[self._scheduled]:
+                # Bytes inside the footer read are already here
+                end = min(end, self._tail_start)
+                for part in range(start, end, self._part_bytes):
+                    part_end = min(end, part + self._part_bytes)
+                    with self._lock:
+                        if (part, part_end) not in self._blocks:
+                            self._blocks[(part, part_end)] = self._pool.submit(self._fetch, part, part_end)
+            self._scheduled += 1
+
+    def _group_at(self, offset: int) -> Optional[int]:
+        for i, ranges in enumerate(self._plan):
+            if any(start <= offset < end for start, end in ranges):
+                return i
+        return None
+
+    def _advance(self, offset: int) -> None:
+        """Keep the prefetch window ahead of the row group being decoded and drop consumed ones"""
+        group = self._group_at(offset)
+        if group is None:
+            return
+        self._schedule_through(group + self._window)
+        with self._lock:
+            for i in range(group):
+                for start, end in self._plan[i]:
+                    for key in [k for k in self._blocks if start <= k[0] < end]:
+                        del self._blocks[key]
+
+    def _cached(self, start: int, end: int) -> Optional[bytes]:
+        """Bytes [start, end) if prefetched blocks cover them contiguously"""
+        with self._lock:
+            blocks = sorted((k, f) for k, f in self._blocks.items() if k[0] < end and k[1] > start)
+        pieces, covered = [], start
+        for (b_start, b_end), future in blocks:
+            if b_start > covered:
+                return None
+            if b_end <= covered:
+                continue
+            data = future.result()
+            pieces.append(data[covered - b_start:min(end, b_end) - b_start])
+            covered = min(end, b_end)
+            if covered >= end:
+                return b"".join(pieces)
+        return None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, b) -> int:
+        start, end = self._pos, min(self.size, self._pos + len(b))
+        if start >= end:
+            return 0
+        self._advance(start)
+        data = self._cached(start, end)
+        if data is None:
+            data = self._get(start, end)
+        b[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+
+class DatalakeReader:
+    """Stream Parquet objects under a datalake location"""
+
+    @staticmethod
+    def list_parquet(client, bucket: str, prefix: str) -> List[Dict[str, Any]]:
+        """Parquet objects under prefix, in key order: [{"key", "size"}]"""
+        objects = []
+        for page in client.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                if obj["Key"].endswith(".parquet") and obj["Size"] > 0:
+                    objects.append({"key": obj["Key"], "size": obj["Size"]})
+        return sorted(objects, key=lambda o: o["key"])
+
+    @staticmethod
+    def iter_parquet(
+        client,
+        location: str,
+        chunk_size: Union[int, Callable[[], int]] = 10000,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Tuple[str, str, Any]]] = None,
+        report: Optional[FilterReport] = None,
+        concurrency: int = READ_CONCURRENCY,
+        stats: Optional[Dict[str, int]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream every Parquet object under location row group by row group
+        columns/filters/report: as for FileReader.iter_parquet
+        concurrency: ranged GETs in flight at once
+        stats: filled with objects, requests and bytes_fetched as objects are read
+        """
+        bucket, prefix = parse_location(location)
+        objects = DatalakeReader.list_parquet(client, bucket, prefix)
+        if not objects:
+            raise ValueError(f"No Parquet objects found under {location}")
+        logger.info(f"Reading {len(objects)} Parquet objects under {location} "
+                    f"({sum(o['size'] for o in objects) / 1024 ** 2:.1f} MB)")
+        stats = stats if stats is not None else {}
+        stats.update({"objects": 0, "object_bytes": 0, "requests": 0, "bytes_fetched": 0})
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="datalake-read") as pool:
+            for obj in objects:
+                source = S3RangeFile(client, bucket, obj["key"], obj["size"], pool)
+                try:
+                    yield from FileReader.iter_parquet(source, chunk_size, columns, filters, report)
+                finally:
+                    stats["objects"] += 1
+                    stats["object_bytes"] += obj["size"]
+                    stats["requests"] += source.requests
+                    stats["bytes_fetched"] += source.bytes_fetched
+                    source.close()
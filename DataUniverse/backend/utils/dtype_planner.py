@@ -0,0 +1,161 @@
+"""
+Memory-optimized dtype planning for chunked reads
+Statistics from a sample of the source pick categoricals for low-cardinality
+text and pyarrow-backed strings for the rest; these are passed to readers that
+accept dtypes (CSV) and applied to every other chunk as it is produced.
+Numeric columns are downcast per chunk to the narrowest dtype that holds the
+chunk's values (floats only when float32 is exact), except columns that DQ
+rules or transformations reference, whose arithmetic must not overflow.
+Memory per chunk is measured before and after.
+"""
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+DTYPE_PLANNER_ENABLED = os.getenv("ETL_DTYPE_PLANNER", "true").lower() == "true"
+SAMPLE_ROWS = int(os.getenv("ETL_DTYPE_SAMPLE_ROWS", "10000"))
+# A text column becomes categorical when it has at most this many distinct values...
+CATEGORY_MAX_VALUES = int(os.getenv("ETL_CATEGORY_MAX_VALUES", "1000"))
+# ...and they make up at most this share of the sampled rows
+CATEGORY_MAX_RATIO = float(os.getenv("ETL_CATEGORY_MAX_RATIO", "0.5"))
+
+
+def _arrow_strings_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class DtypePlanner:
+    """Plans dtypes from a sample and tracks per-chunk memory"""
+
+    def __init__(self, category_max_values: int = CATEGORY_MAX_VALUES,
+                 category_max_ratio: float = CATEGORY_MAX_RATIO):
+        self.category_max_values = category_max_values
+        self.category_max_ratio = category_max_ratio
+        self.dtypes: Dict[str, str] = {}
+        self.numeric: List[str] = []
+        self.chunks: List[Dict[str, int]] = []
+
+    @staticmethod
+    def memory(df: pd.DataFrame) -> int:
+        return int(df.memory_usage(index=False, deep=True).sum())
+
+    @staticmethod
+    def referenced_columns(config: Optional[Dict[str, Any]], columns: Iterable[str]) -> Optional[set]:
+        """
+        Columns of the source that DQ rules or transformations read or write
+        Returns None when a transformation may touch any column (python, or
+        built_in without a target_column)
+        """
+        config = config or {}
+        columns = [str(c) for c in columns]
+        referenced = {rule.get("column") for rule in (config.get("data_quality") or {}).get("rules", [])}
+        for ts in config.get("transformations") or []:
+            t_type = ts.get("type")
+            if t_type == "python" or (t_type == "built_in" and not ts.get("target_column")):
+                return None
+            referenced.add(ts.get("target_column"))
+            if t_type == "expression":
+                # A plain substring test: a false match only keeps a column wide
+                logic = str(ts.get("logic", ""))
+                referenced.update(c for c in columns if c in logic)
+        return {c for c in columns if c in referenced}
+
+    def plan(self, sample: pd.DataFrame, protected: Optional[Iterable[str]] = ()) -> Dict[str, str]:
+        """
+        Pick categorical / Arrow string dtypes for the text columns of a sample and the
+        numeric columns to downcast per chunk
+        protected: columns whose numeric width is kept; None keeps every numeric column
+        """
+        arrow_strings = _arrow_strings_available()
+        if protected is not None:
+            protected = set(protected)
+            self.numeric = [c for c in sample.columns if c not in protected and DtypePlanner._numpy_numeric(sample[c])]
+        for column in sample.columns:
+            series = sample[column]
+            if pd.api.types.infer_dtype(series, skipna=True) != "string":
+                continue
+            distinct = series.nunique(dropna=True)
+            if distinct <= self.category_max_values and distinct <= self.category_max_ratio * max(len(series), 1):
+                self.dtypes[column] = "category"
+            elif series.dtype == object and arrow_strings:
+                self.dtypes[column] = "string[pyarrow]"
+        logger.info(f"Dtype plan: {self.dtypes or 'no text changes'}, downcasting {self.numeric or 'no'} numeric columns")
+        return self.dtypes
+
+    @staticmethod
+    def _numpy_numeric(series: pd.Series) -> bool:
+        # Nullable extension dtypes (Int64, Float64) are left alone
+        return isinstance(series.dtype, np.dtype) and series.dtype.kind in "iuf"
+
+    @staticmethod
+    def downcast(series: pd.Series) -> pd.Series:
+        """Narrowest integer dtype for the values; float32 only when it represents them exactly"""
+        kind = series.dtype.kind
+        if kind in "iu":
+            return pd.to_numeric(series, downcast="integer" if kind == "i" else "unsigned")
+        if series.dtype == "float64":
+            narrow = series.astype("float32")
+            if ((narrow.astype("float64") == series) | series.isna()).all():
+                return narrow
+        return series
+
+    def optimize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply the planned text dtypes not already set at read time and downcast numeric columns"""
+        for column, dtype in self.dtypes.items():
+            if column in df.columns and str(df[column].dtype) != dtype:
+                df[column] = df[column].astype(dtype)
+        for column in self.numeric:
+            if column in df.columns and DtypePlanner._numpy_numeric(df[column]):
+                df[column] = self.downcast(df[column])
+        return df
+
+    def apply(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Optimize each chunk and record its memory as read and after optimizing"""
+        for df in chunks:
+            before = self.memory(df)
+            df = self.optimize(df)
+            after = self.memory(df)
+            self.chunks.append({"rows": len(df), "bytes_before": before, "bytes_after": after})
+            logger.info(f"Chunk {len(self.chunks)}: {len(df)} rows, "
+                        f"{before / 1024 ** 2:.2f} MB -> {after / 1024 ** 2:.2f} MB")
+            yield df
+
+    def report(self) -> Dict[str, Any]:
+        before = sum(c["bytes_before"] for c in self.chunks)
+        after = sum(c["bytes_after"] for c in self.chunks)
+        return {
+            "dtypes": self.dtypes,
+            "chunks": self.chunks,
+            "bytes_before": before,
+            "bytes_after": after,
+            "reduction": round(1 - after / before, 4) if before else 0.0,
+        }
+
+    @staticmethod
+    def storage_schema(schema):
+        """
+        Arrow schema for files written from optimized chunks: categoricals are
+        decoded, integers widened to int64 and floats to float64, so every chunk
+        of one file shares the same schema
+        """
+        import pyarrow as pa
+
+        fields = []
+        for field in schema:
+            t = field.type
+            if pa.types.is_dictionary(t):
+                t = t.value_type
+            if pa.types.is_integer(t):
+                t = pa.int64()
+            elif pa.types.is_floating(t):
+                t = pa.float64()
+            fields.append(pa.field(field.name, t, field.nullable))
+        return pa.schema(fields)
@@ -133,3 +133,29 @@ class ETLEngine:
                 raise
         
         return df
+
+    @staticmethod
+    def referenced_columns(config: Optional[Dict[str, Any]], mapping_config: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+        """
+        Source columns a job actually needs: mapped source fields plus the columns
+        used by DQ rules and transformations (readers add filter columns themselves).
+        Returns None (read everything) without a mapping or when a transformation
+        may touch arbitrary columns (python, or built_in without a target_column).
+        """
+        mappings = (mapping_config or {}).get("mappings") or []
+        columns = [m["source"] for m in mappings if m.get("source")]
+        if not columns:
+            return None
+
+        config = config or {}
+        columns += [rule["column"] for rule in config.get("data_quality", {}).get("rules", []) if rule.get("column")]
+        for ts in config.get("transformations", []):
+            t_type = ts.get("type")
+            if t_type == "python" or (t_type == "built_in" and not ts.get("target_column")):
+                return None
+            if t_type == "expression":
+                # Identifiers in the expression; names that are not source columns are ignored by readers
+                columns += re.findall(r"[A-Za-z_][A-Za-z0-9_]*", str(ts.get("logic", "")))
+            elif ts.get("target_column"):
+                columns.append(ts["target_column"])
+        return list(dict.fromkeys(c for c in columns if c))
@@ -1,15 +1,49 @@
 """
 File readers for different data source types
-Supports CSV, JSON, and other flat file formats
+Supports CSV, JSON, Excel, XML, Parquet and other flat file formats
 """
 import pandas as pd
 import json
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Callable, Dict, List, Any, Tuple, Iterator, Optional, Union
 import logging
 
+from .compression import detect_codec, open_source
+
 logger = logging.getLogger(__name__)
 
+
+class FilterReport:
+    """Rows and (in-memory) bytes eliminated by each source filter, per pushdown stage"""
+
+    def __init__(self, filters: Optional[List[Tuple[str, str, Any]]] = None):
+        self.filters: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for flt in filters or []:
+            self.filters[self.label(flt)] = {}
+
+    @staticmethod
+    def label(flt: Tuple[str, str, Any]) -> str:
+        column, op, value = flt
+        return f"{column} {op} {value!r}"
+
+    def record(self, flt: Tuple[str, str, Any], stage: str, rows: int, nbytes: int) -> None:
+        stages = self.filters.setdefault(self.label(flt), {})
+        entry = stages.setdefault(stage, {"rows": 0, "bytes": 0})
+        entry["rows"] += int(rows)
+        entry["bytes"] += int(nbytes)
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "filter": label,
+                "rows_eliminated": sum(e["rows"] for e in stages.values()),
+                "bytes_eliminated": sum(e["bytes"] for e in stages.values()),
+                "stages": stages,
+            }
+            for label, stages in self.filters.items()
+        ]
+
+
 class FileReader:
     """Base class for file readers"""
     
@@ -20,7 +54,8 @@ class FileReader:
         Returns: (DataFrame, schema_dict)
         """
         try:
-            df = pd.read_csv(file_path)
+            with open_source(file_path) as f:
+                df = pd.read_csv(f)
             schema = FileReader._infer_schema(df)
             return df, schema
         except Exception as e:
@@ -28,18 +63,89 @@ class FileReader:
             raise
     
     @staticmethod
-    def read_json(file_path: str) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    def read_json(file_path: str, json_path: Optional[str] = None, flatten_depth: int = 1) -> Tuple[pd.DataFrame, Dict[str, str]]:
         """
         Read JSON file and infer schema
+        Arrays (top-level or at json_path) are parsed incrementally
         Returns: (DataFrame, schema_dict)
         """
         try:
-            df = pd.read_json(file_path)
+            if json_path or FileReader._json_layout(file_path) == "array":
+                chunks = list(FileReader.iter_json_array(file_path, 50000, json_path, flatten_depth))
+                df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            else:
+                with open_source(file_path) as f:
+                    df = pd.read_json(f)
             schema = FileReader._infer_schema(df)
             return df, schema
         except Exception as e:
             logger.error(f"Error reading JSON file {file_path}: {e}")
             raise
+
+    @staticmethod
+    def _json_layout(file_path: str) -> str:
+        """'array' when the document starts with '[', otherwise 'lines'"""
+        with open_source(file_path) as f:
+            while True:
+                block = f.read(4096)
+                if not block:
+                    return "lines"
+                stripped = block.lstrip().lstrip(b'\xef\xbb\xbf')
+                if stripped:
+                    return "array" if stripped[:1] == b'[' else "lines"
+
+    @staticmethod
+    def iter_json_array(
+        file_path: str,
+        chunk_size: Union[int, Callable[[], int]] = 10000,
+        json_path: Optional[str] = None,
+        flatten_depth: int = 1,
+        as_arrow: bool = False,
+        skip: int = 0
+    ) -> Iterator[Union[pd.DataFrame, "pa.Table"]]:
+        """
+        Incrementally parse the elements of a JSON array with bounded memory
+        json_path: dotted path to the array inside the document (e.g. "data.items");
+                   None means the document itself is the array
+        flatten_depth: nesting levels of objects flattened into "parent.child" columns
+        Yields DataFrame (or Arrow table) chunks of chunk_size rows with the first chunk's columns
+        skip: array elements to pass over first (resuming from a checkpoint)
+        """
+        import ijson
+
+        prefix = f"{json_path}.item" if json_path else "item"
+        columns: Optional[List[str]] = None
+
+        def to_frame(records: List[Dict[str, Any]]):
+            nonlocal columns
+            df = pd.json_normalize(records, max_level=flatten_depth)
+            if columns is None:
+                columns = list(df.columns)
+            else:
+                extra = [c for c in df.columns if c not in columns]
+                if extra:
+                    logger.warning(f"Ignoring fields not present in the first chunk: {extra[:10]}")
+                df = df.reindex(columns=columns)
+            # Anything still nested is stored as JSON text
+            for col in df.columns:
+                if df[col].dtype == object:
+                    df[col] = df[col].map(lambda v: json.dumps(v) if isinstance(v, (dict, list)) else v)
+            if as_arrow:
+                import pyarrow as pa
+                return pa.Table.from_pandas(df, preserve_index=False)
+            return df
+
+        with open_source(file_path) as f:
+            records: List[Dict[str, Any]] = []
+            for n, item in enumerate(ijson.items(f, prefix, use_float=True)):
+                if n < skip:
+                    continue
+                records.append(item if isinstance(item, dict) else {"value": item})
+                if len(records) >= FileReader._rows(chunk_size):
+                    yield to_frame(records)
+                    records = []
+            if records:
+                yield to_frame(records)
     
     @staticmethod
     def read_excel(file_path: str, sheet_name: str = 0) -> Tuple[pd.DataFrame, Dict[str, str]]:
@@ -55,6 +161,530 @@ class FileReader:
             logger.error(f"Error reading Excel file {file_path}: {e}")
             raise
     
+    @staticmethod
+    def reader_options(connection_details: Dict[str, Any]) -> Dict[str, Any]:
+        """Reader options configured on a Flat Files source"""
+        options = {}
+        if connection_details.get("JSON Path"):
+            options["json_path"] = connection_details["JSON Path"]
+        if connection_details.get("JSON Flatten Depth") not in (None, ""):
+            options["flatten_depth"] = int(connection_details["JSON Flatten Depth"])
+        if connection_details.get("Sheet Name"):
+            options["sheet_name"] = connection_details["Sheet Name"]
+        if connection_details.get("XML Record Path"):
+            options["record_path"] = connection_details["XML Record Path"]
+        xml_columns = connection_details.get("XML Columns")
+        if xml_columns:
+            options["columns"] = json.loads(xml_columns) if isinstance(xml_columns, str) else dict(xml_columns)
+        return options
+
+    @staticmethod
+    def _rows(chunk_size: Union[int, Callable[[], int]]) -> int:
+        """chunk_size is a row count or a callable giving the size of the next chunk"""
+        return chunk_size() if callable(chunk_size) else chunk_size
+
+    @staticmethod
+    def _stream_chunks(read_fn, file_path: str, chunksize: Union[int, Callable[[], int]],
+                       skip_lines: int = 0, skip_records: int = 0, **kwargs):
+        """
+        Chunked pandas reader over a (possibly compressed) stream, closed when exhausted
+        A callable chunksize is asked again before every chunk where the reader allows it
+        skip_lines: raw lines discarded before parsing (JSON Lines resume)
+        skip_records: parsed records discarded first (CSV resume, where a quoted
+                      field can span several lines)
+        """
+        with open_source(file_path) as f:
+            for _ in range(skip_lines):
+                f.readline()
+            with read_fn(f, chunksize=FileReader._rows(chunksize), **kwargs) as reader:
+                while skip_records > 0:
+                    try:
+                        skipped = len(reader.get_chunk(min(skip_records, FileReader._rows(chunksize))))
+                    except StopIteration:
+                        return
+                    if not skipped:
+                        return
+                    skip_records -= skipped
+                if callable(chunksize) and hasattr(reader, "get_chunk"):
+                    while True:
+                        try:
+                            yield reader.get_chunk(chunksize())
+                        except StopIteration:
+                            return
+                else:
+                    yield from reader
+
+    @staticmethod
+    def _with_offsets(chunks: Iterator[pd.DataFrame], start: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Tag each raw chunk with attrs["source_offset"]: source records consumed up to and
+        including it, which is where a resumed read starts
+        """
+        offset = start
+        for df in chunks:
+            offset += len(df)
+            df.attrs["source_offset"] = offset
+            yield df
+
+    @staticmethod
+    def _project(chunks: Iterator[pd.DataFrame], usecols: Optional[List[str]]) -> Iterator[pd.DataFrame]:
+        """Column projection for readers that cannot skip columns while parsing"""
+        if usecols is None:
+            yield from chunks
+            return
+        wanted = set(usecols)
+        for df in chunks:
+            projected = df[[c for c in df.columns if c in wanted]]
+            projected.attrs = dict(df.attrs)
+            yield projected
+
+    @staticmethod
+    def excel_sheet_names(file_path: str) -> List[str]:
+        import openpyxl
+        wb = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            return list(wb.sheetnames)
+        finally:
+            wb.close()
+
+    @staticmethod
+    def iter_excel(
+        file_path: str,
+        chunk_size: Union[int, Callable[[], int]] = 10000,
+        sheet_name: Optional[Union[str, int]] = None,
+        header_row: int = 1,
+        usecols: Optional[List[str]] = None,
+        skip: int = 0
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream an Excel sheet with openpyxl read-only mode
+        Yields DataFrame chunks of chunk_size rows; the header row fixes the columns
+        usecols: keep only these header names
+        skip: non-blank data rows to pass over first (resuming from a checkpoint)
+        """
+        import openpyxl
+
+        if detect_codec(file_path):
+            raise ValueError("Compressed Excel workbooks are not supported; xlsx is already compressed")
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            if sheet_name is None or sheet_name == 0:
+                ws = wb.worksheets[0]
+            elif isinstance(sheet_name, int):
+                ws = wb.worksheets[sheet_name]
+            else:
+                ws = wb[sheet_name]
+
+            rows = ws.iter_rows(min_row=header_row, values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = []
+            for i, name in enumerate(header):
+                name = str(name).strip() if name is not None and str(name).strip() else f"column_{i + 1}"
+                while name in columns:
+                    name = f"{name}_{i + 1}"
+                columns.append(name)
+            width = len(columns)
+            keep = None
+            if usecols is not None:
+                wanted = set(usecols)
+                keep = [i for i, name in enumerate(columns) if name in wanted]
+                columns = [columns[i] for i in keep]
+
+            batch = []
+            for row in rows:
+                if not any(v is not None for v in row):
+                    continue  # Skip blank rows (read-only sheets often report trailing empties)
+                if skip:
+                    skip -= 1
+                    continue
+                row = tuple(row[:width]) + (None,) * (width - len(row))
+                batch.append(row if keep is None else tuple(row[i] for i in keep))
+                if len(batch) >= FileReader._rows(chunk_size):
+                    yield pd.DataFrame.from_records(batch, columns=columns)
+                    batch = []
+            if batch:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+        finally:
+            wb.close()
+
+    @staticmethod
+    def iter_xml(
+        file_path: str,
+        chunk_size: Union[int, Callable[[], int]] = 10000,
+        record_path: Optional[str] = None,
+        columns: Optional[Dict[str, str]] = None,
+        skip: int = 0
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream records out of an XML document with iterparse
+        record_path: element path of one record, e.g. "orders/order" (matched against the
+                     end of the element path, namespaces ignored); defaults to the root's children
+        columns: {column_name: relative path}; paths support "child/grandchild", "@attr",
+                 "child/@attr" and "." for the record text. Inferred from the first record if omitted
+        Processed elements are cleared so memory stays flat on large files.
+        skip: records to pass over first (resuming from a checkpoint)
+        """
+        from xml.etree.ElementTree import iterparse
+
+        def local(tag: str) -> str:
+            return tag.rsplit('}', 1)[-1]
+
+        def find(elem, path: str):
+            # Namespace-agnostic find for a slash separated child path
+            for part in [p for p in path.split('/') if p and p != '.']:
+                elem = next((c for c in elem if local(c.tag) == part), None)
+                if elem is None:
+                    return None
+            return elem
+
+        def extract(elem, path: str):
+            if path in ('.', 'text()'):
+                return elem.text.strip() if elem.text and elem.text.strip() else None
+            node_path, _, attr = path.partition('@')
+            node = find(elem, node_path.rstrip('/')) if node_path.strip('/') else elem
+            if node is None:
+                return None
+            if attr:
+                return next((v for k, v in node.attrib.items() if local(k) == attr), None)
+            return node.text.strip() if node.text and node.text.strip() else None
+
+        def infer_columns(elem) -> Dict[str, str]:
+            inferred = {local(k): f"@{local(k)}" for k in elem.attrib}
+            for child in elem:
+                name = local(child.tag)
+                inferred.setdefault(name, name)
+            return inferred or {local(elem.tag): '.'}
+
+        target = [p for p in (record_path or '').strip('/').split('/') if p]
+        stack: List[Any] = []
+        batch: List[Dict[str, Any]] = []
+
+        with open_source(file_path) as f:
+            for event, elem in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    stack.append(elem)
+                    continue
+
+                path = [local(e.tag) for e in stack]
+                is_record = path[-len(target):] == target if target else len(stack) == 2
+                if is_record:
+                    if skip:
+                        skip -= 1
+                    else:
+                        if columns is None:
+                            columns = infer_columns(elem)
+                        batch.append({col: extract(elem, xpath) for col, xpath in columns.items()})
+                    # Free the record and detach it from its parent
+                    elem.clear()
+                    if len(stack) > 1:
+                        stack[-2].remove(elem)
+                    if len(batch) >= FileReader._rows(chunk_size):
+                        yield pd.DataFrame(batch, columns=list(columns))
+                        batch = []
+                stack.pop()
+
+        if batch:
+            yield pd.DataFrame(batch, columns=list(columns))
+
+    @staticmethod
+    def read_xml(file_path: str, record_path: Optional[str] = None,
+                 columns: Optional[Dict[str, str]] = None) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        Read XML file and infer schema
+        Returns: (DataFrame, schema_dict)
+        """
+        try:
+            chunks = list(FileReader.iter_xml(file_path, 50000, record_path, columns))
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            schema = FileReader._infer_schema(df)
+            return df, schema
+        except Exception as e:
+            logger.error(f"Error reading XML file {file_path}: {e}")
+            raise
+
+    # Comparison operators accepted in source filters, as (column, op, value) triples
+    FILTER_OPS = ("==", "!=", "<", "<=", ">", ">=", "in", "not in")
+
+    @staticmethod
+    def parse_filters(spec: Any) -> List[Tuple[str, str, Any]]:
+        """
+        Normalize a job YAML source.filter into AND-ed (column, op, value) triples
+        Accepts [{column, op, value}, ...] or [[column, op, value], ...]
+        """
+        filters = []
+        for item in spec or []:
+            if isinstance(item, dict):
+                column, op, value = item.get("column"), item.get("op", "=="), item.get("value")
+            else:
+                column, op, value = item
+            op = "==" if op == "=" else str(op).lower()
+            if op not in FileReader.FILTER_OPS:
+                raise ValueError(f"Unsupported filter operator: {op}")
+            filters.append((column, op, value))
+        return filters
+
+    @staticmethod
+    def _row_group_excluded_by(row_group, column_index: Dict[str, int],
+                               filters: List[Tuple[str, str, Any]]) -> Optional[int]:
+        """Index of the first filter whose min/max statistics rule out the whole row group"""
+        for i, (column, op, value) in enumerate(filters):
+            idx = column_index.get(column)
+            if idx is None:
+                continue
+            stats = row_group.column(idx).statistics
+            if stats is None or not stats.has_min_max:
+                continue
+            lo, hi = stats.min, stats.max
+            try:
+                excluded = (
+                    (op == "==" and (value < lo or value > hi))
+                    or (op == "in" and all(v < lo or v > hi for v in value))
+                    or (op == "<" and not lo < value)
+                    or (op == "<=" and not lo <= value)
+                    or (op == ">" and not hi > value)
+                    or (op == ">=" and not hi >= value)
+                    or (op == "!=" and lo == hi == value)
+                )
+            except TypeError:
+                # Statistics and filter value are not comparable; read the row group
+                continue
+            if excluded:
+                return i
+        return None
+
+    @staticmethod
+    def _row_group_may_match(row_group, column_index: Dict[str, int], filters: List[Tuple[str, str, Any]]) -> bool:
+        """False only when the row group's min/max statistics rule out every filter match"""
+        return FileReader._row_group_excluded_by(row_group, column_index, filters) is None
+
+    @staticmethod
+    def _arrow_term(column: str, op: str, value: Any):
+        import pyarrow.compute as pc
+
+        field = pc.field(column)
+        if op == "in":
+            return field.isin(list(value))
+        if op == "not in":
+            return ~field.isin(list(value))
+        return {
+            "==": field == value, "!=": field != value,
+            "<": field < value, "<=": field <= value,
+            ">": field > value, ">=": field >= value,
+        }[op]
+
+    @staticmethod
+    def _pandas_mask(series: pd.Series, op: str, value: Any) -> pd.Series:
+        """Rows of series passing one filter; nulls never pass, as in SQL"""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            value = [pd.Timestamp(v) for v in value] if op in ("in", "not in") else pd.Timestamp(value)
+        if op == "in":
+            mask = series.isin(list(value))
+        elif op == "not in":
+            mask = ~series.isin(list(value))
+        else:
+            mask = {
+                "==": lambda: series == value, "!=": lambda: series != value,
+                "<": lambda: series < value, "<=": lambda: series <= value,
+                ">": lambda: series > value, ">=": lambda: series >= value,
+            }[op]()
+        return mask.fillna(False).astype(bool) & series.notna()
+
+    @staticmethod
+    def _filter_frame(df: pd.DataFrame, filters: List[Tuple[str, str, Any]],
+                      report: Optional[FilterReport], stage: str, compare: Optional[Dict[str, pd.Series]] = None) -> pd.DataFrame:
+        """
+        Apply filters one after another, crediting each with the rows it removes
+        compare: typed views of filter columns when df itself holds unconverted strings
+        """
+        for flt in filters:
+            column, op, value = flt
+            if column not in df.columns:
+                raise ValueError(f"Filter column not found in source: {column}")
+            series = compare[column].loc[df.index] if compare else df[column]
+            mask = FileReader._pandas_mask(series, op, value)
+            if report is not None and not mask.all():
+                dropped = df[~mask]
+                report.record(flt, stage, len(dropped), dropped.memory_usage(index=False, deep=True).sum())
+            df = df[mask]
+        return df
+
+    @staticmethod
+    def _filter_chunks(chunks: Iterator[pd.DataFrame], filters: List[Tuple[str, str, Any]],
+                       report: Optional[FilterReport]) -> Iterator[pd.DataFrame]:
+        """Row filtering right after parsing, for readers without native pushdown"""
+        for df in chunks:
+            filtered = FileReader._filter_frame(df, filters, report, "post_parse")
+            filtered.attrs = dict(df.attrs)
+            if len(filtered):
+                yield filtered
+
+    @staticmethod
+    def _typed_like(series: pd.Series, value: Any) -> pd.Series:
+        """Convert a raw string column just enough to compare it with a filter value"""
+        sample = value[0] if isinstance(value, (list, tuple, set)) and value else value
+        if isinstance(sample, bool):
+            return series.str.lower().map({"true": True, "false": False})
+        if isinstance(sample, (int, float)):
+            return pd.to_numeric(series, errors="coerce")
+        if hasattr(sample, "year"):
+            return pd.to_datetime(series, errors="coerce")
+        return series
+
+    @staticmethod
+    def _convert_str_frame(df: pd.DataFrame, dtype: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Type conversion of the surviving rows, approximating read_csv inference"""
+        dtype = dtype or {}
+        for column in df.columns:
+            if column in dtype:
+                df[column] = df[column].astype(dtype[column])
+                continue
+            try:
+                df[column] = pd.to_numeric(df[column])
+            except (ValueError, TypeError):
+                lowered = df[column].dropna().str.lower()
+                if len(lowered) and lowered.isin(["true", "false"]).all():
+                    df[column] = df[column].str.lower().map({"true": True, "false": False})
+        return df
+
+    @staticmethod
+    def iter_csv_filtered(
+        file_path: str,
+        chunk_size: Union[int, Callable[[], int]],
+        filters: List[Tuple[str, str, Any]],
+        usecols: Optional[List[str]] = None,
+        dtype: Optional[Dict[str, str]] = None,
+        report: Optional[FilterReport] = None,
+        skip: int = 0
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Early CSV filtering: chunks are parsed as raw strings, only the filter columns
+        are converted to evaluate the filters, and type conversion of every other
+        column happens on the surviving rows only
+        """
+        csv_options: Dict[str, Any] = {"dtype": str}
+        offset = skip
+        if usecols is not None:
+            keep = set(usecols)
+            wanted = keep | {c for c, _, _ in filters}
+            csv_options["usecols"] = lambda column: column in wanted
+        for df in FileReader._stream_chunks(pd.read_csv, file_path, chunksize=chunk_size, skip_records=skip,
+                                            **csv_options):
+            offset += len(df)
+            compare = {c: FileReader._typed_like(df[c], v) for c, _, v in filters if c in df.columns}
+            df = FileReader._filter_frame(df, filters, report, "csv_early", compare)
+            if not len(df):
+                continue
+            if usecols is not None:
+                df = df[[c for c in df.columns if c in keep]]
+            df = FileReader._convert_str_frame(df.copy(), dtype)
+            df.attrs["source_offset"] = offset
+            yield df
+
+    @staticmethod
+    def iter_parquet(
+        file_path: Union[str, Any],
+        chunk_size: Union[int, Callable[[], int]] = 10000,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Tuple[str, str, Any]]] = None,
+        report: Optional[FilterReport] = None,
+        skip: int = 0
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream a Parquet file row group by row group
+        columns: projection; only these column chunks are read (unknown names are ignored)
+        filters: AND-ed (column, op, value) triples; row groups whose min/max
+                 statistics cannot match are skipped and the rest are filtered row by row
+        report: credited with the rows/bytes each filter eliminated
+        skip: source rows to pass over first; whole row groups before it are never read
+        file_path may also be a seekable binary file; if it has a prefetch(metadata,
+        row_groups, column_indices) method it is told which column chunks will be read
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        filters = filters or []
+        with pq.ParquetFile(file_path) as pf:
+            metadata = pf.metadata
+            names = pf.schema_arrow.names
+            column_index = {pf.schema.column(i).path: i for i in range(metadata.num_columns)}
+
+            selected = [c for c in columns if c in names] if columns else list(names)
+            read_columns = selected + [c for c, _, _ in filters if c in names and c not in selected]
+            row_groups = []
+            # (source offset of the group's first row, rows) for every row group that is read
+            spans = []
+            group_start = 0
+            for i in range(metadata.num_row_groups):
+                row_group = metadata.row_group(i)
+                start, group_start = group_start, group_start + row_group.num_rows
+                if group_start <= skip:
+                    continue
+                excluded_by = FileReader._row_group_excluded_by(row_group, column_index, filters)
+                if excluded_by is None:
+                    row_groups.append(i)
+                    spans.append((start, row_group.num_rows))
+                elif report is not None:
+                    report.record(filters[excluded_by], "parquet_row_groups", row_group.num_rows, row_group.total_byte_size)
+            logger.info(
+                f"Parquet {getattr(file_path, 'name', file_path)}: reading {len(row_groups)}/{metadata.num_row_groups} "
+                f"row groups, {len(read_columns)}/{len(names)} columns"
+            )
+            if not row_groups:
+                return
+            if hasattr(file_path, "prefetch"):
+                wanted = set(read_columns)
+                file_path.prefetch(metadata, row_groups,
+                                   sorted(i for path, i in column_index.items() if path.split(".")[0] in wanted))
+
+            def source_offset(rows_read: int) -> int:
+                # Map rows read across the selected row groups back to a source offset
+                for start, num_rows in spans:
+                    if rows_read <= num_rows:
+                        return start + rows_read
+                    rows_read -= num_rows
+                return group_start
+
+            terms = [(flt, FileReader._arrow_term(*flt)) for flt in filters]
+            # Rows of the first selected group that precede the resume point
+            to_drop = max(0, skip - spans[0][0]) if spans else 0
+            rows_read = 0
+            for batch in pf.iter_batches(batch_size=FileReader._rows(chunk_size), row_groups=row_groups, columns=read_columns):
+                rows_read += batch.num_rows
+                if to_drop:
+                    dropped = min(to_drop, batch.num_rows)
+                    batch, to_drop = batch.slice(dropped), to_drop - dropped
+                    if batch.num_rows == 0:
+                        continue
+                table = pa.Table.from_batches([batch])
+                for flt, term in terms:
+                    kept = table.filter(term)
+                    if report is not None and kept.num_rows < table.num_rows:
+                        report.record(flt, "parquet_rows", table.num_rows - kept.num_rows, table.nbytes - kept.nbytes)
+                    table = kept
+                if table.num_rows == 0:
+                    continue
+                df = table.select(selected).to_pandas()
+                df.attrs["source_offset"] = source_offset(rows_read)
+                yield df
+
+    @staticmethod
+    def read_parquet(file_path: str, columns: Optional[List[str]] = None,
+                     filters: Optional[List[Tuple[str, str, Any]]] = None) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        Read Parquet file and infer schema
+        Returns: (DataFrame, schema_dict)
+        """
+        try:
+            chunks = list(FileReader.iter_parquet(file_path, 100000, columns, filters))
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns or [])
+            schema = FileReader._infer_schema(df)
+            return df, schema
+        except Exception as e:
+            logger.error(f"Error reading Parquet file {file_path}: {e}")
+            raise
+
     @staticmethod
     def _infer_schema(df: pd.DataFrame) -> Dict[str, str]:
         """
@@ -64,8 +694,11 @@ class FileReader:
         type_mapping = {
             'int64': 'INTEGER',
             'int32': 'INTEGER',
+            'int16': 'INTEGER',
+            'int8': 'INTEGER',
             'float64': 'DOUBLE PRECISION',
-            'float32': 'REAL',
+            # Chunks may be downcast to float32 only where exact; the column still takes any double
+            'float32': 'DOUBLE PRECISION',
             'object': 'TEXT',
             'bool': 'BOOLEAN',
             'datetime64[ns]': 'TIMESTAMP',
@@ -95,9 +728,11 @@ class FileReader:
         return schema
     
     @staticmethod
-    def read_file(file_path: str, file_type: str) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    def read_file(file_path: str, file_type: str, **options) -> Tuple[pd.DataFrame, Dict[str, str]]:
         """
         Read file based on type
+        options: format specific reader options (json_path/flatten_depth for JSON,
+                 record_path/columns for XML, usecols/filters for Parquet)
         Returns: (DataFrame, schema_dict)
         """
         file_type = file_type.lower()
@@ -105,22 +740,101 @@ class FileReader:
         if file_type in ['csv', 'text/csv']:
             return FileReader.read_csv(file_path)
         elif file_type in ['json', 'application/json']:
-            return FileReader.read_json(file_path)
+            return FileReader.read_json(file_path, **options)
         elif file_type in ['excel', 'xlsx', 'xls']:
             return FileReader.read_excel(file_path)
+        elif file_type in ['xml', 'application/xml', 'text/xml']:
+            return FileReader.read_xml(file_path, options.get("record_path"), options.get("columns"))
+        elif file_type == 'parquet':
+            return FileReader.read_parquet(file_path, options.get("usecols"), options.get("filters"))
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
 
     @staticmethod
-    def get_iterator(file_path: str, file_type: str, chunk_size: int = 10000):
+    def get_iterator(file_path: str, file_type: str, chunk_size: Union[int, Callable[[], int]] = 10000, **options):
         """
         Get an iterator for the file content in chunks
+        chunk_size: rows per chunk, or a callable (e.g. a ChunkSizer) consulted before
+                    each chunk by the CSV, JSON array, Excel and XML readers
+                    (JSON Lines and Parquet use its first value throughout)
+        options: format specific reader options (json_path/flatten_depth for JSON,
+                 sheet_name for Excel, record_path/columns for XML)
+                 plus usecols/dtype from a read plan: usecols is pushed into the CSV,
+                 Excel and Parquet readers and projected per chunk for JSON and XML;
+                 dtype is only pushed into the CSV reader, the other formats get
+                 their planned dtypes later in ReadPlan.apply
+                 plus filters/filter_report from the job's source.filter: row-group
+                 statistics for Parquet, string-level filtering before type conversion
+                 for CSV, and right after parsing for the other formats
+                 plus skip_rows: source records to pass over first (resuming from a
+                 checkpoint); every chunk carries attrs["source_offset"], the source
+                 records consumed so far, counted before any filtering
         """
         file_type = file_type.lower()
+        usecols, dtype = options.get("usecols"), options.get("dtype")
+        filters, report = options.get("filters") or [], options.get("filter_report")
+        # Filter columns are read even when the plan does not keep them
+        read_cols = usecols + [c for c, _, _ in filters if c not in usecols] if usecols is not None else None
+        skip = int(options.get("skip_rows") or 0)
+
         if file_type in ['csv', 'text/csv']:
-            return pd.read_csv(file_path, chunksize=chunk_size)
+            if filters:
+                return FileReader.iter_csv_filtered(file_path, chunk_size, filters, usecols, dtype, report, skip)
+            csv_options = {"dtype": dtype} if dtype else {}
+            if usecols is not None:
+                wanted = set(usecols)
+                csv_options["usecols"] = lambda column: column in wanted
+            # Records already loaded are parsed and dropped: a quoted field may hold newlines
+            chunks = FileReader._stream_chunks(pd.read_csv, file_path, chunksize=chunk_size, skip_records=skip,
+                                               **csv_options)
+            return FileReader._with_offsets(chunks, skip)
         elif file_type in ['json', 'application/json']:
-            # Note: pd.read_json only supports chunking for lines=True
-            return pd.read_json(file_path, lines=True, chunksize=chunk_size)
+            json_path = options.get("json_path")
+            if json_path or FileReader._json_layout(file_path) == "array":
+                chunks = FileReader.iter_json_array(
+                    file_path, chunk_size, json_path, options.get("flatten_depth", 1), skip=skip
+                )
+            else:
+                # JSON Lines
+                chunks = FileReader._stream_chunks(pd.read_json, file_path, lines=True, chunksize=chunk_size,
+                                                   skip_lines=skip)
+            chunks = FileReader._with_offsets(chunks, skip)
+            return FileReader._project(FileReader._filter_chunks(chunks, filters, report), usecols)
+        elif file_type in ['excel', 'xlsx', 'xlsm']:
+            chunks = FileReader.iter_excel(file_path, chunk_size, options.get("sheet_name"), usecols=read_cols, skip=skip)
+            chunks = FileReader._with_offsets(chunks, skip)
+            return FileReader._project(FileReader._filter_chunks(chunks, filters, report), usecols)
+        elif file_type in ['xml', 'application/xml', 'text/xml']:
+            chunks = FileReader.iter_xml(file_path, chunk_size, options.get("record_path"), options.get("columns"), skip)
+            chunks = FileReader._with_offsets(chunks, skip)
+            return FileReader._project(FileReader._filter_chunks(chunks, filters, report), usecols)
+        elif file_type == 'parquet':
+            return FileReader.iter_parquet(file_path, chunk_size, usecols, filters, report, skip)
         else:
             raise ValueError(f"Chunked reading not supported for type: {file_type}")
+
+
+def excel_sheet_to_chunk_files(file_path: str, sheet_name: str, out_dir: str, chunk_size: int = 10000,
+                               usecols: Optional[List[str]] = None,
+                               memory_budget_mb: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Worker-process entry point: stream one sheet into pickled DataFrame chunk files
+    usecols: header names to keep (the read plan projection plus any filter columns)
+    memory_budget_mb: this worker's share of the job budget; chunks are then sized by a
+                      ChunkSizer of its own starting at chunk_size rows
+    Returns: {"sheet", "files", "rows"}
+    """
+    from .chunk_sizer import ChunkSizer
+
+    files = []
+    rows = 0
+    safe_sheet = ''.join(c if c.isalnum() else '_' for c in sheet_name)
+    sizer = ChunkSizer(memory_budget_mb, initial_rows=chunk_size) if memory_budget_mb else None
+    for i, df in enumerate(FileReader.iter_excel(file_path, sizer or chunk_size, sheet_name, usecols=usecols)):
+        if sizer:
+            sizer.observe(df)
+        path = str(Path(out_dir) / f"{safe_sheet}_{i:06d}.pkl")
+        df.to_pickle(path)
+        files.append(path)
+        rows += len(df)
+    return {"sheet": sheet_name, "files": files, "rows": rows}
@@ -0,0 +1,226 @@
+"""
+Cluster and service health history in TimescaleDB
+A periodic sampler records VM power state, service presence and host
+metrics into a compressed hypertable with a retention policy; continuous
+aggregates serve downsampled ranges for charts.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+from .cluster_status import GUEST_PROCESS_MARKERS, ClusterStatusCollector
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL_SECONDS = float(os.getenv("CLUSTER_HEALTH_SAMPLE_INTERVAL", "60"))
+CHUNK_INTERVAL = os.getenv("CLUSTER_HEALTH_CHUNK_INTERVAL", "1 day")
+COMPRESS_AFTER = os.getenv("CLUSTER_HEALTH_COMPRESS_AFTER", "7 days")
+RETENTION = os.getenv("CLUSTER_HEALTH_RETENTION", "90 days")
+
+SAMPLES_TABLE = "cluster_health_samples"
+
+# Continuous aggregates by bucket width; the raw table is only read for short ranges
+AGGREGATES = {
+    "5m": "cluster_health_5m",
+    "1h": "cluster_health_1h",
+}
+
+SCHEMA_SQL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {SAMPLES_TABLE} (
+        time TIMESTAMPTZ NOT NULL,
+        component TEXT NOT NULL,
+        up SMALLINT NOT NULL,
+        cpu_percent DOUBLE PRECISION,
+        mem_percent DOUBLE PRECISION,
+        load1 DOUBLE PRECISION
+    )
+    """,
+    f"""
+    SELECT create_hypertable('{SAMPLES_TABLE}', 'time',
+        chunk_time_interval => INTERVAL '{CHUNK_INTERVAL}', if_not_exists => TRUE)
+    """,
+    f"CREATE INDEX IF NOT EXISTS ix_{SAMPLES_TABLE}_component_time ON {SAMPLES_TABLE} (component, time DESC)",
+]
+
+AGGREGATE_SQL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
+    WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+    SELECT time_bucket(INTERVAL '{width}', time) AS bucket,
+           component,
+           avg(up)::DOUBLE PRECISION AS uptime_ratio,
+           avg(cpu_percent) AS cpu_percent,
+           avg(mem_percent) AS mem_percent,
+           max(load1) AS load1_max,
+           count(*) AS samples
+    FROM {table}
+    GROUP BY bucket, component
+    WITH NO DATA
+"""
+
+AGGREGATE_POLICY_SQL = """
+    SELECT add_continuous_aggregate_policy('{view}',
+        start_offset => INTERVAL '{start}', end_offset => INTERVAL '{width}',
+        schedule_interval => INTERVAL '{width}', if_not_exists => TRUE)
+"""
+
+AGGREGATE_WIDTHS = {"5m": ("5 minutes", "1 day"), "1h": ("1 hour", "7 days")}
+
+
+async def ensure_health_schema(engine) -> bool:
+    """
+    Create the hypertable, policies and continuous aggregates (idempotent)
+    Returns False when TimescaleDB is unavailable so the sampler can stay off.
+    """
+    try:
+        async with engine.begin() as conn:
+            for sql in SCHEMA_SQL:
+                await conn.execute(text(sql))
+
+            result = await conn.execute(text(
+                "SELECT compression_enabled FROM timescaledb_information.hypertables "
+                "WHERE hypertable_name = :table"
+            ), {"table": SAMPLES_TABLE})
+            if not result.scalar():
+                await conn.execute(text(
+                    f"ALTER TABLE {SAMPLES_TABLE} SET (timescaledb.compress, "
+                    f"timescaledb.compress_segmentby = 'component', timescaledb.compress_orderby = 'time DESC')"
+                ))
+            await conn.execute(text(
+                f"SELECT add_compression_policy('{SAMPLES_TABLE}', INTERVAL '{COMPRESS_AFTER}', if_not_exists => TRUE)"
+            ))
+            await conn.execute(text(
+                f"SELECT add_retention_policy('{SAMPLES_TABLE}', INTERVAL '{RETENTION}', if_not_exists => TRUE)"
+            ))
+
+            for key, view in AGGREGATES.items():
+                width, start = AGGREGATE_WIDTHS[key]
+                await conn.execute(text(AGGREGATE_SQL.format(view=view, width=width, table=SAMPLES_TABLE)))
+                await conn.execute(text(AGGREGATE_POLICY_SQL.format(view=view, width=width, start=start)))
+        return True
+    except Exception as e:
+        logger.warning(f"Cluster health history disabled (TimescaleDB setup failed): {e}")
+        return False
+
+
+def host_metrics() -> Dict[str, Optional[float]]:
+    """CPU/memory/load of the API host; psutil is used when installed"""
+    metrics: Dict[str, Optional[float]] = {"cpu_percent": None, "mem_percent": None, "load1": None}
+    try:
+        metrics["load1"] = os.getloadavg()[0]
+    except (AttributeError, OSError):
+        pass
+    try:
+        import psutil
+        metrics["cpu_percent"] = psutil.cpu_percent(interval=None)
+        metrics["mem_percent"] = psutil.virtual_memory().percent
+    except ImportError:
+        pass
+    return metrics
+
+
+def snapshot_to_rows(snapshot: Dict[str, Any], vm_nodes: List[str], known_services: set,
+                     metrics: Dict[str, Optional[float]], at: datetime) -> List[Dict[str, Any]]:
+    """One row per VM, per known service and one for the host"""
+    running = set(snapshot.get("running_vms", []))
+    present = set(snapshot.get("services", []))
+    known_services.update(present)
+
+    rows = [{"time": at, "component": f"vm:{node}", "up": int(node in running),
+             "cpu_percent": None, "mem_percent": None, "load1": None} for node in vm_nodes]
+    rows += [{"time": at, "component": f"service:{name}", "up": int(name in present),
+              "cpu_percent": None, "mem_percent": None, "load1": None} for name in sorted(known_services)]
+    rows.append({"time": at, "component": "host", "up": 1, **metrics})
+    return rows
+
+
+class HealthSampler:
+    """Periodically records the collector snapshot into the hypertable"""
+
+    def __init__(self, collector: ClusterStatusCollector, session_factory,
+                 interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.collector = collector
+        self.session_factory = session_factory
+        self.interval = interval
+        self.known_services = set(GUEST_PROCESS_MARKERS) | {"Native:minio"}
+        self._task: Optional[asyncio.Task] = None
+
+    async def sample_once(self) -> int:
+        snapshot = await self.collector.get()
+        rows = snapshot_to_rows(
+            snapshot, list(self.collector.vm_paths), self.known_services,
+            host_metrics(), datetime.now(timezone.utc)
+        )
+        async with self.session_factory() as db:
+            await db.execute(text(
+                f"INSERT INTO {SAMPLES_TABLE} (time, component, up, cpu_percent, mem_percent, load1) "
+                f"VALUES (:time, :component, :up, :cpu_percent, :mem_percent, :load1)"
+            ), rows)
+            await db.commit()
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sample_once()
+            except Exception as e:
+                logger.error(f"Cluster health sampling failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+def pick_resolution(start: datetime, end: datetime, resolution: str = "auto") -> str:
+    """raw for short ranges, then 5 minute and 1 hour aggregates"""
+    if resolution != "auto":
+        if resolution not in ("raw", *AGGREGATES):
+            raise ValueError(f"Unsupported resolution: {resolution}")
+        return resolution
+    span = end - start
+    if span <= timedelta(hours=2):
+        return "raw"
+    if span <= timedelta(days=2):
+        return "5m"
+    return "1h"
+
+
+async def query_history(db: AsyncSession, start: datetime, end: datetime,
+                        component: Optional[str] = None, resolution: str = "auto") -> Dict[str, Any]:
+    resolution = pick_resolution(start, end, resolution)
+    params: Dict[str, Any] = {"start": start, "end": end}
+    component_sql = ""
+    if component:
+        component_sql = "AND component = :component"
+        params["component"] = component
+
+    if resolution == "raw":
+        sql = (f"SELECT time AS bucket, component, up::DOUBLE PRECISION AS uptime_ratio, cpu_percent, "
+               f"mem_percent, load1 AS load1_max, 1 AS samples FROM {SAMPLES_TABLE} "
+               f"WHERE time >= :start AND time < :end {component_sql} ORDER BY component, time")
+    else:
+        sql = (f"SELECT bucket, component, uptime_ratio, cpu_percent, mem_percent, load1_max, samples "
+               f"FROM {AGGREGATES[resolution]} "
+               f"WHERE bucket >= :start AND bucket < :end {component_sql} ORDER BY component, bucket")
+
+    result = await db.execute(text(sql), params)
+    return {
+        "resolution": resolution,
+        "start": start,
+        "end": end,
+        "points": [dict(row) for row in result.mappings().all()],
+    }
@@ -0,0 +1,214 @@
+"""
+Job-scoped log capture
+Tags log records with the active ETL job/run, keeps a bounded in-memory
+buffer per run for live tailing and flushes records in batches to a
+compact JSON-lines store (one file per run).
+
+The active run is held in a contextvar, so records are captured from the
+job's task and from asyncio.to_thread calls, which copy the context. Plain
+executor threads do not inherit it: wrap their callables with bind_run().
+Records logged inside worker processes (e.g. the Excel sheet parsers) are
+not captured; the parent logs their results instead.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_LOG_DIR = os.getenv("JOB_LOG_DIR", "job_logs")
+RUN_BUFFER_SIZE = int(os.getenv("JOB_LOG_BUFFER_SIZE", "2000"))
+FLUSH_BATCH_SIZE = int(os.getenv("JOB_LOG_FLUSH_BATCH_SIZE", "200"))
+FLUSH_INTERVAL_SECONDS = float(os.getenv("JOB_LOG_FLUSH_INTERVAL", "1.0"))
+MAX_TRACKED_RUNS = int(os.getenv("JOB_LOG_MAX_RUNS", "200"))
+# Run ids are generated by start_run; anything else never names a store file
+RUN_ID_PATTERN = re.compile(r"^[0-9a-f]{12}$")
+
+_current_run: contextvars.ContextVar[Optional["RunLog"]] = contextvars.ContextVar(
+    "current_job_run", default=None
+)
+
+
+class RunLog:
+    """Log state for one run of one job"""
+
+    def __init__(self, job_id: int, run_id: str, store_dir: Path):
+        self.job_id = job_id
+        self.run_id = run_id
+        self.path = store_dir / f"job_{job_id}" / f"{run_id}.jsonl"
+        self.buffer: deque = deque(maxlen=RUN_BUFFER_SIZE)
+        self.pending: List[Dict[str, Any]] = []
+        self.seq = 0
+        self.finished = False
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        with self.lock:
+            self.seq += 1
+            entry["seq"] = self.seq
+            self.buffer.append(entry)
+            self.pending.append(entry)
+            due = (
+                len(self.pending) >= FLUSH_BATCH_SIZE
+                or time.monotonic() - self.last_flush >= FLUSH_INTERVAL_SECONDS
+            )
+            if due:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self.last_flush = time.monotonic()
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, separators=(",", ":"), default=str) + "\n" for e in batch))
+
+    def entries_after(self, seq: int) -> List[Dict[str, Any]]:
+        """Entries newer than seq, falling back to the store if the buffer was outrun"""
+        with self.lock:
+            if not self.buffer or self.buffer[0]["seq"] <= seq + 1:
+                return [e for e in self.buffer if e["seq"] > seq]
+            self._flush_locked()
+        return [e for e in read_store(self.path) if e["seq"] > seq]
+
+
+class JobLogRegistry:
+    """Process-wide registry of tracked runs"""
+
+    def __init__(self, store_dir: str = JOB_LOG_DIR):
+        self.store_dir = Path(store_dir)
+        self.runs: "OrderedDict[str, RunLog]" = OrderedDict()
+        self.latest_by_job: Dict[int, str] = {}
+        self.lock = threading.Lock()
+
+    def start_run(self, job_id: int, run_id: Optional[str] = None) -> RunLog:
+        if run_id is not None and not valid_run_id(run_id):
+            raise ValueError(f"Invalid run id '{run_id}'")
+        run = RunLog(job_id, run_id or uuid.uuid4().hex[:12], self.store_dir)
+        with self.lock:
+            self.runs[run.run_id] = run
+            self.latest_by_job[job_id] = run.run_id
+            self._evict_locked()
+        return run
+
+    def get_run(self, job_id: int, run_id: Optional[str] = None) -> Optional[RunLog]:
+        with self.lock:
+            run_id = run_id or self.latest_by_job.get(job_id)
+            run = self.runs.get(run_id) if run_id else None
+        if run is not None and run.job_id == job_id:
+            return run
+        return None
+
+    def store_path(self, job_id: int, run_id: str) -> Path:
+        if not valid_run_id(run_id):
+            raise ValueError(f"Invalid run id '{run_id}'")
+        return self.store_dir / f"job_{job_id}" / f"{run_id}.jsonl"
+
+    def _evict_locked(self) -> None:
+        while len(self.runs) > MAX_TRACKED_RUNS:
+            for run_id, run in self.runs.items():
+                if run.finished:
+                    del self.runs[run_id]
+                    break
+            else:
+                break
+
+
+def valid_run_id(run_id: Optional[str]) -> bool:
+    return bool(run_id) and RUN_ID_PATTERN.match(run_id) is not None
+
+
+registry = JobLogRegistry()
+
+
+class JobLogHandler(logging.Handler):
+    """Routes records emitted inside a job context to that run's buffer"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        run = _current_run.get()
+        if run is None:
+            return
+        try:
+            run.append({
+                "ts": round(record.created, 3),
+                "level": record.levelname,
+                "logger": record.name,
+                "msg": record.getMessage(),
+            })
+        except Exception:
+            self.handleError(record)
+
+
+class JobContextFilter(logging.Filter):
+    """Adds job_id/run_id attributes so formatters can include them"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        run = _current_run.get()
+        record.job_id = run.job_id if run else None
+        record.run_id = run.run_id if run else None
+        return True
+
+
+def install(logger_name: str = "backend") -> None:
+    """Attach the job log handler to the backend logger tree (idempotent)"""
+    target = logging.getLogger(logger_name)
+    if any(isinstance(h, JobLogHandler) for h in target.handlers):
+        return
+    handler = JobLogHandler()
+    handler.addFilter(JobContextFilter())
+    target.addHandler(handler)
+    if target.level == logging.NOTSET:
+        target.setLevel(logging.INFO)
+
+
+@contextmanager
+def job_log_context(job_id: int, run_id: Optional[str] = None) -> Iterator[RunLog]:
+    """Capture every backend log record emitted inside the block for this job run"""
+    run = registry.start_run(job_id, run_id)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+        run.finished = True
+        run.flush()
+
+
+def bind_run(fn: Callable) -> Callable:
+    """fn wrapped to log into the caller's run when it is called on a pool thread"""
+    run = _current_run.get()
+    if run is None:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current_run.set(run)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_run.reset(token)
+    return wrapper
+
+
+def read_store(path: Path) -> List[Dict[str, Any]]:
+    """Read all flushed entries of a run"""
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,155 @@
+"""
+Keyset pagination, field projection and conditional GET for list endpoints
+Without after/limit a list endpoint returns every row, as it did before
+pagination; clients page by passing limit and following X-Next-Cursor.
+ETags are derived from an aggregate over the page window, so a revalidation
+that matches is answered with 304 before any row is fetched or serialized.
+"""
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+import orjson
+from fastapi import HTTPException, Query, Request, Response
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+
+class PageParams:
+    """Query parameters shared by paginated list endpoints"""
+
+    def __init__(
+        self,
+        after: Optional[int] = Query(None, description="Return rows with id greater than this cursor"),
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE,
+                                     description=f"Page size; {DEFAULT_PAGE_SIZE} when only after is given"),
+        fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,name"),
+    ):
+        self.after = after
+        # No after/limit: the whole list, unpaged
+        self.limit = limit if limit is not None or after is None else DEFAULT_PAGE_SIZE
+        self.fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+
+def _columns_for(model, fields: Optional[List[str]]):
+    table_columns = model.__table__.columns
+    if not fields:
+        return list(table_columns)
+
+    unknown = [f for f in fields if f not in table_columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # The cursor column is always returned
+    names = ["id"] + [f for f in fields if f != "id"]
+    return [table_columns[name] for name in names]
+
+
+def _window(model, page: PageParams, criteria, *columns):
+    stmt = select(*columns).order_by(model.id)
+    if page.limit is not None:
+        stmt = stmt.limit(page.limit + 1)
+    if criteria:
+        stmt = stmt.where(*criteria)
+    if page.after is not None:
+        stmt = stmt.where(model.id > page.after)
+    return stmt
+
+
+async def keyset_page(
+    db: AsyncSession,
+    model,
+    page: PageParams,
+    *criteria,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Fetch one page ordered by id, selecting only the requested columns
+    Returns: (rows as dicts, next cursor or None)
+    """
+    stmt = _window(model, page, criteria, *_columns_for(model, page.fields))
+    result = await db.execute(stmt)
+    rows = [dict(row) for row in result.mappings().all()]
+
+    next_cursor = None
+    if page.limit is not None and len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = rows[-1]["id"]
+    return rows, next_cursor
+
+
+async def page_etag(
+    db: AsyncSession,
+    model,
+    page: PageParams,
+    *criteria,
+) -> Tuple[str, Optional[int]]:
+    """
+    Validator for one page from count(*), max(id) and a digest of the rows' xmin
+    xmin changes on every UPDATE, so in-place edits (e.g. job status) change the
+    ETag even on tables without an updated_at column.
+    Returns: (weak ETag, next cursor or None)
+    """
+    window = _window(
+        model, page, criteria,
+        model.id.label("id"),
+        literal_column("xmin::text").label("version"),
+        func.row_number().over(order_by=model.id).label("n"),
+    ).subquery()
+    next_cursor = (func.max(window.c.id).filter(window.c.n <= page.limit) if page.limit is not None
+                   else literal_column("NULL"))
+    result = await db.execute(select(
+        func.count(),
+        func.max(window.c.id),
+        func.md5(func.string_agg(window.c.version, aggregate_order_by(literal_column("','"), window.c.id))),
+        next_cursor,
+    ).select_from(window))
+    count, max_id, versions, cursor = result.one()
+    if page.limit is None or count <= page.limit:
+        cursor = None
+
+    fields = ",".join(page.fields or [])
+    seed = f"{model.__tablename__}|{fields}|{count}|{max_id}|{versions}".encode()
+    return 'W/"' + hashlib.blake2b(seed, digest_size=16).hexdigest() + '"', cursor
+
+
+def _matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    return bool(if_none_match) and etag in [t.strip() for t in if_none_match.split(",")]
+
+
+def _headers(etag: str, next_cursor: Optional[int]) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = str(next_cursor)
+    return headers
+
+
+def page_response(request: Request, rows: List[Dict[str, Any]], next_cursor: Optional[int],
+                  etag: Optional[str] = None) -> Response:
+    """Serialize with orjson and answer If-None-Match with 304 when unchanged"""
+    body = orjson.dumps(rows, option=orjson.OPT_NON_STR_KEYS)
+    if etag is None:
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    headers = _headers(etag, next_cursor)
+    if _matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def list_response(
+    request: Request,
+    db: AsyncSession,
+    model,
+    page: PageParams,
+    *criteria,
+) -> Response:
+    """Conditional GET for a list endpoint: 304 from the aggregate alone, otherwise fetch the page"""
+    _columns_for(model, page.fields)  # unknown fields are a 400 before any query
+    etag, next_cursor = await page_etag(db, model, page, *criteria)
+    if _matches(request, etag):
+        return Response(status_code=304, headers=_headers(etag, next_cursor))
+
+    rows, next_cursor = await keyset_page(db, model, page, *criteria)
+    return page_response(request, rows, next_cursor, etag)
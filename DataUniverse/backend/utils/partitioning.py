@@ -0,0 +1,117 @@
+"""
+Time partitioning for ETL target tables
+A partitioning spec from the job YAML (target.partitioning) or the target's
+TransformTemplate.config names a time column and creates the table either as
+a TimescaleDB hypertable (chunk interval, optional compression) or as a
+native PostgreSQL range-partitioned table whose partitions are added for the
+time ranges each chunk touches. The time column is part of the primary key
+and therefore NOT NULL: rows whose time is missing or unparseable either
+fail the load (on_missing_time: reject) or are dropped and counted
+(on_missing_time: quarantine).
+"""
+import os
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("hypertable", "range")
+MISSING_TIME_ACTIONS = ("reject", "quarantine")
+CHUNK_INTERVAL = os.getenv("ETL_HYPERTABLE_CHUNK_INTERVAL", "7 days")
+# Range partition width -> (pandas period, partition name suffix)
+RANGE_INTERVALS = {
+    "day": ("D", "%Y%m%d"),
+    "week": ("W", "%Y%m%d"),
+    "month": ("M", "%Y%m"),
+    "year": ("Y", "%Y"),
+}
+
+
+class PartitionSpec:
+    """Time column and partitioning strategy for one target table"""
+
+    def __init__(self, time_column: str, strategy: str = "hypertable", interval: Optional[str] = None,
+                 compress_after: Optional[str] = None, compress_segmentby: Optional[List[str]] = None,
+                 compress_orderby: Optional[str] = None, on_missing_time: str = "reject"):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown partitioning strategy '{strategy}', expected one of {STRATEGIES}")
+        if strategy == "range":
+            interval = interval or "month"
+            if interval not in RANGE_INTERVALS:
+                raise ValueError(f"Range partition interval must be one of {list(RANGE_INTERVALS)}, got '{interval}'")
+        if on_missing_time not in MISSING_TIME_ACTIONS:
+            raise ValueError(f"on_missing_time must be one of {MISSING_TIME_ACTIONS}, got '{on_missing_time}'")
+        self.time_column = time_column
+        self.strategy = strategy
+        self.interval = interval or CHUNK_INTERVAL
+        self.compress_after = compress_after
+        self.compress_segmentby = compress_segmentby or []
+        # None: the (sanitized) time column, newest first
+        self.compress_orderby = compress_orderby
+        self.on_missing_time = on_missing_time
+        self.quarantined = 0
+
+    @classmethod
+    def from_config(cls, spec: Optional[Dict[str, Any]]) -> Optional["PartitionSpec"]:
+        """
+        spec: {"time_column": ..., "strategy": "hypertable" | "range", "interval": ...,
+               "compress_after": ..., "compress_segmentby": [...], "compress_orderby": ...,
+               "on_missing_time": "reject" | "quarantine"}
+        interval is a Postgres interval for hypertables ("1 day") and one of
+        day/week/month/year for range partitions
+        """
+        if not spec:
+            return None
+        if not spec.get("time_column"):
+            raise ValueError("partitioning requires a time_column")
+        segmentby = spec.get("compress_segmentby")
+        return cls(
+            spec["time_column"],
+            str(spec.get("strategy", "hypertable")).lower(),
+            spec.get("interval"),
+            spec.get("compress_after"),
+            [segmentby] if isinstance(segmentby, str) else segmentby,
+            spec.get("compress_orderby"),
+            str(spec.get("on_missing_time", "reject")).lower(),
+        )
+
+    def apply_schema(self, schema: Dict[str, str]) -> Dict[str, str]:
+        """Type the time column as TIMESTAMP whatever was inferred from the chunk"""
+        if self.time_column not in schema:
+            raise ValueError(f"Partition time column '{self.time_column}' not found in the loaded columns")
+        schema[self.time_column] = "TIMESTAMP"
+        return schema
+
+    def prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Parse the time column; timezone-aware values are stored as UTC
+        Rows without a valid time raise ValueError (reject) or are dropped and
+        added to self.quarantined (quarantine)
+        """
+        times = pd.to_datetime(df[self.time_column], errors="coerce")
+        if getattr(times.dt, "tz", None) is not None:
+            times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+        df[self.time_column] = times
+        missing = times.isna()
+        if missing.any():
+            count = int(missing.sum())
+            if self.on_missing_time == "reject":
+                raise ValueError(
+                    f"{count} rows have a missing or unparseable partition time column '{self.time_column}'; "
+                    f"fix the source or set partitioning.on_missing_time: quarantine to drop them"
+                )
+            logger.warning(f"Quarantined {count} rows without a valid '{self.time_column}' value")
+            self.quarantined += count
+            df = df[~missing]
+        return df
+
+    def report(self) -> Dict[str, Any]:
+        return {"time_column": self.time_column, "strategy": self.strategy, "interval": self.interval,
+                "on_missing_time": self.on_missing_time, "rows_quarantined": self.quarantined}
+
+    def partition_bounds(self, times: pd.Series) -> List[Tuple[str, pd.Timestamp, pd.Timestamp]]:
+        """(name suffix, start, end) of every range partition the given times fall into"""
+        freq, name_format = RANGE_INTERVALS[self.interval]
+        periods = times.dropna().dt.to_period(freq).unique()
+        return [(p.start_time.strftime(name_format), p.start_time, (p + 1).start_time) for p in sorted(periods)]
@@ -0,0 +1,528 @@
+"""
+RAG ingestion pipeline
+Extracts text from uploaded documents, splits it into overlapping chunks,
+embeds the chunks in batches through a pluggable embedder and bulk-loads
+the rows into the pgvector `documents` table with COPY.
+"""
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+import urllib.request
+import zipfile
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+from xml.etree import ElementTree
+from sqlalchemy import String, any_, bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+try:
+    from ..models import Document, EmbeddingCacheEntry
+except ImportError:
+    from models import Document, EmbeddingCacheEntry
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 1536  # Must match Document.embedding
+CHUNK_SIZE = int(os.getenv("RAG_CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "200"))
+EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "64"))
+EMBED_CACHE_SIZE = int(os.getenv("RAG_EMBED_CACHE_SIZE", "10000"))
+
+# ANN index settings
+INDEX_KIND = os.getenv("RAG_INDEX_KIND", "hnsw")  # hnsw | ivfflat (ivfflat is only built by /rag/index after a load)
+HNSW_M = int(os.getenv("RAG_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
+HNSW_EF_SEARCH = int(os.getenv("RAG_HNSW_EF_SEARCH", "40"))
+IVFFLAT_LISTS = int(os.getenv("RAG_IVFFLAT_LISTS", "100"))
+IVFFLAT_PROBES = int(os.getenv("RAG_IVFFLAT_PROBES", "10"))
+
+
+class _HTMLTextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+class TextExtractor:
+    """Extract plain text from uploaded document bytes"""
+
+    @staticmethod
+    def extract(filename: str, content: bytes) -> str:
+        ext = os.path.splitext(filename or "")[1].lower()
+        if ext in (".html", ".htm"):
+            return TextExtractor.extract_html(content)
+        elif ext == ".docx":
+            return TextExtractor.extract_docx(content)
+        elif ext == ".pdf":
+            return TextExtractor.extract_pdf(content)
+        # txt, md, csv, json and unknown types are treated as text
+        return content.decode("utf-8", errors="replace")
+
+    @staticmethod
+    def extract_html(content: bytes) -> str:
+        parser = _HTMLTextExtractor()
+        parser.feed(content.decode("utf-8", errors="replace"))
+        return " ".join(p.strip() for p in parser.parts if p.strip())
+
+    @staticmethod
+    def extract_docx(content: bytes) -> str:
+        ns = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            root = ElementTree.fromstring(zf.read("word/document.xml"))
+        paragraphs = []
+        for para in root.iter(f"{ns}p"):
+            text = "".join(node.text or "" for node in para.iter(f"{ns}t"))
+            if text:
+                paragraphs.append(text)
+        return "\n".join(paragraphs)
+
+    @staticmethod
+    def extract_pdf(content: bytes) -> str:
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            raise ValueError("PDF ingestion requires the 'pypdf' package")
+        reader = PdfReader(io.BytesIO(content))
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+class TextChunker:
+    """Split text into overlapping chunks, preferring whitespace boundaries"""
+
+    @staticmethod
+    def split(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
+        text = re.sub(r"\s+", " ", text).strip()
+        if not text:
+            return []
+        if overlap >= chunk_size:
+            raise ValueError("Chunk overlap must be smaller than chunk size")
+
+        chunks = []
+        start = 0
+        while start < len(text):
+            end = min(start + chunk_size, len(text))
+            if end < len(text):
+                boundary = text.rfind(" ", start + chunk_size // 2, end)
+                if boundary != -1:
+                    end = boundary
+            chunks.append(text[start:end].strip())
+            if end >= len(text):
+                break
+            start = max(end - overlap, start + 1)
+        return [c for c in chunks if c]
+
+
+class Embedder(ABC):
+    """Base class for embedders; subclasses implement embed()"""
+
+    model_id = "base"
+    dim = EMBEDDING_DIM
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """One vector of self.dim floats per text, in order"""
+
+
+class LocalHashEmbedder(Embedder):
+    """
+    Deterministic feature-hashing embedder
+    No model or network needed; used for tests and offline development
+    """
+
+    model_id = "local-hash-v1"
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed_one(t) for t in texts]
+
+    def _embed_one(self, text: str) -> List[float]:
+        vec = [0.0] * self.dim
+        for token in re.findall(r"\w+", text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vec[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+
+class OpenAIEmbedder(Embedder):
+    """Embeddings via the OpenAI-compatible /embeddings HTTP API"""
+
+    def __init__(self, api_key: str, model: str = "text-embedding-ada-002", base_url: str = "https://api.openai.com/v1"):
+        self.api_key = api_key
+        self.model_id = model
+        self.base_url = base_url.rstrip("/")
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        payload = json.dumps({"model": self.model_id, "input": texts}).encode("utf-8")
+        request = urllib.request.Request(
+            f"{self.base_url}/embeddings",
+            data=payload,
+            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=60) as response:
+            data = json.loads(response.read())["data"]
+        return [item["embedding"] for item in sorted(data, key=lambda d: d["index"])]
+
+
+def get_embedder() -> Embedder:
+    """Build the embedder selected by RAG_EMBEDDER (local | openai)"""
+    kind = os.getenv("RAG_EMBEDDER", "local").lower()
+    if kind == "openai":
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("RAG_EMBEDDER=openai requires OPENAI_API_KEY")
+        return OpenAIEmbedder(
+            api_key,
+            model=os.getenv("RAG_EMBEDDING_MODEL", "text-embedding-ada-002"),
+            base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+        )
+    return LocalHashEmbedder()
+
+
+def vector_literal(vec: List[float]) -> str:
+    """pgvector text representation"""
+    return "[" + ",".join(repr(float(v)) for v in vec) + "]"
+
+
+def content_hash(chunk: str) -> str:
+    """Hash of the normalized chunk text (NFC, collapsed whitespace)"""
+    normalized = re.sub(r"\s+", " ", unicodedata.normalize("NFC", chunk)).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def chunk_document(filename: str, text: str, chunk_size: int = CHUNK_SIZE,
+                   overlap: int = CHUNK_OVERLAP) -> List[Tuple[str, str, str]]:
+    """(filename, chunk, content_hash) rows for one document"""
+    return [(filename, chunk, content_hash(chunk)) for chunk in TextChunker.split(text, chunk_size, overlap)]
+
+
+def dedupe_rows(rows: List[Tuple[str, str, str]]) -> List[Tuple[str, str, str]]:
+    """
+    Keep the first row for each (filename, content hash): every file keeps its own
+    copy of shared text so filename-filtered searches still find it
+    """
+    seen = set()
+    unique = []
+    for row in rows:
+        if (row[0], row[2]) not in seen:
+            seen.add((row[0], row[2]))
+            unique.append(row)
+    return unique
+
+
+def hash_array(hashes: List[str]):
+    """Bind a hash list as one array parameter (an IN list is limited to 32767 params)"""
+    return bindparam("hashes", value=list(hashes), type_=ARRAY(String))
+
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by (model_id, content hash)
+    An in-process LRU sits in front of the persistent embedding_cache table.
+    """
+
+    def __init__(self, max_entries: int = EMBED_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lru: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_local(self, model_id: str, h: str) -> Optional[List[float]]:
+        with self._lock:
+            vec = self._lru.get((model_id, h))
+            if vec is not None:
+                self._lru.move_to_end((model_id, h))
+            return vec
+
+    def put_local(self, model_id: str, h: str, vec: List[float]) -> None:
+        with self._lock:
+            self._lru[(model_id, h)] = vec
+            self._lru.move_to_end((model_id, h))
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    async def get_many(self, db: AsyncSession, model_id: str, hashes: List[str]) -> Dict[str, List[float]]:
+        """Look up hashes in the LRU, then the persistent cache (promoting hits)"""
+        found: Dict[str, List[float]] = {}
+        missing = []
+        for h in hashes:
+            vec = self.get_local(model_id, h)
+            if vec is not None:
+                found[h] = vec
+            else:
+                missing.append(h)
+
+        if missing:
+            result = await db.execute(
+                select(EmbeddingCacheEntry.content_hash, EmbeddingCacheEntry.embedding)
+                .where(EmbeddingCacheEntry.model_id == model_id)
+                .where(EmbeddingCacheEntry.content_hash == any_(hash_array(missing)))
+            )
+            for h, vec in result.all():
+                vec = [float(v) for v in vec]
+                found[h] = vec
+                self.put_local(model_id, h, vec)
+        return found
+
+    async def put_many(self, db: AsyncSession, model_id: str, entries: Dict[str, List[float]]) -> None:
+        if not entries:
+            return
+        values = []
+        for h, vec in entries.items():
+            self.put_local(model_id, h, vec)
+            values.append({"model_id": model_id, "content_hash": h, "embedding": vec})
+        # Stay well below the 32767 bind parameter limit per statement
+        for i in range(0, len(values), 5000):
+            await db.execute(
+                pg_insert(EmbeddingCacheEntry)
+                .values(values[i:i + 5000])
+                .on_conflict_do_nothing(index_elements=["model_id", "content_hash"])
+            )
+
+
+embedding_cache = EmbeddingCache()
+
+
+class IngestionPipeline:
+    """Chunk, dedupe, embed (through the cache) in batches and COPY documents into pgvector"""
+
+    def __init__(self, embedder: Optional[Embedder] = None, batch_size: int = EMBED_BATCH_SIZE,
+                 chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP,
+                 cache: Optional[EmbeddingCache] = None):
+        self.embedder = embedder or get_embedder()
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.cache = cache or embedding_cache
+
+    def prepare(self, documents: List[Tuple[str, str]], dedupe: bool = True) -> List[Tuple[str, str, str]]:
+        """Split (filename, text) documents into (filename, chunk, content_hash) rows"""
+        rows = []
+        for filename, text in documents:
+            rows.extend(chunk_document(filename, text, self.chunk_size, self.overlap))
+        return dedupe_rows(rows) if dedupe else rows
+
+    def embed_rows(self, rows: List[Tuple]) -> List[List[float]]:
+        embeddings: List[List[float]] = []
+        for i in range(0, len(rows), self.batch_size):
+            batch = [row[1] for row in rows[i:i + self.batch_size]]
+            vectors = self.embedder.embed(batch)
+            for vec in vectors:
+                if len(vec) != EMBEDDING_DIM:
+                    raise ValueError(f"Embedder {self.embedder.model_id} returned {len(vec)} dims, expected {EMBEDDING_DIM}")
+            embeddings.extend(vectors)
+        return embeddings
+
+    async def ingest(self, db: AsyncSession, documents: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Ingest a batch of (filename, text) documents
+        Chunks already stored for the same file are skipped; text shared with
+        other files is stored again but its embedding is served from the cache.
+        Returns: dict with chunk counts, cache hit ratio, timings and throughput
+        """
+        started = time.perf_counter()
+        rows = await asyncio.to_thread(self.prepare, documents, False)
+        return await self.ingest_rows(db, rows, len(documents), started)
+
+    async def ingest_rows(self, db: AsyncSession, rows: List[Tuple[str, str, str]], document_count: int,
+                          started: Optional[float] = None) -> Dict[str, Any]:
+        """Ingest already chunked (filename, chunk, content_hash) rows"""
+        started = started or time.perf_counter()
+        prepared = len(rows)
+        rows = dedupe_rows(rows)
+
+        # Skip chunks already ingested for the same file
+        if rows:
+            result = await db.execute(
+                select(Document.filename, Document.content_hash)
+                .where(Document.content_hash == any_(hash_array([r[2] for r in rows])))
+            )
+            existing = {(filename, content_hash) for filename, content_hash in result.all()}
+            rows = [r for r in rows if (r[0], r[2]) not in existing]
+
+        # Text shared between files is embedded once
+        model_id = self.embedder.model_id
+        cached = await self.cache.get_many(db, model_id, list({r[2] for r in rows}))
+        misses = list({r[2]: r for r in rows if r[2] not in cached}.values())
+        fresh = await asyncio.to_thread(self.embed_rows, misses)
+        new_entries = {r[2]: vec for r, vec in zip(misses, fresh)}
+        await self.cache.put_many(db, model_id, new_entries)
+        embedded_at = time.perf_counter()
+
+        if rows:
+            embeddings = [cached.get(r[2]) or new_entries[r[2]] for r in rows]
+            await self.copy_rows(db, rows, embeddings)
+        else:
+            await db.commit()
+        finished = time.perf_counter()
+
+        elapsed = finished - started
+        hits = len(rows) - len(misses)
+        stats = {
+            "documents": document_count,
+            "chunks": len(rows),
+            "duplicates_skipped": prepared - len(rows),
+            "cache_hits": hits,
+            "cache_misses": len(misses),
+            "cache_hit_ratio": round(hits / len(rows), 3) if rows else None,
+            "embedder": model_id,
+            "embed_seconds": round(embedded_at - started, 3),
+            "insert_seconds": round(finished - embedded_at, 3),
+            "chunks_per_sec": round(len(rows) / elapsed, 1) if elapsed > 0 else None,
+        }
+        logger.info(f"RAG ingestion: {stats}")
+        return stats
+
+    @staticmethod
+    async def copy_rows(db: AsyncSession, rows: List[Tuple], embeddings: List[List[float]],
+                        table: str = "documents") -> None:
+        """
+        Bulk insert via COPY ... FROM STDIN (CSV) on the session's connection
+        rows are (filename, content) or (filename, content, content_hash)
+        """
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row, vec in zip(rows, embeddings):
+            writer.writerow([*row, vector_literal(vec)])
+        data = io.BytesIO(buf.getvalue().encode("utf-8"))
+
+        columns = ["filename", "content", "content_hash"][:len(rows[0])] + ["embedding"]
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_to_table(
+            table,
+            source=data,
+            columns=columns,
+            format="csv",
+        )
+        await db.commit()
+
+
+async def ensure_rag_schema(conn) -> None:
+    """Bring the documents table up to date and make sure the ANN index exists"""
+    await conn.execute(text("ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)"))
+    await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_documents_content_hash ON documents (content_hash)"))
+    await VectorIndex.ensure(conn)
+
+
+class VectorIndex:
+    """Create and rebuild the ANN index on an embedding column"""
+
+    @staticmethod
+    def index_name(table: str) -> str:
+        return f"{table}_embedding_ann"
+
+    @staticmethod
+    def create_sql(table: str = "documents", kind: str = INDEX_KIND, m: int = HNSW_M,
+                   ef_construction: int = HNSW_EF_CONSTRUCTION, lists: int = IVFFLAT_LISTS) -> str:
+        name = VectorIndex.index_name(table)
+        if kind == "hnsw":
+            return (f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+                    f"USING hnsw (embedding vector_cosine_ops) "
+                    f"WITH (m = {int(m)}, ef_construction = {int(ef_construction)})")
+        elif kind == "ivfflat":
+            return (f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+                    f"USING ivfflat (embedding vector_cosine_ops) WITH (lists = {int(lists)})")
+        raise ValueError(f"Unsupported vector index kind: {kind}")
+
+    @staticmethod
+    async def ensure(conn, table: str = "documents") -> None:
+        """
+        Create an HNSW index if no ANN index exists (conn may be an AsyncConnection or AsyncSession)
+        HNSW builds incrementally, so it is safe on an empty table; IVFFlat trains its
+        lists on the rows present and is left to rebuild() once data is loaded.
+        """
+        await conn.execute(text(VectorIndex.create_sql(table, "hnsw")))
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, table: str = "documents", kind: str = INDEX_KIND, **params) -> Dict[str, Any]:
+        """Drop and recreate the index, e.g. after a bulk load or to switch kind"""
+        if kind == "ivfflat":
+            lists = int(params.get("lists") or IVFFLAT_LISTS)
+            result = await db.execute(text(f"SELECT count(*) FROM {table} WHERE embedding IS NOT NULL"))
+            rows = int(result.scalar() or 0)
+            if rows < lists:
+                raise ValueError(f"IVFFlat with {lists} lists needs at least {lists} embedded rows in {table}, "
+                                 f"found {rows}; load the data first or use hnsw")
+        started = time.perf_counter()
+        await db.execute(text(f"DROP INDEX IF EXISTS {VectorIndex.index_name(table)}"))
+        await db.execute(text(VectorIndex.create_sql(table, kind, **params)))
+        await db.execute(text(f"ANALYZE {table}"))
+        await db.commit()
+        return {"index": VectorIndex.index_name(table), "kind": kind,
+                "build_seconds": round(time.perf_counter() - started, 3)}
+
+
+class VectorSearch:
+    """Top-k cosine similarity search with metadata filters"""
+
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        query_vec: List[float],
+        k: int = 5,
+        filenames: Optional[List[str]] = None,
+        created_after: Optional[Any] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        exact: bool = False,
+        table: str = "documents",
+    ) -> List[Dict[str, Any]]:
+        """
+        Search nearest chunks by cosine distance
+        ef_search/probes tune HNSW/IVFFlat recall vs latency; exact=True forces a
+        sequential scan (ground truth for recall measurements). Filters are applied
+        to index candidates, so raise ef_search when filtering to a small subset.
+        """
+        where = []
+        params: Dict[str, Any] = {"q": vector_literal(query_vec), "k": int(k)}
+        if filenames:
+            where.append("filename = ANY(:filenames)")
+            params["filenames"] = list(filenames)
+        if created_after is not None:
+            where.append("created_at >= :created_after")
+            params["created_after"] = created_after
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+        sql = (f"SELECT id, filename, content, embedding <=> CAST(:q AS vector) AS distance "
+               f"FROM {table} {where_sql} "
+               f"ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k")
+
+        try:
+            if exact:
+                await db.execute(text("SET LOCAL enable_indexscan = off"))
+            else:
+                await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search or max(HNSW_EF_SEARCH, k))}"))
+                await db.execute(text(f"SET LOCAL ivfflat.probes = {int(probes or IVFFLAT_PROBES)}"))
+            result = await db.execute(text(sql), params)
+            return [dict(row) for row in result.mappings().all()]
+        finally:
+            # SET LOCAL settings end with the transaction
+            await db.rollback()
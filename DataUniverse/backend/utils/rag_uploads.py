@@ -0,0 +1,134 @@
+"""
+Upload handling for RAG ingestion
+Streams uploads to disk in fixed-size chunks and runs text extraction and
+chunking in a process pool that admits a bounded number of jobs at a time
+(further uploads wait for a slot), so large or numerous uploads neither hold
+whole files in memory nor block the event loop.
+"""
+import asyncio
+import os
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+from fastapi import UploadFile
+import logging
+
+from .rag_engine import CHUNK_OVERLAP, CHUNK_SIZE, TextExtractor, chunk_document
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = os.getenv("RAG_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "datauniverse_uploads"))
+UPLOAD_CHUNK_BYTES = int(os.getenv("RAG_UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+MAX_UPLOAD_BYTES = int(os.getenv("RAG_MAX_UPLOAD_BYTES", str(512 * 1024 * 1024)))
+PARSE_WORKERS = int(os.getenv("RAG_PARSE_WORKERS", str(max((os.cpu_count() or 2) - 1, 1))))
+PARSE_QUEUE_SIZE = int(os.getenv("RAG_PARSE_QUEUE_SIZE", "64"))
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+async def save_upload(file: UploadFile, upload_dir: str = UPLOAD_DIR,
+                      max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[Path, int]:
+    """
+    Stream an upload to disk in UPLOAD_CHUNK_BYTES pieces
+    File system calls run in worker threads so the event loop keeps serving requests
+    Returns: (path, size in bytes)
+    """
+    await asyncio.to_thread(Path(upload_dir).mkdir, parents=True, exist_ok=True)
+    suffix = os.path.splitext(file.filename or "")[1]
+    path = Path(upload_dir) / f"{uuid.uuid4().hex}{suffix}"
+    size = 0
+    out = await asyncio.to_thread(open, path, "wb")
+    try:
+        while True:
+            piece = await file.read(UPLOAD_CHUNK_BYTES)
+            if not piece:
+                break
+            size += len(piece)
+            if size > max_bytes:
+                raise UploadTooLarge(f"{file.filename} exceeds the {max_bytes} byte upload limit")
+            await asyncio.to_thread(out.write, piece)
+        await asyncio.to_thread(out.close)
+    except BaseException:
+        await asyncio.to_thread(out.close)
+        await asyncio.to_thread(path.unlink, missing_ok=True)
+        raise
+    return path, size
+
+
+def parse_file(path: str, filename: str, chunk_size: int = CHUNK_SIZE,
+               overlap: int = CHUNK_OVERLAP) -> List[Tuple[str, str, str]]:
+    """Worker entry point: extract text from a saved upload and chunk it"""
+    with open(path, "rb") as f:
+        content = f.read()
+    return chunk_document(filename, TextExtractor.extract(filename, content), chunk_size, overlap)
+
+
+class ParseQueue:
+    """Process pool that runs at most max_pending parse jobs; further callers wait their turn"""
+
+    def __init__(self, workers: int = PARSE_WORKERS, max_pending: int = PARSE_QUEUE_SIZE):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots, self._loop = asyncio.Semaphore(self.max_pending), loop
+        return self._slots
+
+    async def parse(self, path: Path, filename: str) -> List[Tuple[str, str, str]]:
+        """Parse a saved upload; returns only once no worker is reading the file any more"""
+        async with self._semaphore():
+            future = self.executor.submit(parse_file, str(path), filename)
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                # A job that already started keeps reading the file: let it finish first
+                if not future.cancel():
+                    await asyncio.wait([asyncio.wrap_future(future)])
+                raise
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+parse_queue = ParseQueue()
+
+
+async def process_uploads(files: List[UploadFile]) -> Tuple[List[Tuple[str, str, str]], int]:
+    """
+    Save and parse uploads concurrently
+    Returns: (chunk rows for all files, total uploaded bytes)
+    """
+    saved: List[Tuple[Path, int]] = []
+    try:
+        for file in files:
+            saved.append(await save_upload(file))
+        # Every parse settles before the files are removed, even when one of them fails
+        results = await asyncio.gather(*[
+            parse_queue.parse(path, file.filename) for (path, _), file in zip(saved, files)
+        ], return_exceptions=True)
+    finally:
+        for path, _ in saved:
+            path.unlink(missing_ok=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    rows = [row for file_rows in results for row in file_rows]
+    return rows, sum(size for _, size in saved)
@@ -0,0 +1,89 @@
+"""
+Read plans compiled from ETLJob.mapping_config
+A plan tells the readers which source columns to parse (and with which
+dtypes), then renames and narrows each chunk to the mapped target fields so
+the target table is created only with mapped columns.
+"""
+from typing import Any, Dict, List, Optional
+import pandas as pd
+import logging
+
+from .etl_engine import ETLEngine
+from .file_readers import FileReader
+
+logger = logging.getLogger(__name__)
+
+# Optional "type" on a mapping entry -> (pandas dtype for the reader, Postgres column type)
+TARGET_TYPES = {
+    "integer": ("Int64", "INTEGER"),
+    "int": ("Int64", "INTEGER"),
+    "bigint": ("Int64", "BIGINT"),
+    "double precision": ("float64", "DOUBLE PRECISION"),
+    "float": ("float64", "DOUBLE PRECISION"),
+    "real": ("float32", "REAL"),
+    "numeric": ("float64", "NUMERIC"),
+    "boolean": ("boolean", "BOOLEAN"),
+    "bool": ("boolean", "BOOLEAN"),
+    "text": ("string", "TEXT"),
+    "string": ("string", "TEXT"),
+}
+
+
+class ReadPlan:
+    """Projection, dtypes and renames for one job"""
+
+    def __init__(self, mappings: List[Dict[str, Any]], usecols: Optional[List[str]] = None):
+        self.renames: Dict[str, str] = {}
+        self.dtypes: Dict[str, str] = {}
+        self.target_types: Dict[str, str] = {}
+        for m in mappings:
+            source, target = m.get("source"), m.get("target") or m.get("source")
+            if not source:
+                continue
+            self.renames[source] = target
+            declared = TARGET_TYPES.get(str(m.get("type", "")).lower())
+            if declared:
+                self.dtypes[source] = declared[0]
+                self.target_types[target] = declared[1]
+        # None means the reader has to parse every column (e.g. python transformations)
+        self.usecols = usecols
+        self.output_columns = list(self.renames.values())
+
+    @classmethod
+    def compile(cls, mapping_config: Optional[Dict[str, Any]],
+                config: Optional[Dict[str, Any]] = None) -> Optional["ReadPlan"]:
+        """None when the job has no mapping: every source column is loaded as before"""
+        mappings = (mapping_config or {}).get("mappings") or []
+        if not any(m.get("source") for m in mappings):
+            return None
+        plan = cls(mappings, ETLEngine.referenced_columns(config, mapping_config))
+        logger.info(f"Read plan: {len(plan.renames)} mapped fields, "
+                    f"reading {len(plan.usecols) if plan.usecols is not None else 'all'} source columns")
+        return plan
+
+    def reader_options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {}
+        if self.usecols is not None:
+            options["usecols"] = self.usecols
+        if self.dtypes:
+            options["dtype"] = self.dtypes
+        return options
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Narrow to mapped columns, cast and rename them into a new frame; the input is left untouched"""
+        missing = [c for c in self.renames if c not in df.columns]
+        if missing:
+            raise ValueError(f"Mapped source columns not found: {missing}")
+        sources = list(self.renames)
+        if list(df.columns) != sources:
+            df = df.loc[:, sources]
+        casts = {column: dtype for column, dtype in self.dtypes.items() if str(df[column].dtype) != dtype}
+        if casts:
+            df = df.astype(casts)
+        return df.set_axis(self.output_columns, axis=1)
+
+    def table_schema(self, df: pd.DataFrame) -> Dict[str, str]:
+        """Inferred schema of a planned chunk, with declared mapping types taking precedence"""
+        schema = FileReader._infer_schema(df)
+        schema.update({c: t for c, t in self.target_types.items() if c in schema})
+        return schema
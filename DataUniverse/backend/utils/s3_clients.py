@@ -0,0 +1,143 @@
+"""
+Process-wide S3/MinIO clients for datalake I/O
+Clients are shared across jobs per endpoint and credentials, each with one
+sized connection pool; uploads use a TransferConfig tuned for concurrent
+multipart transfers. Jobs lease a client for as long as they use it; idle
+clients with no lease are closed, and all of them on shutdown.
+"""
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "64"))
+MULTIPART_THRESHOLD = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "16")) * 1024 ** 2
+MULTIPART_CHUNKSIZE = int(os.getenv("S3_MULTIPART_CHUNKSIZE_MB", "16")) * 1024 ** 2
+MAX_CONCURRENCY = int(os.getenv("S3_MAX_CONCURRENCY", "16"))
+CLIENT_IDLE_SECONDS = float(os.getenv("S3_CLIENT_IDLE_SECONDS", "900"))
+
+
+class S3ClientRegistry:
+    """Shared boto3 S3 clients keyed by endpoint, region and credentials (boto3 clients are thread-safe)"""
+
+    def __init__(self, max_pool_connections: int = MAX_POOL_CONNECTIONS, idle_seconds: float = CLIENT_IDLE_SECONDS):
+        self.max_pool_connections = max_pool_connections
+        self.idle_seconds = idle_seconds
+        self._clients: Dict[Tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._transfer_config = None
+
+    @staticmethod
+    def _key(access_key: Optional[str], secret_key: Optional[str], endpoint_url: Optional[str],
+             region: Optional[str]) -> Tuple:
+        # The secret is only kept as a digest in the key
+        secret = hashlib.sha256((secret_key or "").encode()).hexdigest()
+        return (endpoint_url or "", region or "", access_key or "", secret)
+
+    def get(self, access_key: Optional[str] = None, secret_key: Optional[str] = None,
+            endpoint_url: Optional[str] = None, region: Optional[str] = None):
+        """Shared client for these settings, created on first use (not protected from eviction: see lease)"""
+        return self._acquire(access_key, secret_key, endpoint_url, region, lease=False)[1]
+
+    @contextmanager
+    def lease(self, access_key: Optional[str] = None, secret_key: Optional[str] = None,
+              endpoint_url: Optional[str] = None, region: Optional[str] = None) -> Iterator[Any]:
+        """Shared client that evict_idle leaves open until the block exits"""
+        entry, client = self._acquire(access_key, secret_key, endpoint_url, region, lease=True)
+        try:
+            yield client
+        finally:
+            with self._lock:
+                entry["leases"] -= 1
+                entry["last_used"] = time.time()
+
+    def _acquire(self, access_key, secret_key, endpoint_url, region, lease: bool):
+        key = self._key(access_key, secret_key, endpoint_url, region)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                import boto3
+                from botocore.config import Config
+
+                started = time.perf_counter()
+                client = boto3.session.Session().client(
+                    "s3",
+                    aws_access_key_id=access_key,
+                    aws_secret_access_key=secret_key,
+                    endpoint_url=endpoint_url,
+                    region_name=region,
+                    config=Config(
+                        max_pool_connections=self.max_pool_connections,
+                        retries={"max_attempts": 5, "mode": "adaptive"},
+                        tcp_keepalive=True,
+                    ),
+                )
+                entry = {"client": client, "created": time.time(), "uses": 0, "leases": 0}
+                self._clients[key] = entry
+                logger.info(f"Created S3 client for {endpoint_url or 'AWS'} "
+                            f"in {(time.perf_counter() - started) * 1000:.0f} ms "
+                            f"(pool {self.max_pool_connections} connections)")
+            entry["last_used"] = time.time()
+            entry["uses"] += 1
+            if lease:
+                entry["leases"] += 1
+            return entry, entry["client"]
+
+    def transfer_config(self):
+        """TransferConfig for upload_file/download_file: multipart parts in parallel on the shared pool"""
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+
+            self._transfer_config = TransferConfig(
+                multipart_threshold=MULTIPART_THRESHOLD,
+                multipart_chunksize=MULTIPART_CHUNKSIZE,
+                # Stay within the client's pool so parts do not wait on connections
+                max_concurrency=min(MAX_CONCURRENCY, self.max_pool_connections),
+                use_threads=True,
+            )
+        return self._transfer_config
+
+    def evict_idle(self) -> int:
+        """Close unleased clients unused for idle_seconds; returns how many were closed"""
+        cutoff = time.time() - self.idle_seconds
+        with self._lock:
+            idle = [k for k, e in self._clients.items() if not e["leases"] and e["last_used"] < cutoff]
+            entries = [self._clients.pop(k) for k in idle]
+        for entry in entries:
+            entry["client"].close()
+        if entries:
+            logger.info(f"Closed {len(entries)} idle S3 clients")
+        return len(entries)
+
+    def close_all(self) -> None:
+        with self._lock:
+            entries = list(self._clients.values())
+            self._clients.clear()
+        for entry in entries:
+            entry["client"].close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "max_pool_connections": self.max_pool_connections,
+                "uses": sum(e["uses"] for e in self._clients.values()),
+                "leases": sum(e["leases"] for e in self._clients.values()),
+            }
+
+
+registry = S3ClientRegistry()
+
+
+@contextmanager
+def lease_s3_client(access_key: Optional[str] = None, secret_key: Optional[str] = None,
+                    endpoint_url: Optional[str] = None, region: Optional[str] = None) -> Iterator[Any]:
+    """Lease a client from the process-wide registry (idle, unleased clients are evicted on the way)"""
+    registry.evict_idle()
+    with registry.lease(access_key, secret_key, endpoint_url, region) as client:
+        yield client
@@ -2,11 +2,15 @@
 Dynamic table creator for PostgreSQL
 Creates tables based on inferred schema from data
 """
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
+import time
 import logging
 
+from .partitioning import PartitionSpec
+
 logger = logging.getLogger(__name__)
 
 class TableCreator:
@@ -17,7 +21,9 @@ class TableCreator:
         db: AsyncSession,
         table_name: str,
         schema: Dict[str, str],
-        drop_if_exists: bool = True
+        drop_if_exists: bool = True,
+        staging: bool = False,
+        partitioning: Optional[PartitionSpec] = None
     ) -> Dict[str, any]:
         """
         Create a table in PostgreSQL with the given schema
@@ -27,6 +33,10 @@ class TableCreator:
             table_name: Name of the table to create
             schema: Dict of {column_name: postgres_type}
             drop_if_exists: Whether to drop existing table
+            staging: Create an UNLOGGED table without the primary key, to be
+                     finished by swap_staging_table once loaded
+            partitioning: Create a TimescaleDB hypertable or a range-partitioned
+                          table on the spec's time column
             
         Returns:
             Dict with creation status and details
@@ -47,17 +57,29 @@ class TableCreator:
                 sanitized_col = TableCreator._sanitize_column_name(col_name)
                 columns.append(f"{sanitized_col} {col_type}")
             
-            # Add auto-increment ID column
-            columns.insert(0, "id SERIAL PRIMARY KEY")
-            columns.append("created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+            # Add auto-increment ID column (its primary key is built after a staging load)
+            partition_by = ""
+            if partitioning:
+                # Unique constraints on partitioned tables and hypertables must include the time column
+                time_col = TableCreator._sanitize_column_name(partitioning.time_column)
+                columns.insert(0, "id SERIAL")
+                columns.append("created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+                columns.append(f"PRIMARY KEY (id, {time_col})")
+                if partitioning.strategy == "range":
+                    partition_by = f" PARTITION BY RANGE ({time_col})"
+            else:
+                columns.insert(0, "id SERIAL" if staging else "id SERIAL PRIMARY KEY")
+                columns.append("created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
             
             create_sql = f"""
-                CREATE TABLE {table_name} (
+                CREATE {'UNLOGGED TABLE' if staging else 'TABLE'} {table_name} (
                     {', '.join(columns)}
-                )
+                ){partition_by}
             """
             
             await db.execute(text(create_sql))
+            if partitioning:
+                await TableCreator._partition_table(db, table_name, partitioning)
             await db.commit()
             
             logger.info(f"Created table: {table_name} with {len(schema)} columns")
@@ -79,7 +101,8 @@ class TableCreator:
         db: AsyncSession,
         table_name: str,
         data: List[Dict],
-        batch_size: int = 1000
+        batch_size: int = 1000,
+        commit: bool = True
     ) -> Dict[str, any]:
         """
         Insert data into table in batches
@@ -89,6 +112,8 @@ class TableCreator:
             table_name: Target table name
             data: List of dictionaries with data
             batch_size: Number of rows per batch
+            commit: Commit once all batches are inserted; False leaves the
+                    transaction open for the caller
             
         Returns:
             Dict with insertion status
@@ -115,7 +140,7 @@ class TableCreator:
                     values = []
                     for col in batch[0].keys():
                         value = row.get(col)
-                        if value is None or (isinstance(value, float) and pd.isna(value)):
+                        if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and pd.isna(value)):
                             values.append('NULL')
                         elif isinstance(value, str):
                             # Escape single quotes
@@ -137,7 +162,8 @@ class TableCreator:
                 
                 logger.info(f"Inserted batch {i//batch_size + 1}: {len(batch)} rows")
             
-            await db.commit()
+            if commit:
+                await db.commit()
             
             return {
                 "success": True,
@@ -151,11 +177,305 @@ class TableCreator:
             await db.rollback()
             raise
     
+    @staticmethod
+    async def _partition_table(db: AsyncSession, table_name: str, spec: PartitionSpec) -> None:
+        """Hypertable conversion and compression; range partitions are added per chunk by ensure_partitions"""
+        time_col = TableCreator._sanitize_column_name(spec.time_column)
+        if spec.strategy == "range":
+            logger.info(f"Created {table_name} partitioned by {spec.interval} on {time_col}")
+            return
+        await db.execute(text(
+            f"SELECT create_hypertable('{table_name}', '{time_col}', "
+            f"chunk_time_interval => INTERVAL '{spec.interval}')"
+        ))
+        if spec.compress_after:
+            orderby = spec.compress_orderby or f"{time_col} DESC"
+            options = [f"timescaledb.compress_orderby = '{orderby}'"]
+            if spec.compress_segmentby:
+                segmentby = ', '.join(TableCreator._sanitize_column_name(c) for c in spec.compress_segmentby)
+                options.append(f"timescaledb.compress_segmentby = '{segmentby}'")
+            await db.execute(text(f"ALTER TABLE {table_name} SET (timescaledb.compress, {', '.join(options)})"))
+            await db.execute(text(
+                f"SELECT add_compression_policy('{table_name}', INTERVAL '{spec.compress_after}', if_not_exists => TRUE)"
+            ))
+        logger.info(f"Created hypertable {table_name} on {time_col} with {spec.interval} chunks"
+                    + (f", compressed after {spec.compress_after}" if spec.compress_after else ""))
+
+    @staticmethod
+    async def ensure_partitions(
+        db: AsyncSession,
+        table_name: str,
+        spec: PartitionSpec,
+        times: "pd.Series",
+        known: Optional[set] = None
+    ) -> List[str]:
+        """
+        Create the range partitions the given times fall into, in the caller's transaction
+        known: partition names already created in this load, updated in place
+        Returns: names of the partitions created
+        """
+        table_name = TableCreator._sanitize_table_name(table_name)
+        known = known if known is not None else set()
+        created = []
+        for suffix, start, end in spec.partition_bounds(times):
+            name = f"{table_name}_p{suffix}"
+            if name in known:
+                continue
+            await db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table_name} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            ))
+            known.add(name)
+            created.append(name)
+        if created:
+            logger.info(f"Created partitions of {table_name}: {created}")
+        return created
+
+    @staticmethod
+    async def table_exists(db: AsyncSession, table_name: str) -> bool:
+        table_name = TableCreator._sanitize_table_name(table_name)
+        result = await db.execute(text("SELECT to_regclass(:table)"), {"table": table_name})
+        return result.scalar() is not None
+
+    @staticmethod
+    async def table_columns(db: AsyncSession, table_name: str) -> List[str]:
+        """Column names of table_name in the current schema, in table order"""
+        table_name = TableCreator._sanitize_table_name(table_name)
+        result = await db.execute(text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table ORDER BY ordinal_position"
+        ), {"table": table_name})
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def row_count(db: AsyncSession, table_name: str) -> int:
+        table_name = TableCreator._sanitize_table_name(table_name)
+        result = await db.execute(text(f"SELECT count(*) FROM {table_name}"))
+        return int(result.scalar() or 0)
+
+    @staticmethod
+    async def ensure_merge_key(db: AsyncSession, table_name: str, keys: List[str],
+                               partitioning: Optional[PartitionSpec] = None) -> str:
+        """
+        Unique index on the merge key columns, which ON CONFLICT needs as its arbiter
+        On a hypertable or range-partitioned table the index, and so the keys, must
+        include the time column; otherwise a 400 names the missing column
+        """
+        table_name = TableCreator._sanitize_table_name(table_name)
+        key_cols = [TableCreator._sanitize_column_name(k) for k in keys]
+        if partitioning:
+            time_col = TableCreator._sanitize_column_name(partitioning.time_column)
+            if time_col not in key_cols:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Merge keys {keys} must include the time column '{partitioning.time_column}' "
+                           f"of partitioned table {table_name}"
+                )
+        index_name = f"{table_name}_{'_'.join(key_cols)}_key"
+        try:
+            await db.execute(text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(key_cols)})"
+            ))
+            await db.commit()
+            return index_name
+        except Exception as e:
+            logger.error(f"Error creating merge key on {table_name}: {e}")
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def create_key_table(db: AsyncSession, table_name: str, keys: List[str]) -> str:
+        """Table collecting every source key of a merge, for delete_missing_rows"""
+        table_name = TableCreator._sanitize_table_name(table_name)
+        key_table = f"{table_name}__merge_keys"
+        key_cols = ', '.join(TableCreator._sanitize_column_name(k) for k in keys)
+        try:
+            await db.execute(text(f"DROP TABLE IF EXISTS {key_table}"))
+            await db.execute(text(f"CREATE UNLOGGED TABLE {key_table} AS SELECT {key_cols} FROM {table_name} WITH NO DATA"))
+            await db.commit()
+            return key_table
+        except Exception as e:
+            logger.error(f"Error creating key table for {table_name}: {e}")
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def merge_data(
+        db: AsyncSession,
+        table_name: str,
+        data: List[Dict],
+        keys: List[str],
+        batch_size: int = 1000,
+        key_table: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Upsert rows on the key columns in one transaction
+        
+        The rows are staged in a temp table and applied with a single
+        INSERT ... ON CONFLICT DO UPDATE; rows whose values did not change are
+        skipped by the update's WHERE clause, so they are neither rewritten nor
+        leave dead tuples behind.
+        
+        Args:
+            db: Database session
+            table_name: Target table, with a unique index on the keys (ensure_merge_key)
+            data: List of dictionaries with data; the last row wins for repeated keys
+            keys: Merge key columns
+            batch_size: Number of rows per staging INSERT
+            key_table: Also record the keys here (create_key_table)
+            
+        Returns:
+            Dict with staged, inserted, updated and unchanged row counts
+        """
+        table_name = TableCreator._sanitize_table_name(table_name)
+        if not data:
+            return {"staged": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+        try:
+            # ON CONFLICT cannot touch the same target row twice in one statement
+            data = list({tuple(row[k] for k in keys): row for row in data}.values())
+            columns = [TableCreator._sanitize_column_name(c) for c in data[0].keys()]
+            key_cols = [TableCreator._sanitize_column_name(k) for k in keys]
+            value_cols = [c for c in columns if c not in key_cols]
+            stage = f"{table_name}__merge"
+            column_str = ', '.join(columns)
+
+            await db.execute(text(
+                f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS SELECT {column_str} FROM {table_name} WITH NO DATA"
+            ))
+            await TableCreator.insert_data(db, stage, data, batch_size, commit=False)
+
+            if value_cols:
+                conflict = (
+                    f"DO UPDATE SET {', '.join(f'{c} = EXCLUDED.{c}' for c in value_cols)} "
+                    f"WHERE ({', '.join(f'{table_name}.{c}' for c in value_cols)}) "
+                    f"IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in value_cols)})"
+                )
+            else:
+                conflict = "DO NOTHING"
+            # xmax is 0 only for freshly inserted row versions
+            merge_sql = f"""
+                WITH merged AS (
+                    INSERT INTO {table_name} ({column_str})
+                    SELECT {column_str} FROM {stage}
+                    ON CONFLICT ({', '.join(key_cols)}) {conflict}
+                    RETURNING (xmax = 0) AS inserted
+                )
+                SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged
+            """
+            inserted, updated = (await db.execute(text(merge_sql))).one()
+            if key_table:
+                await db.execute(text(
+                    f"INSERT INTO {key_table} ({', '.join(key_cols)}) SELECT {', '.join(key_cols)} FROM {stage}"
+                ))
+            await db.commit()
+
+            counts = {"staged": len(data), "inserted": inserted, "updated": updated,
+                      "unchanged": len(data) - inserted - updated}
+            logger.info(f"Merged {len(data)} rows into {table_name}: {counts}")
+            return counts
+
+        except Exception as e:
+            logger.error(f"Error merging data into {table_name}: {e}")
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def delete_missing_rows(db: AsyncSession, table_name: str, key_table: str, keys: List[str]) -> int:
+        """Delete target rows whose keys were not in the merged source, then drop the key table"""
+        table_name = TableCreator._sanitize_table_name(table_name)
+        key_cols = [TableCreator._sanitize_column_name(k) for k in keys]
+        match = ' AND '.join(f"k.{c} = {table_name}.{c}" for c in key_cols)
+        try:
+            await db.execute(text(f"ANALYZE {key_table}"))
+            result = await db.execute(text(
+                f"DELETE FROM {table_name} WHERE NOT EXISTS (SELECT 1 FROM {key_table} k WHERE {match})"
+            ))
+            await db.execute(text(f"DROP TABLE {key_table}"))
+            await db.commit()
+            logger.info(f"Deleted {result.rowcount} rows missing from the source from {table_name}")
+            return result.rowcount
+        except Exception as e:
+            logger.error(f"Error deleting missing rows from {table_name}: {e}")
+            await db.rollback()
+            raise
+
+    @staticmethod
+    def staging_table_name(table_name: str) -> str:
+        """Name of the table a staging load writes into before the swap"""
+        return f"{TableCreator._sanitize_table_name(table_name)}__staging"
+
+    @staticmethod
+    async def swap_staging_table(
+        db: AsyncSession,
+        staging_table: str,
+        table_name: str,
+        indexes: Optional[List[Union[str, List[str]]]] = None
+    ) -> Dict[str, any]:
+        """
+        Replace the live table with a loaded staging table in one transaction
+        
+        The staging table is made durable (SET LOGGED), gets its primary key and the
+        declared indexes built in bulk, is ANALYZEd and then renamed over the live
+        table, so readers see either the previous data or the complete new load.
+        
+        Args:
+            db: Database session
+            staging_table: Table created with create_table(staging=True)
+            table_name: Live table to replace
+            indexes: Column names, or lists of column names for composite indexes
+            
+        Returns:
+            Dict with the table name, indexes built and timings
+        """
+        staging_table = TableCreator._sanitize_table_name(staging_table)
+        table_name = TableCreator._sanitize_table_name(table_name)
+        started = time.perf_counter()
+        try:
+            await db.execute(text(f"ALTER TABLE {staging_table} SET LOGGED"))
+            # Built under the staging name: index names are unique per schema and the live table still has its own
+            renames = [(f"{staging_table}_pkey", f"{table_name}_pkey")]
+            await db.execute(text(f"ALTER TABLE {staging_table} ADD CONSTRAINT {staging_table}_pkey PRIMARY KEY (id)"))
+            for index in indexes or []:
+                cols = [TableCreator._sanitize_column_name(c) for c in ([index] if isinstance(index, str) else index)]
+                suffix = "_".join(cols)
+                await db.execute(text(
+                    f"CREATE INDEX {staging_table}_{suffix}_idx ON {staging_table} ({', '.join(cols)})"
+                ))
+                renames.append((f"{staging_table}_{suffix}_idx", f"{table_name}_{suffix}_idx"))
+            await db.execute(text(f"ANALYZE {staging_table}"))
+            built = time.perf_counter()
+
+            sequence = (await db.execute(
+                text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": staging_table}
+            )).scalar()
+            await db.execute(text(f"DROP TABLE IF EXISTS {table_name} CASCADE"))
+            await db.execute(text(f"ALTER TABLE {staging_table} RENAME TO {table_name}"))
+            for old, new in renames:
+                await db.execute(text(f"ALTER INDEX {old} RENAME TO {new}"))
+            if sequence:
+                await db.execute(text(f"ALTER SEQUENCE {sequence} RENAME TO {table_name}_id_seq"))
+            await db.commit()
+            swapped = time.perf_counter()
+
+            logger.info(f"Swapped {staging_table} into {table_name}: "
+                        f"indexes built in {built - started:.2f}s, swap {swapped - built:.3f}s")
+            return {
+                "table_name": table_name,
+                "indexes": [new for _, new in renames],
+                "index_build_seconds": round(built - started, 3),
+                "swap_seconds": round(swapped - built, 3)
+            }
+
+        except Exception as e:
+            logger.error(f"Error swapping {staging_table} into {table_name}: {e}")
+            await db.rollback()
+            raise
+
     @staticmethod
     def _sanitize_table_name(name: str) -> str:
         """Sanitize table name for PostgreSQL"""
         # Remove file extension if present
-        name = name.replace('.csv', '').replace('.json', '').replace('.xlsx', '')
+        name = name.replace('.csv', '').replace('.json', '').replace('.xlsx', '').replace('.xml', '').replace('.parquet', '')
         # Replace spaces and special characters with underscores
         name = ''.join(c if c.isalnum() or c == '_' else '_' for c in name)
         # Ensure it starts with a letter